@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException
+from app.core.job_postings import format_job_requirements, get_job_posting_registry
+from app.core.metrics import GENERATION_ERRORS, STAGE_DURATION, InstrumentedRoute, mark_validated
+from app.core.responses import FastJSONResponse
+from app.integrations.gemini.prompt_budget import PromptBudgetExceeded, estimate_tokens
+from app.integrations.gemini.service import aget_gemini_service
+from app.schemas.cv import JobPosting, JobPostingRequest
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+def _posting_view(posting: JobPosting) -> dict:
+    compact = format_job_requirements(posting.requirements)
+    return {
+        "job_posting_id": posting.id,
+        "requirements": posting.requirements,
+        "tokens": {
+            "description": estimate_tokens(posting.description),
+            "requirements": estimate_tokens(compact),
+        },
+    }
+
+
+@router.post("/job-postings")
+async def register_job_posting(posting_request: JobPostingRequest):
+    """
+    Parse a job description once and register it for reuse across candidates
+
+    Returns a `job_posting_id` that CV requests can send as `target_job_id`
+    instead of `target_job_description`; their prompts then carry the compact
+    parsed requirements. The id is derived from the text, so registering the
+    same description again returns the same entry without calling Gemini
+    (`created: false`).
+    """
+    mark_validated()
+    gemini_service = await aget_gemini_service()
+    try:
+        result = await gemini_service.aregister_job_posting(posting_request.description)
+    except PromptBudgetExceeded as e:
+        GENERATION_ERRORS.inc(error_class="prompt_budget")
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Entrada muito longa",
+                "message": "A descrição da vaga excede o limite de tokens permitido",
+                "details": [str(e)],
+            },
+        )
+    if "error" in result:
+        return FastJSONResponse(content=result)
+
+    with STAGE_DURATION.time(stage="serialize"):
+        return FastJSONResponse(
+            content={
+                "created": result["created"],
+                **_posting_view(result["job_posting"]),
+            }
+        )
+
+
+@router.get("/job-postings/{posting_id}")
+async def get_job_posting(posting_id: str):
+    """
+    Get a registered job posting and its parsed requirements
+    """
+    posting = get_job_posting_registry().get(posting_id)
+    if posting is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Vaga não encontrada",
+                "message": f"Nenhuma vaga registrada com id '{posting_id}'",
+                "details": [],
+            },
+        )
+    return FastJSONResponse(
+        content={"description": posting.description, **_posting_view(posting)}
+    )
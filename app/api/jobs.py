@@ -0,0 +1,92 @@
+from typing import Any, Dict
+from fastapi import APIRouter, HTTPException, Request
+from app.core.clients import client_id
+from app.core.job_postings import get_job_posting_registry
+from app.core.usage import attribute_usage
+from app.integrations.gemini.service import aget_gemini_service
+from app.jobs.queue import get_job_queue
+from app.schemas.cv import CVRequest
+
+router = APIRouter()
+
+
+async def run_generate_cv_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: payloads were validated on submit, so this only re-parses them"""
+    service = await aget_gemini_service()
+    # Workers run outside the request, so the usage is booked to the client
+    # that submitted the job (jobs queued before clients were stored: "jobs")
+    with attribute_usage(job.get("client") or "jobs", "/api/v1/jobs"):
+        return await service.agenerate_cv(CVRequest.model_validate(job["payload"]))
+
+
+def _job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    view = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+    if job["result"] is not None:
+        view.update(job["result"])
+    elif job["error"]:
+        view["error"] = job["error"]
+    return view
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(cv_request: CVRequest, request: Request):
+    """
+    Queue a CV generation and return its job id immediately
+
+    The job's token usage is charged to the submitting client, whose daily
+    budget is checked here by admission control like for any LLM route.
+    """
+    if cv_request.target_job_id and get_job_posting_registry().get(cv_request.target_job_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Vaga não encontrada",
+                "message": f"Nenhuma vaga registrada com id '{cv_request.target_job_id}'",
+                "details": ["registre a vaga em /api/v1/job-postings"],
+            },
+        )
+
+    job_queue = get_job_queue()
+    if await job_queue.is_full():
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "error": "Fila cheia",
+                "message": "Há muitos jobs pendentes. Tente novamente em instantes.",
+                "details": [f"limite de jobs pendentes: {job_queue.max_pending}"],
+            },
+            headers={"Retry-After": "30"},
+        )
+
+    job_id = await job_queue.submit(
+        cv_request.model_dump(mode="json"), client=client_id(request.scope)
+    )
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/v1/jobs/{job_id}",
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of a job, and its result once it has finished
+    """
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Job não encontrado",
+                "message": f"Nenhum job com id '{job_id}'",
+                "details": [],
+            },
+        )
+    return _job_view(job)
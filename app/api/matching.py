@@ -0,0 +1,130 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.core.metrics import GENERATION_ERRORS, STAGE_DURATION, InstrumentedRoute, mark_validated
+from app.core.responses import FastJSONResponse, dumps
+from app.core.settings import get_settings
+from app.integrations.gemini.prompt_budget import PromptBudgetExceeded
+from app.integrations.gemini.service import aget_gemini_service
+from app.matching.engine import candidate_text, get_skill_matcher
+from app.matching.resources import get_resource_catalog
+from app.schemas.cv import CompatibilityScoreRequest, JobComparisonRequest
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+@router.post("/job-compatibility/score")
+async def score_job_compatibility(score_request: CompatibilityScoreRequest):
+    """
+    Score a candidate against a job description locally, without calling Gemini
+
+    Skills are recognized through the canonical skill dictionary (aliases such
+    as "Node" / "Node.js" or "React" / "ReactJS" count as the same skill) and
+    scored by weighted overlap; the result is deterministic. Learning resources
+    for the missing skills come from the local catalog.
+    """
+    mark_validated()
+    settings = get_settings()
+    with STAGE_DURATION.time(stage="local_scoring"):
+        match = get_skill_matcher().match(
+            score_request.target_job_description,
+            candidate_text(
+                score_request.skills,
+                score_request.professional_experience,
+                score_request.projects,
+                score_request.education,
+            ),
+        )
+        compatibility = match.to_compatibility()
+        compatibility["learning_resources"] = get_resource_catalog().for_skills(
+            match.missing,
+            settings.learning_resources_per_skill,
+            settings.learning_resources_max,
+        )
+    return {
+        "job_compatibility": compatibility,
+        "details": match.as_dict(),
+    }
+
+
+@router.post("/job-compatibility/compare")
+async def compare_job_compatibility(
+    comparison_request: JobComparisonRequest, stream: bool = False
+):
+    """
+    Analyze how one candidate fits several job postings
+
+    The candidate profile is prepared once and each job (`description` or a
+    registered `job_posting_id`) gets its own compatibility analysis, with at
+    most COMPARE_CONCURRENCY Gemini calls in flight; no CV is generated.
+    Results are ranked by `compatibility_score`, keeping each job's `index`
+    in the submitted list. With `?stream=true` the response is NDJSON, one
+    line per job in completion order.
+    """
+    mark_validated()
+    settings = get_settings()
+    jobs = comparison_request.jobs
+    if len(jobs) > settings.compare_max_jobs:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Vagas demais",
+                "message": f"A comparação pode ter no máximo {settings.compare_max_jobs} vagas",
+                "details": [f"vagas recebidas: {len(jobs)}"],
+            },
+        )
+
+    gemini_service = await aget_gemini_service()
+    try:
+        completed = gemini_service.compare_jobs(
+            comparison_request, settings.compare_concurrency
+        )
+    except PromptBudgetExceeded as e:
+        GENERATION_ERRORS.inc(error_class="prompt_budget")
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Entrada muito longa",
+                "message": "Os textos enviados excedem o limite de tokens permitido",
+                "details": [str(e)],
+            },
+        )
+
+    async def results():
+        async for index, result in completed:
+            status = "ok" if "job_compatibility" in result else "error"
+            yield {
+                "index": index,
+                "job_posting_id": jobs[index].job_posting_id,
+                "status": status,
+                **result,
+            }
+
+    if stream:
+
+        async def lines():
+            async for item in results():
+                yield dumps(item) + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    items = [item async for item in results()]
+    ranked = sorted(
+        items,
+        key=lambda item: (
+            item["status"] != "ok",
+            -item["job_compatibility"].compatibility_score if item["status"] == "ok" else 0,
+            item["index"],
+        ),
+    )
+    for rank, item in enumerate(ranked, start=1):
+        if item["status"] == "ok":
+            item["rank"] = rank
+    succeeded = sum(1 for item in items if item["status"] == "ok")
+    return FastJSONResponse(
+        content={
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "results": ranked,
+        }
+    )
@@ -1,38 +1,115 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+from typing import Any, Dict, List, Union
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
-from app.schemas.cv import CVRequest
-from app.integrations.gemini.service import GeminiService
+from app.core.admission import AdmissionRejected
+from app.core.job_postings import JobPostingNotFound
+from app.core.metrics import (
+    GENERATION_ERRORS,
+    REGISTRY,
+    STAGE_DURATION,
+    InstrumentedRoute,
+    mark_validated,
+)
+from app.core.responses import FastJSONResponse, dumps
+from app.core.settings import get_settings
+from app.schemas.cv import CVRequest, SectionRegenerationRequest
+from app.integrations.gemini.prompt_budget import PromptBudgetExceeded
+from app.integrations.gemini.service import (
+    GeminiService,
+    aget_gemini_service,
+    loaded_gemini_service,
+)
 
-router = APIRouter()
-gemini_service = GeminiService()
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+def _service_metrics():
+    """Expose cache and single-flight counters owned by the service at scrape time"""
+    # Scraping must not be what builds the service
+    gemini_service = loaded_gemini_service()
+    if gemini_service is None:
+        return []
+    families = [
+        (
+            "cv_singleflight_calls",
+            "counter",
+            "Upstream calls made and saved by in-flight request coalescing",
+            [
+                ("cv_singleflight_calls_total", {"result": name}, value)
+                for name, value in gemini_service.singleflight.stats.as_dict().items()
+            ],
+        )
+    ]
+    cache = gemini_service.cache
+    if cache is not None:
+        stats = cache.stats
+        families.append(
+            (
+                "cv_cache_requests",
+                "counter",
+                "Result cache lookups by outcome",
+                [
+                    ("cv_cache_requests_total", {"result": "hit"}, stats.hits),
+                    ("cv_cache_requests_total", {"result": "miss"}, stats.misses),
+                ],
+            )
+        )
+    return families
+
+
+REGISTRY.register_callback(_service_metrics)
 
 
 @router.post("/generate-cv")
-def generate_cv(cv_request: CVRequest):
+async def generate_cv(cv_request: CVRequest):
     """
     Generate a CV based on user input using Gemini AI
     """
+    mark_validated()
     try:
-        return gemini_service.generate_cv(cv_request)
+        gemini_service = await aget_gemini_service()
+        result = await gemini_service.agenerate_cv(cv_request)
+        with STAGE_DURATION.time(stage="serialize"):
+            return FastJSONResponse(content=result)
+    except PromptBudgetExceeded as e:
+        GENERATION_ERRORS.inc(error_class="prompt_budget")
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Entrada muito longa",
+                "message": "Os textos enviados excedem o limite de tokens permitido",
+                "details": [str(e)],
+            },
+        )
+    except JobPostingNotFound as e:
+        GENERATION_ERRORS.inc(error_class="job_posting_not_found")
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Vaga não encontrada",
+                "message": str(e),
+                "details": ["registre a vaga em /api/v1/job-postings"],
+            },
+        )
     except ValidationError as e:
+        GENERATION_ERRORS.inc(error_class="validation")
         # Tratar erros de validação do Pydantic
-        error_messages = []
-        for error in e.errors():
-            field = " -> ".join(str(loc) for loc in error["loc"])
-            message = error["msg"]
-            error_messages.append(f"{field}: {message}")
-        
         raise HTTPException(
             status_code=422,
             detail={
                 "error": "Erro de validação",
                 "message": "Os dados fornecidos não são válidos",
-                "details": error_messages
+                "details": _format_validation_errors(e)
             }
         )
+    except AdmissionRejected:
+        # Answered with a 429 by the app's handler
+        raise
     except Exception as e:
         # Tratar outros erros inesperados
+        GENERATION_ERRORS.inc(error_class=type(e).__name__)
         raise HTTPException(
             status_code=500,
             detail={
@@ -41,3 +118,244 @@ def generate_cv(cv_request: CVRequest):
                 "details": str(e) if str(e) else "Erro desconhecido"
             }
         )
+
+
+def _format_validation_errors(error: ValidationError) -> List[str]:
+    """Flatten pydantic errors into 'field -> path: message' strings"""
+    error_messages = []
+    for item in error.errors():
+        field = " -> ".join(str(loc) for loc in item["loc"]) or "dados"
+        error_messages.append(f"{field}: {item['msg']}")
+    return error_messages
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+
+
+@router.post("/generate-cv/stream")
+async def generate_cv_stream(cv_request: CVRequest):
+    """
+    Generate a CV streaming each completed section as a Server-Sent Event
+
+    Emits `section` events (`{"section": "generated_cv.personal_info", "data": ...}`,
+    list sections carry an `index` per item), then a final `complete` event with
+    the full result or an `error` event.
+    """
+    gemini_service = await aget_gemini_service()
+
+    async def events():
+        async for event, data in gemini_service.astream_cv(cv_request):
+            yield _sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/generate-cv/batch")
+async def generate_cv_batch(
+    payloads: List[Dict[str, Any]] = Body(...), stream: bool = False
+):
+    """
+    Generate several CVs in one call
+
+    Each item is validated independently as a CVRequest; valid items are sent
+    to Gemini with at most BATCH_CONCURRENCY generations in flight. Results
+    keep the item's `index` in the submitted list. With `?stream=true` the
+    response is NDJSON, one line per item in completion order.
+    """
+    settings = get_settings()
+    if len(payloads) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Lote muito grande",
+                "message": f"O lote pode ter no máximo {settings.batch_max_items} itens",
+                "details": [f"itens recebidos: {len(payloads)}"],
+            },
+        )
+
+    invalid = []
+    cv_requests = {}
+    for index, payload in enumerate(payloads):
+        try:
+            cv_requests[index] = CVRequest.model_validate(payload)
+        except ValidationError as e:
+            invalid.append(
+                {
+                    "index": index,
+                    "status": "error",
+                    "error": "Erro de validação",
+                    "details": _format_validation_errors(e),
+                }
+            )
+
+    gemini_service = await aget_gemini_service()
+
+    async def results():
+        for item in invalid:
+            yield item
+        async for index, result in gemini_service.agenerate_many(
+            cv_requests, settings.batch_concurrency
+        ):
+            status = "ok" if "cv_content" in result else "error"
+            yield {"index": index, "status": status, **result}
+
+    if stream:
+
+        async def lines():
+            async for item in results():
+                yield dumps(item) + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    items = sorted([item async for item in results()], key=lambda item: item["index"])
+    succeeded = sum(1 for item in items if item["status"] == "ok")
+    return FastJSONResponse(
+        content={
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "results": items,
+        }
+    )
+
+
+@router.post("/generate-cv/section")
+async def regenerate_cv_section(request: SectionRegenerationRequest):
+    """
+    Rewrite one section of a previously generated CV
+
+    Takes the `cv_content` returned by `/generate-cv`, the `section` to
+    rewrite (e.g. `professional_summary`, `project_entries`) and the new
+    informal `text`. Gemini generates only that section, which is validated
+    and put back in place; the other sections are returned unchanged.
+    """
+    mark_validated()
+    try:
+        gemini_service = await aget_gemini_service()
+        result = await gemini_service.aregenerate_section(request)
+        with STAGE_DURATION.time(stage="serialize"):
+            return FastJSONResponse(content=result)
+    except PromptBudgetExceeded as e:
+        GENERATION_ERRORS.inc(error_class="prompt_budget")
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Entrada muito longa",
+                "message": "Os textos enviados excedem o limite de tokens permitido",
+                "details": [str(e)],
+            },
+        )
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        GENERATION_ERRORS.inc(error_class=type(e).__name__)
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Erro interno do servidor",
+                "message": "Ocorreu um erro inesperado durante a reescrita da seção",
+                "details": str(e) if str(e) else "Erro desconhecido",
+            },
+        )
+
+
+def _dry_run_item(
+    gemini_service: GeminiService, payload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Validate one payload and estimate its generation; errors are reported, not raised"""
+    try:
+        cv_request = CVRequest.model_validate(payload)
+    except ValidationError as e:
+        return {
+            "valid": False,
+            "error": "Erro de validação",
+            "details": _format_validation_errors(e),
+        }
+    try:
+        return {"valid": True, **gemini_service.dry_run(cv_request)}
+    except PromptBudgetExceeded as e:
+        return {"valid": False, "error": "Entrada muito longa", "details": [str(e)]}
+    except JobPostingNotFound as e:
+        return {"valid": False, "error": "Vaga não encontrada", "details": [str(e)]}
+
+
+@router.post("/generate-cv/dry-run")
+async def generate_cv_dry_run(
+    payload: Union[Dict[str, Any], List[Dict[str, Any]]] = Body(...)
+):
+    """
+    Validate CV requests and estimate their generation without calling Gemini
+
+    Runs the full CVRequest validation and the prompt build, and returns the
+    normalized input, the estimated input/output tokens, cost and latency
+    class. Accepts one payload or a list of payloads (each result keeps its
+    `index`). Invalid payloads are reported with `valid: false` and the
+    validation details, not as a 422.
+    """
+    gemini_service = await aget_gemini_service()
+    if isinstance(payload, dict):
+        return FastJSONResponse(content=_dry_run_item(gemini_service, payload))
+
+    settings = get_settings()
+    if len(payload) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Lote muito grande",
+                "message": f"O lote pode ter no máximo {settings.batch_max_items} itens",
+                "details": [f"itens recebidos: {len(payload)}"],
+            },
+        )
+
+    results = [
+        {"index": index, **_dry_run_item(gemini_service, item)}
+        for index, item in enumerate(payload)
+    ]
+    valid = [item for item in results if item["valid"]]
+    return FastJSONResponse(
+        content={
+            "total": len(results),
+            "valid": len(valid),
+            "invalid": len(results) - len(valid),
+            "estimate": {
+                "input_tokens": sum(item["estimate"]["input_tokens"] for item in valid),
+                "output_tokens": sum(item["estimate"]["output_tokens"] for item in valid),
+                "cost_usd": round(sum(item["estimate"]["cost_usd"] for item in valid), 6),
+            },
+            "results": results,
+        }
+    )
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters of the generation result cache
+    """
+    cache = (await aget_gemini_service()).cache
+    if cache is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "backend": type(cache).__name__,
+        "entries": await asyncio.to_thread(len, cache) if cache.blocking else len(cache),
+        **cache.stats.as_dict(),
+    }
+
+
+@router.get("/singleflight/stats")
+async def singleflight_stats():
+    """
+    Upstream calls made vs. calls saved by coalescing identical in-flight requests
+    """
+    gemini_service = await aget_gemini_service()
+    return {
+        "in_flight": gemini_service.singleflight.in_flight(),
+        **gemini_service.singleflight.stats.as_dict(),
+    }
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from app.core.clients import is_admin_key, mask_client_id
+from app.core.settings import get_settings
+from app.core.usage import UsageLedger, get_token_budgets, get_usage_ledger, utc_day
+
+router = APIRouter()
+
+
+def require_admin(x_api_key: Optional[str] = Header(None)) -> None:
+    """Only the ADMIN_API_KEY sees usage; without one configured the route does not exist"""
+    if not get_settings().admin_api_key:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Rota desativada",
+                "message": "Defina ADMIN_API_KEY para consultar o consumo de tokens",
+                "details": [],
+            },
+        )
+    if not is_admin_key(x_api_key):
+        raise HTTPException(
+            status_code=401,
+            detail={
+                "error": "Não autorizado",
+                "message": "Envie a chave de administração no header X-API-Key",
+                "details": [],
+            },
+        )
+
+
+@router.get("/usage", dependencies=[Depends(require_admin)])
+async def usage_summary(
+    hours: float = Query(24, gt=0, le=24 * 366),
+    group_by: Optional[Literal["client", "model", "endpoint"]] = None,
+    client: Optional[str] = None,
+    model: Optional[str] = None,
+    endpoint: Optional[str] = None,
+):
+    """
+    Upstream token usage and cost over the last `hours`
+
+    Totals of prompt, output, cached and thinking tokens, estimated cost,
+    output tokens per second of upstream time and per-call token
+    percentiles, optionally filtered by `client`, `model` and `endpoint` and
+    broken down with `group_by`. `daily_budgets` shows each client's
+    consumption in the current UTC day against its token budget.
+
+    Requires the ADMIN_API_KEY in the X-API-Key header. IP-based client ids
+    are shown as a keyed hash; the `client` filter takes either form.
+    """
+    ledger = get_usage_ledger()
+    if ledger is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Contabilização desativada",
+                "message": "O registro de consumo de tokens está desativado (USAGE_LEDGER_ENABLED=false)",
+                "details": [],
+            },
+        )
+
+    secret = get_settings().admin_api_key
+    if client is not None and client.startswith("ip:"):
+        # A masked id, as shown in earlier responses, is resolved to the stored one
+        client = await asyncio.to_thread(_unmask_client, ledger, client, secret)
+    summary = await asyncio.to_thread(
+        ledger.summary,
+        time.time() - hours * 3600,
+        group_by,
+        client=client,
+        model=model,
+        endpoint=endpoint,
+    )
+    if group_by == "client":
+        for group in summary["groups"]:
+            group["client"] = mask_client_id(group["client"], secret)
+    daily_budgets = get_token_budgets().snapshot()
+    for budget in daily_budgets:
+        budget["client"] = mask_client_id(budget["client"], secret)
+    return {
+        "hours": hours,
+        **summary,
+        "day": utc_day(),
+        "daily_budgets": daily_budgets,
+    }
+
+
+def _unmask_client(ledger: UsageLedger, client: str, secret: str) -> str:
+    for known in ledger.clients():
+        if mask_client_id(known, secret) == client:
+            return known
+    return client
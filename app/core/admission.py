@@ -0,0 +1,343 @@
+import asyncio
+import contextvars
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from app.core.clients import ClientIdentifier, get_client_identifier
+from app.core.metrics import (
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT,
+    LLM_IN_FLIGHT,
+)
+from app.core.settings import get_settings
+from app.core.usage import TokenBudgets
+
+_controller = None
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# LLM calls made outside a controlled request, e.g. by the job workers
+BACKGROUND = "background"
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "admission_priority", default=BACKGROUND
+)
+
+
+def current_priority() -> str:
+    """Traffic class of the LLM calls made by the current request (or task)"""
+    return _priority.get()
+
+
+class AdmissionRejected(Exception):
+    """The request cannot be admitted now; the client should retry after ``retry_after``"""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(reason)
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Per-client token buckets refilled at ``rate`` tokens/s up to ``burst``.
+
+    Buckets are kept for the ``max_clients`` most recently seen clients; a
+    client evicted and seen again simply starts with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def take(self, client: str) -> float:
+        """
+        Take one token for a client
+
+        Args:
+            client (str): Client identity, as resolved by ClientIdentifier
+
+        Returns:
+            float: 0 when the request may proceed, otherwise the seconds until
+            a token becomes available
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.burst, now)
+            self._buckets[client] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return 0.0
+        return (1.0 - bucket.tokens) / self.rate
+
+
+class AdmissionController:
+    """Caps concurrent upstream LLM calls and queues the overflow by priority.
+
+    Every upstream call takes a slot, so up to ``max_in_flight`` calls run
+    at once in the process however many each request fans out to (batch,
+    comparison, split generation, job workers). Others wait in a bounded
+    FIFO queue per traffic class; a freed slot goes to the first waiting
+    interactive call, then batch, then background. A full queue, or a wait
+    longer than ``queue_timeout``, rejects the call with AdmissionRejected.
+    BACKGROUND calls are never rejected: the job workers already bound them.
+    """
+
+    def __init__(self, max_in_flight: int, queue_limits: Dict[str, int], queue_timeout: float):
+        self.max_in_flight = max(max_in_flight, 1)
+        self.queue_limits = queue_limits
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        # Insertion order is priority order
+        self.queues: Dict[str, deque] = {
+            name: deque() for name in (*queue_limits, BACKGROUND)
+        }
+        self._avg_hold = 1.0
+
+    async def acquire(self, priority: str) -> None:
+        """
+        Wait for an LLM slot
+
+        Args:
+            priority (str): INTERACTIVE, BATCH or BACKGROUND
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        if self.in_flight < self.max_in_flight and not any(self.queues.values()):
+            self._set_in_flight(self.in_flight + 1)
+            return
+
+        queue = self.queues[priority]
+        if self.is_full(priority):
+            ADMISSION_REJECTIONS.inc(reason="queue_full", priority=priority)
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(queue), priority=priority)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                waiter, None if priority == BACKGROUND else self.queue_timeout
+            )
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            elif waiter in queue:
+                queue.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                ADMISSION_REJECTIONS.inc(reason="queue_timeout", priority=priority)
+                raise AdmissionRejected("queue_timeout", self.retry_after()) from None
+            raise
+        finally:
+            ADMISSION_QUEUE_DEPTH.set(len(queue), priority=priority)
+            ADMISSION_WAIT.observe(time.perf_counter() - started, priority=priority)
+
+    def release(self, held: Optional[float] = None) -> None:
+        """
+        Free a slot, handing it to the highest-priority waiter if any
+
+        Args:
+            held (Optional[float]): Seconds the slot was held, used to
+                estimate Retry-After
+        """
+        if held is not None:
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+        for queue in self.queues.values():
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._set_in_flight(self.in_flight - 1)
+
+    @asynccontextmanager
+    async def slot(self, priority: str):
+        """Hold an LLM slot for the enclosed upstream call"""
+        await self.acquire(priority)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def is_full(self, priority: str) -> bool:
+        """Whether a call of this class arriving now would be rejected as queue_full"""
+        if self.in_flight < self.max_in_flight and not any(self.queues.values()):
+            return False
+        limit = self.queue_limits.get(priority)
+        return limit is not None and len(self.queues[priority]) >= limit
+
+    def retry_after(self) -> float:
+        """Rough time until the queued work drains, from the average slot hold time"""
+        queued = sum(len(queue) for queue in self.queues.values())
+        return self._avg_hold * (queued + 1) / self.max_in_flight
+
+    def _set_in_flight(self, value: int) -> None:
+        self.in_flight = value
+        LLM_IN_FLIGHT.set(value)
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying rate limits and the request's traffic class.
+
+    Only ``routes`` (``{(method, path): priority}``) are controlled. Clients
+    are identified by ``clients``: by a configured X-API-Key, otherwise by IP.
+    With ``budgets`` (a getter, so that importing the app does not open the
+    usage ledger), clients past their daily token budget are turned away
+    too, and so are requests whose class queue in ``controller`` is already
+    full. The request does not hold a slot itself; each of its upstream
+    calls takes one at its priority. Rejections are 429 responses with a
+    Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app,
+        routes: Dict[tuple, str],
+        controller: AdmissionController,
+        limiter: RateLimiter,
+        budgets: Optional[Callable[[], Optional[TokenBudgets]]] = None,
+        clients: Optional[ClientIdentifier] = None,
+    ):
+        self.app = app
+        self.routes = routes
+        self.controller = controller
+        self.limiter = limiter
+        self.budgets = budgets
+        self.clients = clients or get_client_identifier()
+
+    async def __call__(self, scope, receive, send):
+        priority = (
+            self.routes.get((scope.get("method"), scope.get("path")))
+            if scope["type"] == "http"
+            else None
+        )
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = self.clients(scope)
+        wait = self.limiter.take(client)
+        if wait:
+            await self._reject(send, AdmissionRejected("rate_limited", wait), priority)
+            return
+
+        budgets = self.budgets() if self.budgets is not None else None
+        if budgets is not None:
+            wait = budgets.retry_after(client)
+            if wait:
+                await self._reject(send, AdmissionRejected("token_budget", wait), priority)
+                return
+
+        if self.controller.is_full(priority):
+            await self._reject(
+                send, AdmissionRejected("queue_full", self.controller.retry_after()), priority
+            )
+            return
+
+        token = _priority.set(priority)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _priority.reset(token)
+
+    @staticmethod
+    async def _reject(send, error: AdmissionRejected, priority: str) -> None:
+        ADMISSION_REJECTIONS.inc(reason=error.reason, priority=priority)
+        body = json.dumps(rejection_detail(error), ensure_ascii=False).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after_header(error).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+REJECTION_MESSAGES = {
+    "rate_limited": "Limite de requisições excedido para este cliente.",
+    "token_budget": "Orçamento diário de tokens esgotado para este cliente.",
+    "queue_full": "O serviço está sobrecarregado. Tente novamente em instantes.",
+    "queue_timeout": "O serviço está sobrecarregado. Tente novamente em instantes.",
+}
+
+
+def rejection_detail(error: AdmissionRejected) -> Dict[str, Any]:
+    """Body of the 429 response for a rejection"""
+    return {
+        "detail": {
+            "error": "Muitas requisições",
+            "message": REJECTION_MESSAGES[error.reason],
+            "details": [f"motivo: {error.reason}"],
+        }
+    }
+
+
+def retry_after_header(error: AdmissionRejected) -> str:
+    """Retry-After value for a rejection, in whole seconds"""
+    return str(max(math.ceil(error.retry_after), 1))
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+
+    global _controller
+    if _controller is None:
+        settings = get_settings()
+        if not settings.admission_enabled:
+            return None
+        _controller = AdmissionController(
+            max_in_flight=settings.admission_max_in_flight,
+            queue_limits={
+                INTERACTIVE: settings.admission_interactive_queue,
+                BATCH: settings.admission_batch_queue,
+            },
+            queue_timeout=settings.admission_queue_timeout_seconds,
+        )
+    return _controller
+
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionMiddleware",
+    "AdmissionRejected",
+    "BACKGROUND",
+    "BATCH",
+    "INTERACTIVE",
+    "RateLimiter",
+    "current_priority",
+    "get_admission_controller",
+    "rejection_detail",
+    "retry_after_header",
+]
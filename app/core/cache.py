@@ -0,0 +1,288 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.core.settings import get_settings
+
+_cache = None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        lookups = self.hits + self.misses
+        data["hit_ratio"] = round(self.hits / lookups, 4) if lookups else 0.0
+        return data
+
+
+class CacheBackend:
+    """Base class for generation result caches.
+
+    Subclasses store JSON-serializable values under string keys and keep
+    their own hit/miss counters in ``self.stats``. Backends that do disk I/O
+    set ``blocking`` so async callers run them in a worker thread.
+    """
+
+    blocking = False
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with TTL, entry-count and byte-size limits"""
+
+    def __init__(
+        self, max_entries: int = 1024, max_bytes: int = 0, ttl_seconds: float = 0
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            expires_at, _, value = entry
+            if expires_at and expires_at < time.monotonic():
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = len(to_json(value, fallback=str))
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            self.stats.sets += 1
+
+            while self._entries and (
+                (self.max_entries and len(self._entries) > self.max_entries)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache that survives restarts, evicting least recently used rows.
+
+    Reads never write: access times are kept in memory and saved by the next
+    set(), which is also where expired rows are purged and the least recently
+    used ones evicted.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 0):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cv_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cv_cache_last_access ON cv_cache (last_access)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cv_cache_expires_at ON cv_cache (expires_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cv_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at and expires_at < now:
+                self.stats.misses += 1
+                return None
+
+            self._accessed[key] = now
+            self.stats.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else 0
+        payload = to_json(value, fallback=str).decode("utf-8")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cv_cache (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+            self.stats.sets += 1
+            self._accessed.pop(key, None)
+            if self._accessed:
+                self._conn.executemany(
+                    "UPDATE cv_cache SET last_access = ? WHERE key = ?",
+                    [(accessed, key) for key, accessed in self._accessed.items()],
+                )
+                self._accessed.clear()
+
+            cursor = self._conn.execute(
+                "DELETE FROM cv_cache WHERE expires_at > 0 AND expires_at < ?", (now,)
+            )
+            self.stats.expirations += max(cursor.rowcount, 0)
+            if self.max_entries:
+                cursor = self._conn.execute(
+                    """
+                    DELETE FROM cv_cache WHERE key IN (
+                        SELECT key FROM cv_cache ORDER BY last_access DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+                self.stats.evictions += max(cursor.rowcount, 0)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cv_cache")
+            self._conn.commit()
+            self._accessed.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cv_cache").fetchone()[0]
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def build_cache_key(request: BaseModel, *parts: str) -> str:
+    """
+    Build a stable key for a validated request
+
+    Args:
+        request (BaseModel): A validated request; its validators have already
+            normalized fields such as name and role
+        *parts (str): Extra components such as model name and prompt version
+
+    Returns:
+        str: A hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {"request": _normalize(request.model_dump(mode="json")), "parts": parts},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cache() -> Optional[CacheBackend]:
+
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        if not settings.cache_enabled:
+            return None
+        if settings.cache_backend == "sqlite":
+            _cache = SQLiteCache(
+                path=settings.cache_sqlite_path,
+                max_entries=settings.cache_max_entries,
+                ttl_seconds=settings.cache_ttl_seconds,
+            )
+        else:
+            _cache = MemoryCache(
+                max_entries=settings.cache_max_entries,
+                max_bytes=settings.cache_max_bytes,
+                ttl_seconds=settings.cache_ttl_seconds,
+            )
+    return _cache
+
+
+__all__ = [
+    "CacheBackend",
+    "CacheStats",
+    "MemoryCache",
+    "SQLiteCache",
+    "build_cache_key",
+    "get_cache",
+]
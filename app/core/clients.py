@@ -0,0 +1,105 @@
+import hashlib
+import hmac
+from typing import Dict, Iterable, Optional
+
+from app.core.settings import get_settings
+
+_identifier = None
+
+
+def api_key_id(key: str) -> str:
+    """Short, non-reversible id of an API key, safe to log and to show in /metrics"""
+    return "key:" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+class ClientIdentifier:
+    """Resolves the client a request is accounted to (rate limits, budgets, usage).
+
+    Only keys in the configured set identify a client by key; a request with
+    no X-API-Key header, or with one that is not configured, is identified
+    by its IP. Otherwise a caller could send a new key on every request and
+    start each time with a fresh rate limit and token budget.
+    """
+
+    def __init__(self, api_keys: Iterable[str] = ()):
+        self._ids: Dict[bytes, str] = {
+            key.encode("latin-1"): api_key_id(key) for key in api_keys
+        }
+
+    def __call__(self, scope) -> str:
+        """
+        Identify the client of an ASGI request
+
+        Args:
+            scope: The ASGI scope of the request
+
+        Returns:
+            str: "key:<hash>" for a configured API key, otherwise "ip:<address>"
+        """
+        if self._ids:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-api-key":
+                    client = self._ids.get(value)
+                    if client is not None:
+                        return client
+                    break
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+
+def mask_client_id(client: str, secret: str) -> str:
+    """
+    A client id safe to show in responses: IP addresses become a keyed hash
+
+    The address space is small enough to brute-force a plain hash, so the
+    hash is keyed. Key ids are already hashes and are returned unchanged.
+
+    Args:
+        client (str): A client id as returned by ClientIdentifier
+        secret (str): Key of the hash; the same secret gives the same id
+
+    Returns:
+        str: "ip:<hash>" for an IP-based id, otherwise the id itself
+    """
+    kind, _, address = client.partition(":")
+    if kind != "ip":
+        return client
+    digest = hmac.new(secret.encode("utf-8"), address.encode("utf-8"), hashlib.sha256)
+    return "ip:" + digest.hexdigest()[:12]
+
+
+def is_admin_key(key: Optional[str]) -> bool:
+    """Whether a X-API-Key value is the configured ADMIN_API_KEY; False when none is set"""
+    admin_key = get_settings().admin_api_key
+    if not admin_key or key is None:
+        return False
+    return hmac.compare_digest(key.encode("utf-8"), admin_key.encode("utf-8"))
+
+
+def parse_api_keys(raw: str) -> list:
+    """Parse the comma-separated API_KEYS setting"""
+    return [key.strip() for key in raw.split(",") if key.strip()]
+
+
+def get_client_identifier() -> ClientIdentifier:
+
+    global _identifier
+    if _identifier is None:
+        _identifier = ClientIdentifier(parse_api_keys(get_settings().api_keys))
+    return _identifier
+
+
+def client_id(scope) -> str:
+    """The client identity of a request, using the configured API keys"""
+    return get_client_identifier()(scope)
+
+
+__all__ = [
+    "ClientIdentifier",
+    "api_key_id",
+    "client_id",
+    "get_client_identifier",
+    "is_admin_key",
+    "mask_client_id",
+    "parse_api_keys",
+]
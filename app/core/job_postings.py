@@ -0,0 +1,109 @@
+import hashlib
+from typing import Optional
+
+from app.core.cache import CacheBackend, MemoryCache, SQLiteCache
+from app.core.settings import get_settings
+from app.schemas.cv import JobPosting, JobRequirements
+
+_registry = None
+
+
+class JobPostingNotFound(LookupError):
+    """Raised when a request references a job posting id that is not registered"""
+
+    def __init__(self, posting_id: str):
+        self.posting_id = posting_id
+        super().__init__(f"Nenhuma vaga registrada com id '{posting_id}'")
+
+
+def job_posting_id(description: str) -> str:
+    """Content id of a job description; whitespace differences map to the same id"""
+    normalized = " ".join(description.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def format_job_requirements(requirements: JobRequirements) -> str:
+    """Render parsed job requirements as the compact text CV prompts carry"""
+    lines = [
+        f"Cargo: {requirements.title}",
+        f"Senioridade: {requirements.seniority}",
+    ]
+    if requirements.min_years_experience:
+        lines.append(f"Experiência mínima: {requirements.min_years_experience} anos")
+    for title, items in (
+        ("Requisitos:", requirements.required_skills),
+        ("Diferenciais:", requirements.nice_to_have_skills),
+        ("Responsabilidades:", requirements.responsibilities),
+    ):
+        if items:
+            lines.append(title)
+            lines.extend(f"- {item}" for item in items)
+    return "\n".join(lines)
+
+
+class JobPostingRegistry:
+    """Parsed job postings keyed by the content id of their description.
+
+    Entries live in a cache backend (in memory, or SQLite to share them
+    between workers and keep them across restarts); the least recently used
+    are evicted first, after which their id is no longer found.
+    """
+
+    def __init__(self, store: CacheBackend):
+        self.store = store
+
+    def get(self, posting_id: str) -> Optional[JobPosting]:
+        posting = self.store.get(posting_id)
+        if posting is None or isinstance(posting, JobPosting):
+            return posting
+        # Disk stores hand back plain JSON
+        return JobPosting.model_validate(posting)
+
+    def require(self, posting_id: str) -> JobPosting:
+        """
+        Get a registered posting
+
+        Args:
+            posting_id (str): The id returned when the posting was registered
+
+        Returns:
+            JobPosting: The posting with its parsed requirements
+
+        Raises:
+            JobPostingNotFound: If no posting has this id
+        """
+        posting = self.get(posting_id)
+        if posting is None:
+            raise JobPostingNotFound(posting_id)
+        return posting
+
+    def put(self, posting: JobPosting) -> None:
+        self.store.set(posting.id, posting)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+def get_job_posting_registry() -> JobPostingRegistry:
+
+    global _registry
+    if _registry is None:
+        settings = get_settings()
+        if settings.job_postings_backend == "sqlite":
+            store = SQLiteCache(
+                path=settings.job_postings_sqlite_path,
+                max_entries=settings.job_postings_max_entries,
+            )
+        else:
+            store = MemoryCache(max_entries=settings.job_postings_max_entries)
+        _registry = JobPostingRegistry(store)
+    return _registry
+
+
+__all__ = [
+    "JobPostingNotFound",
+    "JobPostingRegistry",
+    "format_job_requirements",
+    "get_job_posting_registry",
+    "job_posting_id",
+]
@@ -0,0 +1,310 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+# Seconds; LLM calls take several seconds, local stages well under one
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0
+)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in list(self._values.items()):
+            yield self.name + "_total", dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in list(self._values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total) in list(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield self.name + "_bucket", {**labels, "le": le}, cumulative
+            yield self.name + "_count", labels, cumulative
+            yield self.name + "_sum", labels, total[0]
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._callbacks: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def register_callback(self, callback) -> None:
+        """
+        Register a collector evaluated at scrape time
+
+        Args:
+            callback: Returns (name, kind, documentation, samples) tuples for
+                values owned elsewhere, e.g. cache hit counters
+        """
+        self._callbacks.append(callback)
+
+    def render(self) -> str:
+        families = [
+            (m.name, m.kind, m.documentation, m.samples()) for m in self._metrics
+        ]
+        for callback in self._callbacks:
+            families.extend(callback())
+
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests", "HTTP requests handled", ("method", "path", "status")
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "path")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "cv_stage_duration_seconds",
+    "Time spent per CV generation stage (validation, prompt, upstream, parse, serialize)",
+    ("stage",),
+)
+GENERATION_ERRORS = REGISTRY.counter(
+    "cv_generation_errors", "Failed CV generations by error class", ("error_class",)
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "gemini_upstream_requests", "Calls to the LLM backend by outcome", ("status",)
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "gemini_upstream_retries", "Retried LLM calls by the error that caused the retry", ("status",)
+)
+HEDGED_REQUESTS = REGISTRY.counter(
+    "gemini_hedged_requests", "Duplicate LLM requests sent after the latency threshold and how many won", ("result",)
+)
+UPSTREAM_TOKENS = REGISTRY.counter(
+    "gemini_upstream_tokens", "Tokens reported by the LLM backend by kind (prompt, output, cached, thoughts)", ("model", "kind")
+)
+CIRCUIT_BREAKER_STATE = REGISTRY.gauge(
+    "gemini_circuit_breaker_state", "LLM circuit breaker state (0 closed, 1 open, 2 half-open)"
+)
+CIRCUIT_BREAKER_REJECTIONS = REGISTRY.counter(
+    "gemini_circuit_breaker_rejections", "LLM calls failed fast because the circuit was open"
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    "cv_llm_requests_in_flight", "Upstream LLM calls currently holding an admission slot"
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "cv_admission_queue_depth", "Upstream calls waiting for an LLM slot", ("priority",)
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "cv_admission_wait_seconds", "Time spent waiting for an LLM slot", ("priority",)
+)
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "cv_admission_rejections", "Requests and upstream calls turned away by admission control", ("reason", "priority")
+)
+NEAR_DUPLICATE_LOOKUPS = REGISTRY.counter(
+    "cv_near_duplicate_lookups",
+    "Near-duplicate lookups after an exact cache miss (hit, miss, or evicted from the cache)",
+    ("result",),
+)
+COMPATIBILITY_SCORE_DIVERGENCE = REGISTRY.histogram(
+    "cv_compatibility_score_divergence",
+    "Absolute difference between the LLM and the local compatibility score",
+    buckets=(1.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 50.0, 100.0),
+)
+
+_handler_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "handler_started", default=None
+)
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that remembers when request handling started.
+
+    Endpoints call ``mark_validated()`` first thing, which records the time
+    spent reading and validating the body as the "validation" stage.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def instrumented_handler(request):
+            token = _handler_started.set(time.perf_counter())
+            try:
+                return await handler(request)
+            finally:
+                _handler_started.reset(token)
+
+        return instrumented_handler
+
+
+def mark_validated() -> None:
+    started = _handler_started.get()
+    if started is not None:
+        STAGE_DURATION.observe(time.perf_counter() - started, stage="validation")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting requests, latency and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope.get("method", "")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, method=method, path=path
+            )
+            HTTP_REQUESTS.inc(method=method, path=path, status=str(status["code"]))
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "InstrumentedRoute",
+    "MetricsMiddleware",
+    "REGISTRY",
+    "Registry",
+    "mark_validated",
+]
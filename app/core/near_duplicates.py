@@ -0,0 +1,174 @@
+import re
+import threading
+from array import array
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.matching.skills import fold
+
+FINGERPRINT_BITS = 64
+SHINGLE_WORDS = 3
+
+_WORD = re.compile(r"\w+")
+_MASK64 = (1 << FINGERPRINT_BITS) - 1
+_BIT_POSITIONS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def simhash(text: str, shingle_words: int = SHINGLE_WORDS) -> int:
+    """
+    64-bit SimHash of a text over its overlapping word shingles
+
+    Texts sharing most of their shingles get fingerprints that differ in few
+    bits. Shingles are hashed with Python's str hash, which is salted per
+    process: fingerprints are only comparable within one process.
+
+    Args:
+        text (str): Free text; case and accents are ignored
+        shingle_words (int): Words per shingle
+
+    Returns:
+        int: The fingerprint, 0 for text without words
+    """
+    words = _WORD.findall(fold(text))
+    if not words:
+        return 0
+    shingles = {
+        " ".join(words[i : i + shingle_words])
+        for i in range(max(len(words) - shingle_words + 1, 1))
+    }
+    hashes = np.fromiter(
+        (hash(shingle) & _MASK64 for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    ones = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).sum(axis=0)
+    return sum(1 << int(bit) for bit in np.flatnonzero(ones * 2 > len(shingles)))
+
+
+class SimHashIndex:
+    """Finds a recent entry whose text is within a similarity threshold.
+
+    Similarity is ``1 - hamming_distance / 64`` between SimHash fingerprints.
+    Fingerprints are split into ``max_distance + 1`` bands: two fingerprints
+    within ``max_distance`` bits agree exactly on at least one band, so the
+    band buckets (LSH banding) yield every candidate without a full scan.
+    Only entries of the same ``scope`` match, which keeps the fields that
+    must be identical (name, contact, job posting) out of the fuzzy part.
+
+    Entries live in fixed-size ring buffers; the oldest is overwritten first
+    and entries older than ``ttl_seconds`` are ignored. Values are short
+    ASCII keys (such as cache keys) stored in ``value_bytes`` bytes each.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_entries: int,
+        ttl_seconds: float = 0,
+        value_bytes: int = 64,
+    ):
+        self.threshold = threshold
+        self.max_distance = max(int((1 - threshold) * FINGERPRINT_BITS), 0)
+        edges = np.linspace(0, FINGERPRINT_BITS, self.max_distance + 2).astype(int)
+        self._bands = [
+            (int(low), (1 << int(high - low)) - 1)
+            for low, high in zip(edges[:-1], edges[1:])
+        ]
+        self.max_entries = max(max_entries, 1)
+        self.ttl_seconds = ttl_seconds
+        self._fingerprints = np.zeros(self.max_entries, dtype=np.uint64)
+        self._scopes = np.zeros(self.max_entries, dtype=np.uint64)
+        self._added = np.zeros(self.max_entries, dtype=np.float64)
+        self._values = np.zeros(self.max_entries, dtype=f"S{value_bytes}")
+        # Band value -> slots, as compact int64 arrays numpy can view directly
+        self._buckets: List[Dict[int, array]] = [{} for _ in self._bands]
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, scope: str, text: str, value: str) -> None:
+        """
+        Index a text under a scope
+
+        Args:
+            scope (str): Exact-match part of the entry
+            text (str): Text compared by similarity
+            value (str): What lookup returns for this entry, e.g. a cache key
+        """
+        self.insert(scope, simhash(text), value)
+
+    def insert(self, scope: str, fingerprint: int, value: str) -> None:
+        """add() for an already computed fingerprint"""
+        with self._lock:
+            slot = self._next
+            self._next = (slot + 1) % self.max_entries
+            if self._size == self.max_entries:
+                self._unlink(slot, int(self._fingerprints[slot]))
+            else:
+                self._size += 1
+            self._fingerprints[slot] = fingerprint
+            self._scopes[slot] = hash(scope) & _MASK64
+            self._added[slot] = time.monotonic()
+            self._values[slot] = value.encode("ascii")
+            for buckets, band in zip(self._buckets, self._band_values(fingerprint)):
+                buckets.setdefault(band, array("q")).append(slot)
+
+    def lookup(self, scope: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar live entry of a scope
+
+        Args:
+            scope (str): Exact-match part of the query
+            text (str): Text compared by similarity
+
+        Returns:
+            Optional[Tuple[str, float]]: The entry's value and its similarity,
+            or None when nothing reaches the threshold
+        """
+        return self.nearest(scope, simhash(text))
+
+    def nearest(self, scope: str, fingerprint: int) -> Optional[Tuple[str, float]]:
+        """lookup() for an already computed fingerprint"""
+        with self._lock:
+            found = [
+                buckets[band]
+                for buckets, band in zip(self._buckets, self._band_values(fingerprint))
+                if band in buckets
+            ]
+            if not found:
+                return None
+            # A slot found through several bands is simply checked more than once
+            candidates = np.concatenate(
+                [np.frombuffer(slots, dtype=np.int64) for slots in found]
+            )
+            distances = np.bitwise_count(
+                self._fingerprints[candidates] ^ np.uint64(fingerprint)
+            ).astype(np.int64)
+            eligible = (self._scopes[candidates] == np.uint64(hash(scope) & _MASK64)) & (
+                distances <= self.max_distance
+            )
+            if self.ttl_seconds:
+                eligible &= self._added[candidates] >= time.monotonic() - self.ttl_seconds
+            if not eligible.any():
+                return None
+            best = np.flatnonzero(eligible)[np.argmin(distances[eligible])]
+            value = self._values[candidates[best]].decode("ascii")
+        return value, 1 - int(distances[best]) / FINGERPRINT_BITS
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> low) & mask for low, mask in self._bands]
+
+    def _unlink(self, slot: int, fingerprint: int) -> None:
+        for buckets, band in zip(self._buckets, self._band_values(fingerprint)):
+            bucket = buckets[band]
+            bucket.remove(slot)
+            if not bucket:
+                del buckets[band]
+
+
+__all__ = ["SimHashIndex", "simhash"]
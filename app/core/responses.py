@@ -0,0 +1,49 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # optional; pydantic-core handles everything on its own
+    orjson = None
+
+
+def _holds_models(content: Any) -> bool:
+    """Shallow check for pydantic models, enough for the API's response envelopes"""
+    if isinstance(content, BaseModel):
+        return True
+    if isinstance(content, dict):
+        return any(isinstance(value, BaseModel) for value in content.values())
+    return False
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize API output to JSON in a single pass
+
+    Pydantic models (e.g. a CVResponse in ``cv_content``) are serialized by
+    pydantic-core straight from the model, without an intermediate dict;
+    other data goes through orjson when it is installed, with models nested
+    deeper (batch results) converted by pydantic-core.
+
+    Args:
+        content (Any): Models, dicts, lists and scalars
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    if orjson is not None and not _holds_models(content):
+        return orjson.dumps(content, default=to_jsonable_python)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with pydantic-core / orjson instead of json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+__all__ = ["FastJSONResponse", "dumps"]
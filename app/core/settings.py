@@ -12,9 +12,125 @@ _settings = None
 class Settings:
     google_api_key: Optional[str] = os.getenv("GOOGLE_API_KEY")
     gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    llm_backend: str = os.getenv("LLM_BACKEND", "gemini")
+    fake_latency_ms: float = float(os.getenv("FAKE_LATENCY_MS", "1500"))
+    fake_jitter_ms: float = float(os.getenv("FAKE_JITTER_MS", "500"))
+    fake_error_rate: float = float(os.getenv("FAKE_ERROR_RATE", "0"))
+    fake_list_items: int = int(os.getenv("FAKE_LIST_ITEMS", "3"))
+    fake_string_words: int = int(os.getenv("FAKE_STRING_WORDS", "12"))
+    fake_ms_per_output_token: float = float(os.getenv("FAKE_MS_PER_OUTPUT_TOKEN", "0"))
+    fake_seed: Optional[int] = (
+        int(os.environ["FAKE_SEED"]) if os.getenv("FAKE_SEED") else None
+    )
+    gemini_max_attempts: int = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))
+    gemini_backoff_base_ms: float = float(os.getenv("GEMINI_BACKOFF_BASE_MS", "500"))
+    gemini_backoff_max_ms: float = float(os.getenv("GEMINI_BACKOFF_MAX_MS", "8000"))
+    gemini_deadline_seconds: float = float(os.getenv("GEMINI_DEADLINE_SECONDS", "90"))
+    gemini_hedge_enabled: bool = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() in (
+        "1",
+        "true",
+    )
+    gemini_hedge_percentile: float = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+    gemini_hedge_min_samples: int = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+    gemini_breaker_failure_threshold: int = int(
+        os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5")
+    )
+    gemini_breaker_reset_seconds: float = float(
+        os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30")
+    )
+    gemini_input_cost_per_million: float = float(
+        os.getenv("GEMINI_INPUT_COST_PER_MILLION", "0.30")
+    )
+    gemini_output_cost_per_million: float = float(
+        os.getenv("GEMINI_OUTPUT_COST_PER_MILLION", "2.50")
+    )
+    gemini_output_tokens_per_second: float = float(
+        os.getenv("GEMINI_OUTPUT_TOKENS_PER_SECOND", "150")
+    )
+    gemini_first_token_seconds: float = float(os.getenv("GEMINI_FIRST_TOKEN_SECONDS", "2"))
+    gemini_pool_max_connections: int = int(os.getenv("GEMINI_POOL_MAX_CONNECTIONS", "100"))
+    gemini_pool_max_keepalive: int = int(os.getenv("GEMINI_POOL_MAX_KEEPALIVE", "20"))
+    gemini_keepalive_expiry_seconds: float = float(
+        os.getenv("GEMINI_KEEPALIVE_EXPIRY_SECONDS", "60")
+    )
+    gemini_http2: bool = os.getenv("GEMINI_HTTP2", "false").lower() in ("1", "true")
+    gemini_warmup_enabled: bool = os.getenv("GEMINI_WARMUP_ENABLED", "true").lower() in (
+        "1",
+        "true",
+    )
+    service_preload: bool = os.getenv("SERVICE_PRELOAD", "true").lower() in ("1", "true")
     host: str = os.getenv("HOST", "0.0.0.0")
     port: int = int(os.getenv("PORT", "8000"))
     debug: bool = os.getenv("DEBUG", "false").lower() in ("1", "true")
+    cache_enabled: bool = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true")
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_sqlite_path: str = os.getenv("CACHE_SQLITE_PATH", "cv_cache.sqlite3")
+    near_duplicate_enabled: bool = os.getenv("NEAR_DUPLICATE_ENABLED", "false").lower() in (
+        "1",
+        "true",
+    )
+    near_duplicate_threshold: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+    near_duplicate_max_entries: int = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "100000"))
+    job_postings_backend: str = os.getenv("JOB_POSTINGS_BACKEND", "memory")
+    job_postings_max_entries: int = int(os.getenv("JOB_POSTINGS_MAX_ENTRIES", "10000"))
+    job_postings_sqlite_path: str = os.getenv(
+        "JOB_POSTINGS_SQLITE_PATH", "job_postings.sqlite3"
+    )
+    prompt_compaction_enabled: bool = os.getenv(
+        "PROMPT_COMPACTION_ENABLED", "true"
+    ).lower() in ("1", "true")
+    prompt_field_token_budget: int = int(os.getenv("PROMPT_FIELD_TOKEN_BUDGET", "2000"))
+    prompt_field_token_budgets: str = os.getenv("PROMPT_FIELD_TOKEN_BUDGETS", "")
+    prompt_total_token_budget: int = int(os.getenv("PROMPT_TOTAL_TOKEN_BUDGET", "6000"))
+    prompt_budget_policy: str = os.getenv("PROMPT_BUDGET_POLICY", "truncate")
+    split_generation: bool = os.getenv("SPLIT_GENERATION", "false").lower() in (
+        "1",
+        "true",
+    )
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "16"))
+    compare_max_jobs: int = int(os.getenv("COMPARE_MAX_JOBS", "50"))
+    compare_concurrency: int = int(os.getenv("COMPARE_CONCURRENCY", "8"))
+    jobs_sqlite_path: str = os.getenv("JOBS_SQLITE_PATH", "jobs.sqlite3")
+    jobs_workers: int = int(os.getenv("JOBS_WORKERS", "8"))
+    jobs_max_pending: int = int(os.getenv("JOBS_MAX_PENDING", "10000"))
+    jobs_lease_seconds: float = float(os.getenv("JOBS_LEASE_SECONDS", "60"))
+    jobs_max_attempts: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    jobs_retention_hours: float = float(os.getenv("JOBS_RETENTION_HOURS", "168"))
+    jobs_poll_interval_seconds: float = float(os.getenv("JOBS_POLL_INTERVAL_SECONDS", "1"))
+    admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in (
+        "1",
+        "true",
+    )
+    admission_max_in_flight: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+    admission_interactive_queue: int = int(os.getenv("ADMISSION_INTERACTIVE_QUEUE", "128"))
+    admission_batch_queue: int = int(os.getenv("ADMISSION_BATCH_QUEUE", "64"))
+    admission_queue_timeout_seconds: float = float(
+        os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")
+    )
+    rate_limit_per_minute: float = float(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    rate_limit_burst: int = int(os.getenv("RATE_LIMIT_BURST", "10"))
+    api_keys: str = os.getenv("API_KEYS", "")
+    admin_api_key: str = os.getenv("ADMIN_API_KEY", "")
+    usage_ledger_enabled: bool = os.getenv("USAGE_LEDGER_ENABLED", "true").lower() in (
+        "1",
+        "true",
+    )
+    usage_sqlite_path: str = os.getenv("USAGE_SQLITE_PATH", "usage.sqlite3")
+    usage_flush_interval_seconds: float = float(
+        os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "5")
+    )
+    usage_retention_days: float = float(os.getenv("USAGE_RETENTION_DAYS", "30"))
+    usage_daily_token_budget: int = int(os.getenv("USAGE_DAILY_TOKEN_BUDGET", "0"))
+    usage_client_token_budgets: str = os.getenv("USAGE_CLIENT_TOKEN_BUDGETS", "")
+    local_scoring_mode: str = os.getenv("LOCAL_SCORING_MODE", "crosscheck")
+    skills_dictionary_path: str = os.getenv("SKILLS_DICTIONARY_PATH", "")
+    learning_resources_path: str = os.getenv("LEARNING_RESOURCES_PATH", "")
+    learning_resources_per_skill: int = int(os.getenv("LEARNING_RESOURCES_PER_SKILL", "2"))
+    learning_resources_max: int = int(os.getenv("LEARNING_RESOURCES_MAX", "6"))
 
 
 def get_settings() -> Settings:
@@ -0,0 +1,63 @@
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    upstream_calls: int = 0
+    saved_calls: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the work as a task; every caller that
+    arrives while it is still running awaits the same task and receives the
+    same result or exception. The task is shielded, so a caller that goes
+    away (e.g. client disconnect) does not cancel the work for the others.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key (str): Identity of the call, e.g. the normalized request hash
+            fn (Callable[[], Awaitable[T]]): Factory for the upstream coroutine
+
+        Returns:
+            T: The shared result
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats.upstream_calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.stats.saved_calls += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def _finish(self, key: str, task: "asyncio.Task") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+
+__all__ = ["SingleFlight", "SingleFlightStats"]
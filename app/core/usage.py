@@ -0,0 +1,450 @@
+import asyncio
+import contextvars
+import math
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.clients import client_id
+from app.core.metrics import UPSTREAM_TOKENS
+from app.core.settings import get_settings
+
+_ledger = None
+_budgets = None
+
+# Columns a summary can be grouped by
+GROUP_COLUMNS = ("client", "model", "endpoint")
+
+
+@dataclass(frozen=True)
+class UsageContext:
+    client: str = "internal"
+    endpoint: str = "internal"
+
+
+_usage_context: contextvars.ContextVar[UsageContext] = contextvars.ContextVar(
+    "usage_context", default=UsageContext()
+)
+
+
+@contextmanager
+def attribute_usage(client: str, endpoint: str):
+    """Attribute the LLM usage of the enclosed code (and the tasks it starts) to a client and endpoint"""
+    token = _usage_context.set(UsageContext(client, endpoint))
+    try:
+        yield
+    finally:
+        _usage_context.reset(token)
+
+
+def utc_day(timestamp: Optional[float] = None) -> str:
+    moment = datetime.fromtimestamp(
+        time.time() if timestamp is None else timestamp, tz=timezone.utc
+    )
+    return moment.strftime("%Y-%m-%d")
+
+
+def _count(usage, name: str) -> int:
+    # The SDK leaves counts it does not report as None
+    return int(getattr(usage, name, None) or 0)
+
+
+def _percentiles(histogram: List[tuple], quantiles: tuple) -> Dict[str, float]:
+    """
+    Nearest-rank percentiles from (value, count) rows sorted by value
+
+    Args:
+        histogram (List[tuple]): Distinct values and how many calls had each
+        quantiles (tuple): Percentiles to compute, e.g. (50, 95)
+
+    Returns:
+        Dict[str, float]: {"p50": ..., ...}, empty without rows
+    """
+    total = sum(count for _, count in histogram)
+    if not total:
+        return {}
+    result = {}
+    seen = 0
+    rows = iter(histogram)
+    value = None
+    for q in sorted(quantiles):
+        rank = max(math.ceil(q * total / 100), 1)
+        while seen < rank:
+            value, count = next(rows)
+            seen += count
+        result[f"p{q}"] = round(float(value), 1)
+    return result
+
+
+class UsageLedger:
+    """Token usage of every upstream call, attributed to client, model and endpoint.
+
+    Calls are buffered in memory and written to SQLite in batches by
+    flush() (run periodically by run_flusher()), so recording costs no I/O
+    on the request path. Running per-client totals for the current UTC day
+    are kept in memory for budget checks and reloaded from the database on
+    start. Summaries flush first, so they include the latest calls.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = 30,
+        input_cost_per_million: float = 0.0,
+        output_cost_per_million: float = 0.0,
+    ):
+        self.path = path
+        self.retention_days = retention_days
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                ts REAL NOT NULL,
+                day TEXT NOT NULL,
+                client TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cached_tokens INTEGER NOT NULL,
+                thoughts_tokens INTEGER NOT NULL,
+                duration REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_ts ON usage (ts)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_usage_day_client ON usage (day, client)"
+        )
+        self._conn.commit()
+
+        self._day = utc_day()
+        self._daily: Dict[str, int] = dict(
+            self._conn.execute(
+                "SELECT client, SUM(prompt_tokens + output_tokens + thoughts_tokens) "
+                "FROM usage WHERE day = ? GROUP BY client",
+                (self._day,),
+            ).fetchall()
+        )
+
+    def record(self, model: str, usage: Any, duration: float) -> None:
+        """
+        Record the usage metadata of one upstream response
+
+        Args:
+            model (str): The model that served the call
+            usage: The response's usage_metadata; None is ignored
+            duration (float): Seconds the call took
+        """
+        if usage is None:
+            return
+        counts = {
+            "prompt": _count(usage, "prompt_token_count"),
+            "output": _count(usage, "candidates_token_count"),
+            "cached": _count(usage, "cached_content_token_count"),
+            "thoughts": _count(usage, "thoughts_token_count"),
+        }
+        for kind, count in counts.items():
+            if count:
+                UPSTREAM_TOKENS.inc(count, model=model, kind=kind)
+
+        context = _usage_context.get()
+        now = time.time()
+        day = utc_day(now)
+        with self._lock:
+            if day != self._day:
+                self._day = day
+                self._daily = {}
+            self._daily[context.client] = (
+                self._daily.get(context.client, 0)
+                + counts["prompt"]
+                + counts["output"]
+                + counts["thoughts"]
+            )
+            self._pending.append(
+                (
+                    now,
+                    day,
+                    context.client,
+                    context.endpoint,
+                    model,
+                    counts["prompt"],
+                    counts["output"],
+                    counts["cached"],
+                    counts["thoughts"],
+                    duration,
+                )
+            )
+
+    def used_today(self, client: str) -> int:
+        """Tokens (prompt, output and thoughts) a client used in the current UTC day"""
+        with self._lock:
+            if utc_day() != self._day:
+                return 0
+            return self._daily.get(client, 0)
+
+    def today(self) -> Dict[str, int]:
+        """Tokens used per client in the current UTC day"""
+        with self._lock:
+            return dict(self._daily) if utc_day() == self._day else {}
+
+    def clients(self) -> List[str]:
+        """Every client id with recorded usage, buffered calls included"""
+        with self._lock:
+            clients = {row[2] for row in self._pending}
+        with self._db_lock:
+            clients.update(
+                row[0] for row in self._conn.execute("SELECT DISTINCT client FROM usage")
+            )
+        return sorted(clients)
+
+    def flush(self) -> int:
+        """
+        Write the buffered calls to SQLite and drop rows past the retention
+
+        Returns:
+            int: Number of calls written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        with self._db_lock:
+            if pending:
+                self._conn.executemany(
+                    "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", pending
+                )
+            if self.retention_days:
+                self._conn.execute(
+                    "DELETE FROM usage WHERE ts < ?",
+                    (time.time() - self.retention_days * 86400,),
+                )
+            self._conn.commit()
+        return len(pending)
+
+    async def run_flusher(self, interval: float) -> None:
+        """Flush every ``interval`` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except sqlite3.Error as e:
+                print(f"Erro ao gravar o consumo de tokens: {e}")
+
+    def summary(
+        self,
+        since: float,
+        group_by: Optional[str] = None,
+        **filters: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Aggregate the calls made since a point in time
+
+        Args:
+            since (float): Epoch seconds
+            group_by (Optional[str]): "client", "model" or "endpoint" to also
+                break the totals down by that column
+            **filters: Exact client, model and/or endpoint to restrict to
+
+        Returns:
+            Dict[str, Any]: Totals, cost, output tokens per second of upstream
+            time, per-call token percentiles and, with group_by, the groups
+        """
+        self.flush()
+        where = ["ts >= ?"]
+        params: List[Any] = [since]
+        for column in GROUP_COLUMNS:
+            if filters.get(column):
+                where.append(f"{column} = ?")
+                params.append(filters[column])
+        condition = " AND ".join(where)
+
+        with self._db_lock:
+            totals = self._conn.execute(
+                f"SELECT {self._aggregates()} FROM usage WHERE {condition}", params
+            ).fetchone()
+            # One row per distinct token count, not per call: the transfer is
+            # bounded by the range of call sizes however many calls there were
+            per_call = self._conn.execute(
+                "SELECT prompt_tokens + output_tokens + thoughts_tokens AS tokens, COUNT(*) "
+                f"FROM usage WHERE {condition} GROUP BY tokens ORDER BY tokens",
+                params,
+            ).fetchall()
+            groups = (
+                self._conn.execute(
+                    f"SELECT {group_by}, {self._aggregates()} FROM usage "
+                    f"WHERE {condition} GROUP BY {group_by} ORDER BY 7 DESC",
+                    params,
+                ).fetchall()
+                if group_by in GROUP_COLUMNS
+                else []
+            )
+
+        result = self._totals(totals)
+        result["tokens_per_call"] = _percentiles(per_call, (50, 95, 99))
+        if group_by in GROUP_COLUMNS:
+            result["groups"] = [{group_by: row[0], **self._totals(row[1:])} for row in groups]
+        return result
+
+    @staticmethod
+    def _aggregates() -> str:
+        return (
+            "COUNT(*), COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(output_tokens), 0), "
+            "COALESCE(SUM(cached_tokens), 0), COALESCE(SUM(thoughts_tokens), 0), "
+            "COALESCE(SUM(prompt_tokens + output_tokens + thoughts_tokens), 0), "
+            "COALESCE(SUM(duration), 0)"
+        )
+
+    def _totals(self, row) -> Dict[str, Any]:
+        calls, prompt, output, cached, thoughts, total, duration = row
+        return {
+            "calls": calls,
+            "prompt_tokens": prompt,
+            "output_tokens": output,
+            "cached_tokens": cached,
+            "thoughts_tokens": thoughts,
+            "total_tokens": total,
+            "cost_usd": round(
+                (
+                    prompt * self.input_cost_per_million
+                    + (output + thoughts) * self.output_cost_per_million
+                )
+                / 1_000_000,
+                6,
+            ),
+            "output_tokens_per_second": (
+                round((output + thoughts) / duration, 1) if duration else 0.0
+            ),
+        }
+
+
+class TokenBudgets:
+    """Daily token budgets per client, checked against the ledger's running totals.
+
+    A budget of 0 means unlimited. The check happens before a request is
+    admitted, so the call that crosses the budget still completes; the
+    limit is per process when several workers share the ledger file.
+    """
+
+    def __init__(self, ledger: UsageLedger, default: int, per_client: Dict[str, int]):
+        self.ledger = ledger
+        self.default = default
+        self.per_client = per_client
+
+    def limit(self, client: str) -> int:
+        return self.per_client.get(client, self.default)
+
+    def retry_after(self, client: str) -> float:
+        """
+        Seconds until a client may call again
+
+        Args:
+            client (str): The client id of the request, as resolved by ClientIdentifier
+
+        Returns:
+            float: 0 within budget, otherwise the time until the next UTC day
+        """
+        limit = self.limit(client)
+        if not limit or self.ledger.used_today(client) < limit:
+            return 0.0
+        now = datetime.now(timezone.utc)
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (tomorrow - now).total_seconds()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Today's consumption of every client that used tokens or has its own budget"""
+        used = self.ledger.today()
+        clients = sorted(set(used) | set(self.per_client), key=lambda c: -used.get(c, 0))
+        return [
+            {
+                "client": client,
+                "used_tokens": used.get(client, 0),
+                "budget_tokens": self.limit(client),
+                "remaining_tokens": (
+                    max(self.limit(client) - used.get(client, 0), 0)
+                    if self.limit(client)
+                    else None
+                ),
+            }
+            for client in clients
+        ]
+
+
+class UsageMiddleware:
+    """Pure ASGI middleware attributing the LLM usage of a request to its client and path.
+
+    The client is identified as for rate limiting: by a configured X-API-Key,
+    whose hash is recorded, never the key itself; otherwise by IP.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with attribute_usage(client_id(scope), scope.get("path", "")):
+            await self.app(scope, receive, send)
+
+
+def parse_client_budgets(raw: str) -> Dict[str, int]:
+    """Parse "client=tokens,client=tokens" as used by USAGE_CLIENT_TOKEN_BUDGETS"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        client, _, value = item.rpartition("=")
+        budgets[client.strip()] = int(value)
+    return budgets
+
+
+def get_token_budgets() -> Optional[TokenBudgets]:
+
+    global _budgets
+    if _budgets is None:
+        ledger = get_usage_ledger()
+        if ledger is None:
+            return None
+        settings = get_settings()
+        _budgets = TokenBudgets(
+            ledger,
+            settings.usage_daily_token_budget,
+            parse_client_budgets(settings.usage_client_token_budgets),
+        )
+    return _budgets
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+
+    global _ledger
+    if _ledger is None:
+        settings = get_settings()
+        if not settings.usage_ledger_enabled:
+            return None
+        _ledger = UsageLedger(
+            path=settings.usage_sqlite_path,
+            retention_days=settings.usage_retention_days,
+            input_cost_per_million=settings.gemini_input_cost_per_million,
+            output_cost_per_million=settings.gemini_output_cost_per_million,
+        )
+    return _ledger
+
+
+__all__ = [
+    "TokenBudgets",
+    "UsageContext",
+    "UsageLedger",
+    "UsageMiddleware",
+    "attribute_usage",
+    "get_token_budgets",
+    "get_usage_ledger",
+    "parse_client_budgets",
+    "utc_day",
+]
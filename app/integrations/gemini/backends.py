@@ -0,0 +1,320 @@
+import asyncio
+import importlib.util
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+from app.core.settings import Settings
+
+# google-genai takes most of the app's import time; it is imported when a
+# backend is built or an error is raised, not when this module is loaded
+if TYPE_CHECKING:
+    from google.genai import types
+
+
+class LLMBackend:
+    """Transport GeminiClient uses to reach a model.
+
+    Implementations take the same (model, contents, config) arguments as
+    ``genai.Client.models.generate_content`` and return objects exposing at
+    least ``.text`` and ``.usage_metadata``.
+    """
+
+    def generate(
+        self, model: str, contents: str, config: "types.GenerateContentConfig"
+    ):
+        raise NotImplementedError
+
+    async def agenerate(
+        self, model: str, contents: str, config: "types.GenerateContentConfig"
+    ):
+        raise NotImplementedError
+
+    async def astream(
+        self, model: str, contents: str, config: "types.GenerateContentConfig"
+    ) -> AsyncIterator[Any]:
+        raise NotImplementedError
+        yield
+
+    async def warm_up(self, model: str) -> None:
+        """Open upstream connections ahead of the first request; no-op by default"""
+
+    async def aclose(self) -> None:
+        """Release pooled connections"""
+
+
+@dataclass
+class PoolOptions:
+    """Connection pool shared by every request of the process"""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+
+
+class GenAIBackend(LLMBackend):
+    """The real Gemini API through the google-genai SDK.
+
+    The SDK is handed our own sync and async httpx clients, so pool size,
+    keep-alive expiry and HTTP/2 are configurable and the connections can
+    be warmed up at startup and closed at shutdown.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout_ms: Optional[int] = None,
+        pool: Optional[PoolOptions] = None,
+    ):
+        import httpx
+        from google import genai
+        from google.genai import types
+
+        pool = pool or PoolOptions()
+        http2 = pool.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("GEMINI_HTTP2 ignorado: instale o pacote 'h2' para usar HTTP/2.")
+            http2 = False
+        limits = httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive_connections,
+            keepalive_expiry=pool.keepalive_expiry,
+        )
+        self.http_client = httpx.Client(
+            limits=limits, http2=http2, follow_redirects=True
+        )
+        self.async_http_client = httpx.AsyncClient(
+            limits=limits, http2=http2, follow_redirects=True
+        )
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=timeout_ms,
+                httpx_client=self.http_client,
+                httpx_async_client=self.async_http_client,
+            ),
+        )
+
+    def generate(self, model, contents, config):
+        return self.client.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    async def agenerate(self, model, contents, config):
+        return await self.client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    async def astream(self, model, contents, config):
+        stream = await self.client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+        async for chunk in stream:
+            yield chunk
+
+    async def warm_up(self, model):
+        # Model metadata is free to fetch and goes through the same DNS, TLS
+        # and HTTP setup as a generation
+        await self.client.aio.models.get(model=model)
+
+    async def aclose(self):
+        await self.async_http_client.aclose()
+        self.http_client.close()
+
+
+@dataclass
+class FakeUsage:
+    prompt_token_count: int
+    candidates_token_count: int
+    cached_content_token_count: int = 0
+
+    @property
+    def total_token_count(self) -> int:
+        return self.prompt_token_count + self.candidates_token_count
+
+
+@dataclass
+class FakeResponse:
+    text: str
+    usage_metadata: Optional[FakeUsage] = None
+
+
+@dataclass
+class FakeGeminiBackend(LLMBackend):
+    """Offline stand-in for Gemini used for load tests and profiling.
+
+    Builds a response that is valid for whatever ``response_schema`` the
+    config carries, after sleeping ``latency_ms`` +/- ``jitter_ms``.
+    ``error_rate`` is the probability of raising a 503 ServerError, and
+    ``list_items``/``string_words`` control the response size. Like a real
+    model, latency can grow with output length via ``ms_per_output_token``.
+    """
+
+    latency_ms: float = 1500.0
+    jitter_ms: float = 500.0
+    error_rate: float = 0.0
+    list_items: int = 3
+    string_words: int = 12
+    ms_per_output_token: float = 0.0
+    stream_chunks: int = 8
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False, repr=False)
+
+    WORDS = (
+        "desenvolveu liderou implementou otimizou sistema api plataforma equipe "
+        "resultados projeto python react dados nuvem clientes performance "
+        "arquitetura entregas automação qualidade"
+    ).split()
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def generate(self, model, contents, config):
+        response, error = self._prepare(contents, config)
+        time.sleep(self._delay(response))
+        if error:
+            raise error
+        return response
+
+    async def agenerate(self, model, contents, config):
+        response, error = self._prepare(contents, config)
+        await asyncio.sleep(self._delay(response))
+        if error:
+            raise error
+        return response
+
+    async def astream(self, model, contents, config):
+        response, error = self._prepare(contents, config)
+        chunks = max(self.stream_chunks, 1)
+        delay = self._delay(response) / chunks
+        if error:
+            await asyncio.sleep(delay)
+            raise error
+        text = response.text
+        step = max(len(text) // chunks, 1)
+        starts = range(0, len(text), step)
+        for start in starts:
+            await asyncio.sleep(delay)
+            # Like the real API, the final chunk carries the usage totals
+            yield FakeResponse(
+                text=text[start : start + step],
+                usage_metadata=response.usage_metadata if start == starts[-1] else None,
+            )
+
+    def _delay(self, response: Optional[FakeResponse]) -> float:
+        jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        delay_ms = self.latency_ms + jitter
+        if response is not None and response.usage_metadata is not None:
+            delay_ms += (
+                self.ms_per_output_token * response.usage_metadata.candidates_token_count
+            )
+        return max(delay_ms, 0.0) / 1000.0
+
+    def _prepare(self, contents, config) -> tuple:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            from google.genai.errors import ServerError
+
+            return None, ServerError(
+                503,
+                {
+                    "error": {
+                        "code": 503,
+                        "message": "Fake backend injected error",
+                        "status": "UNAVAILABLE",
+                    }
+                },
+            )
+
+        schema = config.response_schema if config is not None else None
+        data = self._from_schema(schema or {}, (schema or {}).get("$defs", {}))
+        text = json.dumps(data, ensure_ascii=False)
+        response = FakeResponse(
+            text=text,
+            usage_metadata=FakeUsage(
+                prompt_token_count=len(str(contents)) // 4,
+                candidates_token_count=len(text) // 4,
+            ),
+        )
+        return response, None
+
+    def _from_schema(self, schema: dict, defs: dict) -> Any:
+        if "$ref" in schema:
+            return self._from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+
+        if "anyOf" in schema:
+            options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+            return self._from_schema(options[0], defs) if options else None
+
+        kind = schema.get("type")
+        if kind == "object" or "properties" in schema:
+            return {
+                name: self._from_schema(prop, defs)
+                for name, prop in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [
+                self._from_schema(schema.get("items", {}), defs)
+                for _ in range(self.list_items)
+            ]
+        if kind in ("number", "integer"):
+            low = schema.get("minimum", 0)
+            high = schema.get("maximum", 100)
+            value = self._rng.uniform(low, high)
+            return int(value) if kind == "integer" else round(value, 1)
+        if kind == "boolean":
+            return self._rng.random() < 0.5
+        if kind == "string":
+            return " ".join(self._rng.choices(self.WORDS, k=self.string_words))
+        return None
+
+
+def create_backend(settings: Settings, api_key: Optional[str]) -> LLMBackend:
+    """
+    Build the backend selected by LLM_BACKEND
+
+    Args:
+        settings (Settings): Application settings
+        api_key (Optional[str]): Gemini API key, required for the real backend
+
+    Returns:
+        LLMBackend: The configured backend
+    """
+    if settings.llm_backend == "fake":
+        return FakeGeminiBackend(
+            latency_ms=settings.fake_latency_ms,
+            jitter_ms=settings.fake_jitter_ms,
+            error_rate=settings.fake_error_rate,
+            list_items=settings.fake_list_items,
+            string_words=settings.fake_string_words,
+            ms_per_output_token=settings.fake_ms_per_output_token,
+            seed=settings.fake_seed,
+        )
+
+    if not api_key:
+        raise ValueError(
+            "GOOGLE_API_KEY não encontrada nas variáveis de ambiente ou settings."
+        )
+    # Bounds each blocking attempt; GeminiClient enforces the overall deadline
+    return GenAIBackend(
+        api_key=api_key,
+        timeout_ms=int(settings.gemini_deadline_seconds * 1000),
+        pool=PoolOptions(
+            max_connections=settings.gemini_pool_max_connections,
+            max_keepalive_connections=settings.gemini_pool_max_keepalive,
+            keepalive_expiry=settings.gemini_keepalive_expiry_seconds,
+            http2=settings.gemini_http2,
+        ),
+    )
+
+
+__all__ = [
+    "FakeGeminiBackend",
+    "FakeResponse",
+    "GenAIBackend",
+    "LLMBackend",
+    "PoolOptions",
+    "create_backend",
+]
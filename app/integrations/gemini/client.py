@@ -1,94 +1,372 @@
+import asyncio
+import contextlib
 import json
-from google import genai
-from google.genai import types
-from google.genai.errors import APIError
+import time
+from typing import AsyncIterator, Callable, Optional, Type, Union
+from pydantic import BaseModel, ValidationError
+from app.core.admission import AdmissionRejected, current_priority, get_admission_controller
+from app.core.metrics import (
+    CIRCUIT_BREAKER_REJECTIONS,
+    HEDGED_REQUESTS,
+    STAGE_DURATION,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_RETRIES,
+)
 from app.core.settings import get_settings
+from app.core.usage import get_usage_ledger
+from app.integrations.gemini.backends import LLMBackend, create_backend
+from app.integrations.gemini.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    hedged,
+    is_transient,
+)
+from app.integrations.gemini.schema_registry import get_schema_registry
+
+
+def _error_status(error: Exception) -> str:
+    """Metric label for an upstream error: the HTTP code for API errors, else the class"""
+    from google.genai.errors import APIError
+
+    return str(error.code) if isinstance(error, APIError) else type(error).__name__
 
 
 class GeminiClient:
-    def __init__(self, model: str = None, api_key: str = None):
+    def __init__(
+        self,
+        model: str = None,
+        api_key: str = None,
+        backend: Optional[LLMBackend] = None,
+    ):
         try:
             settings = get_settings()
             self.model = model or getattr(settings, "gemini_model", "gemini-2.5-flash")
             self.api_key = api_key or getattr(settings, "google_api_key", None)
-            if not self.api_key:
-                raise ValueError(
-                    "GOOGLE_API_KEY não encontrada nas variáveis de ambiente ou settings."
+            self.registry = get_schema_registry()
+            self.client = backend or create_backend(settings, self.api_key)
+            self.ledger = get_usage_ledger()
+            self.admission = get_admission_controller()
+            self.retry = RetryPolicy(
+                settings.gemini_max_attempts,
+                settings.gemini_backoff_base_ms / 1000,
+                settings.gemini_backoff_max_ms / 1000,
+            )
+            self.breaker = CircuitBreaker(
+                settings.gemini_breaker_failure_threshold,
+                settings.gemini_breaker_reset_seconds,
+            )
+            self.deadline = settings.gemini_deadline_seconds
+            self.latency = (
+                LatencyTracker(
+                    settings.gemini_hedge_percentile, settings.gemini_hedge_min_samples
                 )
-            self.client = genai.Client(api_key=self.api_key)
+                if settings.gemini_hedge_enabled
+                else None
+            )
         except Exception as e:
             print(f"Erro ao inicializar o Gemini Client: {e}")
             self.client = None
             raise
 
-    def _clean_schema(self, schema: dict) -> dict:
-        """Remove additionalProperties from the schema recursively"""
-        if not isinstance(schema, dict):
-            return schema
+    def _parse_response(
+        self, response, response_model: Type[BaseModel]
+    ) -> Union[BaseModel, dict]:
+        """Parse and validate the model output in one pass, straight from the JSON text"""
+        with STAGE_DURATION.time(stage="parse"):
+            if response.text:
+                return response_model.model_validate_json(response.text)
+        return {
+            "status": "error",
+            "error_class": "empty_response",
+            "message": "Resposta vazia da API do Gemini.",
+        }
 
-        cleaned = {}
-        for key, value in schema.items():
-            if key == "additionalProperties":
-                continue
-            elif isinstance(value, dict):
-                cleaned[key] = self._clean_schema(value)
-            elif isinstance(value, list):
-                cleaned[key] = [
-                    self._clean_schema(item) if isinstance(item, dict) else item
-                    for item in value
-                ]
-            else:
-                cleaned[key] = value
-        return cleaned
+    def _handle_error(self, error: Exception) -> dict:
+        if isinstance(error, AdmissionRejected):
+            return {
+                "status": "error",
+                "error_class": "overloaded",
+                "message": "O serviço está sobrecarregado. Tente novamente em instantes.",
+            }
 
-    def generate_json_response(
-        self, prompt: str, system_instruction: str, json_schema: dict
-    ) -> dict:
-        if not self.client:
-            return {"status": "error", "message": "Client não está inicializado."}
+        if isinstance(error, CircuitOpenError):
+            return {
+                "status": "error",
+                "error_class": "circuit_open",
+                "message": f"API do Gemini temporariamente indisponível: {error}",
+            }
 
-        # Clean the schema before sending to Gemini
-        clean_schema = self._clean_schema(json_schema)
+        if isinstance(error, TimeoutError):
+            return {
+                "status": "error",
+                "error_class": "deadline_exceeded",
+                "message": f"A API do Gemini não respondeu em {self.deadline:.0f}s.",
+            }
 
-        config = types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            response_mime_type="application/json",
-            response_schema=json_schema,
-        )
+        from google.genai.errors import APIError
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    response_mime_type="application/json",
-                    response_schema=clean_schema,
-                ),
-            )
+        if isinstance(error, APIError):
+            return {
+                "status": "error",
+                "error_class": f"api_error_{error.code}",
+                "message": f"Erro na API do Gemini: {error}",
+            }
 
-            if response.text:
-                return json.loads(response.text)
-            else:
+        if isinstance(error, ValidationError):
+            if any(item["type"] == "json_invalid" for item in error.errors()):
                 return {
                     "status": "error",
-                    "message": "Resposta vazia da API do Gemini.",
+                    "error_class": "invalid_json",
+                    "message": "Falha ao processar o JSON retornado pela LLM.",
                 }
+            return {
+                "status": "error",
+                "error_class": "invalid_schema",
+                "message": f"Resposta do Gemini fora do schema esperado ({error.error_count()} erros).",
+            }
 
-        except APIError as e:
-
-            return {"status": "error", "message": f"Erro na API do Gemini: {e}"}
-
-        except json.JSONDecodeError:
-
+        if isinstance(error, json.JSONDecodeError):
             return {
                 "status": "error",
+                "error_class": "invalid_json",
                 "message": "Falha ao processar o JSON retornado pela LLM.",
             }
 
+        return {
+            "status": "error",
+            "error_class": type(error).__name__,
+            "message": f"Erro inesperado no cliente Gemini: {error}",
+        }
+
+    def generate_json_response(
+        self, prompt: str, system_instruction: str, response_model: Type[BaseModel]
+    ) -> Union[BaseModel, dict]:
+        """Generate and validate a ``response_model`` instance; errors come back as a dict"""
+        if not self.client:
+            return {"status": "error", "message": "Client não está inicializado."}
+
+        config = self.registry.get_config(response_model, system_instruction, self.model)
+
+        try:
+            started = time.perf_counter()
+            with STAGE_DURATION.time(stage="upstream"):
+                response = self._call_with_retry(
+                    lambda: self.client.generate(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    )
+                )
+            self._record_usage(response.usage_metadata, time.perf_counter() - started)
+            return self._parse_response(response, response_model)
         except Exception as e:
+            return self._handle_error(e)
 
-            return {
-                "status": "error",
-                "message": f"Erro inesperado no cliente Gemini: {e}",
-            }
+    async def agenerate_json_response(
+        self, prompt: str, system_instruction: str, response_model: Type[BaseModel]
+    ) -> Union[BaseModel, dict]:
+        """Async variant of generate_json_response built on the backend's async call.
+
+        The call is awaited on the event loop instead of blocking a worker
+        thread, so many slow generations can be in flight at once. Besides
+        retries and the circuit breaker it enforces the deadline strictly and,
+        when enabled, hedges calls slower than the tracked latency percentile.
+        """
+        if not self.client:
+            return {"status": "error", "message": "Client não está inicializado."}
+
+        config = self.registry.get_config(response_model, system_instruction, self.model)
+
+        try:
+            started = time.perf_counter()
+            with STAGE_DURATION.time(stage="upstream"):
+                response = await self._acall_with_retry(
+                    lambda: self.client.agenerate(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    )
+                )
+            self._record_usage(response.usage_metadata, time.perf_counter() - started)
+            return self._parse_response(response, response_model)
+        except AdmissionRejected:
+            # Not an upstream error: routes answer it with a 429, batches
+            # with an error for the item
+            raise
+        except Exception as e:
+            return self._handle_error(e)
+
+    async def astream_json_response(
+        self, prompt: str, system_instruction: str, response_model: Type[BaseModel]
+    ) -> AsyncIterator[str]:
+        """Stream the raw JSON text as the model generates it.
+
+        Errors are raised to the caller, which decides how to report them
+        mid-stream; use _handle_error to turn them into a message. Streams
+        are not retried once started, but they count towards the circuit breaker.
+        """
+        if not self.client:
+            raise RuntimeError("Client não está inicializado.")
+
+        config = self.registry.get_config(response_model, system_instruction, self.model)
+        self._before_attempt()
+        async with self._slot():
+            started = time.perf_counter()
+            usage = None
+            try:
+                with STAGE_DURATION.time(stage="upstream_stream"):
+                    async for chunk in self.client.astream(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    ):
+                        # Totals so far; the last chunk that has them is final
+                        usage = chunk.usage_metadata or usage
+                        if chunk.text:
+                            yield chunk.text
+            except Exception as e:
+                self._record_failure(e)
+                raise
+        self._record_success()
+        self._record_usage(usage, time.perf_counter() - started)
+
+    async def awarm_up(self) -> float:
+        """
+        Open the upstream connection pool before the first real request
+
+        Returns:
+            float: Seconds the warm-up took
+
+        Raises:
+            Exception: Whatever the upstream raised; warm-up is not retried
+        """
+        started = time.perf_counter()
+        await asyncio.wait_for(self.client.warm_up(self.model), self.deadline)
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, stage="warmup")
+        return elapsed
+
+    async def aclose(self) -> None:
+        """Close the backend's pooled connections"""
+        if self.client:
+            await self.client.aclose()
+
+    def _record_usage(self, usage, elapsed: float) -> None:
+        """Add a response's token counts to the usage ledger, if enabled"""
+        if self.ledger is not None:
+            self.ledger.record(self.model, usage, elapsed)
+
+    def _before_attempt(self) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            CIRCUIT_BREAKER_REJECTIONS.inc()
+            raise
+
+    def _record_success(self, elapsed: Optional[float] = None) -> None:
+        UPSTREAM_REQUESTS.inc(status="ok")
+        self.breaker.record_success()
+        if elapsed is not None and self.latency is not None:
+            self.latency.observe(elapsed)
+
+    def _record_failure(self, error: Exception) -> None:
+        UPSTREAM_REQUESTS.inc(status=_error_status(error))
+        # Client errors (bad request, auth) say nothing about upstream health
+        if is_transient(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _should_retry(self, error: Exception, attempt: int, deadline: float) -> Optional[float]:
+        """Backoff before the next attempt, or None when the error is final"""
+        if not is_transient(error) or attempt >= self.retry.max_attempts:
+            return None
+        delay = self.retry.backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            return None
+        UPSTREAM_RETRIES.inc(status=_error_status(error))
+        return delay
+
+    def _call_with_retry(self, call: Callable):
+        """
+        Run a blocking upstream call with retries and the circuit breaker
+
+        Transient errors are retried with jittered exponential backoff while
+        attempts and time before the deadline remain. A blocking call cannot
+        be interrupted, so here the deadline only stops further retries; the
+        backend's HTTP timeout bounds each attempt.
+
+        Args:
+            call (Callable): Makes one upstream request
+
+        Returns:
+            The backend response; the last error is raised when all attempts fail
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._before_attempt()
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                response = call()
+            except Exception as e:
+                self._record_failure(e)
+                delay = self._should_retry(e, attempt, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._record_success(time.perf_counter() - started)
+            return response
+
+    async def _acall_with_retry(self, call: Callable):
+        """
+        Async variant of _call_with_retry; attempts are cut off at the deadline and may be hedged
+
+        Each attempt holds an admission slot (its hedge shares it); the
+        backoff between attempts does not.
+
+        Raises:
+            AdmissionRejected: If no slot could be had for an attempt
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self._before_attempt()
+            attempt += 1
+            async with self._slot():
+                try:
+                    # The attempt is cut off at the deadline (TimeoutError, not retried)
+                    response = await asyncio.wait_for(
+                        hedged(
+                            lambda: self._timed(call),
+                            self.latency.threshold() if self.latency is not None else None,
+                            lambda result: HEDGED_REQUESTS.inc(result=result),
+                        ),
+                        timeout=max(deadline - time.monotonic(), 0.0),
+                    )
+                except Exception as e:
+                    self._record_failure(e)
+                    delay = self._should_retry(e, attempt, deadline)
+                    if delay is None:
+                        raise
+                else:
+                    self._record_success()
+                    return response
+            await asyncio.sleep(delay)
+
+    def _slot(self):
+        """Admission slot for one upstream call, at the current request's priority"""
+        if self.admission is None:
+            return contextlib.nullcontext()
+        return self.admission.slot(current_priority())
+
+    async def _timed(self, call: Callable):
+        started = time.perf_counter()
+        response = await call()
+        if self.latency is not None:
+            self.latency.observe(time.perf_counter() - started)
+        return response
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Rough output model: a fixed JSON skeleton per section plus the candidate's
+# free text, which the model rewrites and expands into polished entries
+CV_OUTPUT_BASE_TOKENS = 350
+COMPATIBILITY_OUTPUT_TOKENS = 350
+OUTPUT_EXPANSION = 1.3
+
+# Upper bounds, in seconds, of the latency classes; anything slower is "slow"
+LATENCY_CLASSES = ((10.0, "fast"), (25.0, "standard"))
+
+
+@dataclass
+class CallEstimate:
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass
+class GenerationEstimate:
+    calls: List[CallEstimate]
+    cost_usd: float
+    latency_seconds: float
+    latency_class: str
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(call.input_tokens for call in self.calls)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(call.output_tokens for call in self.calls)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "calls": len(self.calls),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": self.cost_usd,
+            "latency_seconds": self.latency_seconds,
+            "latency_class": self.latency_class,
+        }
+
+
+def output_tokens(candidate_tokens: int, cv: bool = True, compatibility: bool = False) -> int:
+    """
+    Expected output tokens of one call
+
+    Args:
+        candidate_tokens (int): Tokens of the candidate's free text after compaction
+        cv (bool): Whether the call generates the CV
+        compatibility (bool): Whether the call generates the compatibility analysis
+
+    Returns:
+        int: Estimated output tokens
+    """
+    tokens = 0
+    if cv:
+        tokens += CV_OUTPUT_BASE_TOKENS + round(candidate_tokens * OUTPUT_EXPANSION)
+    if compatibility:
+        tokens += COMPATIBILITY_OUTPUT_TOKENS
+    return tokens
+
+
+class GenerationEstimator:
+    """Prices a generation and classifies its latency before anything is sent.
+
+    Calls of one generation run concurrently, so latency is that of the
+    call with the most output; output length, not input, dominates it.
+    Thinking tokens are not modelled.
+    """
+
+    def __init__(
+        self,
+        input_cost_per_million: float,
+        output_cost_per_million: float,
+        output_tokens_per_second: float,
+        first_token_seconds: float,
+    ):
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        self.output_tokens_per_second = max(output_tokens_per_second, 1.0)
+        self.first_token_seconds = first_token_seconds
+
+    def estimate(self, calls: List[CallEstimate]) -> GenerationEstimate:
+        cost = (
+            sum(call.input_tokens for call in calls) * self.input_cost_per_million
+            + sum(call.output_tokens for call in calls) * self.output_cost_per_million
+        ) / 1_000_000
+        latency = self.first_token_seconds + max(
+            (call.output_tokens for call in calls), default=0
+        ) / self.output_tokens_per_second
+        latency_class = next(
+            (name for bound, name in LATENCY_CLASSES if latency <= bound), "slow"
+        )
+        return GenerationEstimate(
+            calls=calls,
+            cost_usd=round(cost, 6),
+            latency_seconds=round(latency, 1),
+            latency_class=latency_class,
+        )
+
+
+__all__ = [
+    "CallEstimate",
+    "GenerationEstimate",
+    "GenerationEstimator",
+    "LATENCY_CLASSES",
+    "output_tokens",
+]
@@ -0,0 +1,199 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Free-text CVRequest fields that reach the prompt verbatim
+FREE_TEXT_FIELDS = (
+    "professional_experience",
+    "projects",
+    "education",
+    "skills",
+    "target_job_description",
+)
+
+# Gemini tokenizes Portuguese/English prose at roughly 4 characters per token
+CHARS_PER_TOKEN = 4
+
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_NON_WORD = re.compile(r"\W+")
+# Appended to truncated text; its length counts against the budget
+TRUNCATION_MARKER = " [...]"
+
+
+class PromptBudgetExceeded(ValueError):
+    """Raised when input exceeds a token budget and the policy is "reject" """
+
+    def __init__(self, field_name: str, tokens: int, budget: int):
+        self.field_name = field_name
+        self.tokens = tokens
+        self.budget = budget
+        super().__init__(
+            f"{field_name}: aproximadamente {tokens} tokens, acima do limite de {budget}"
+        )
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate used for budgeting; no tokenizer round trip"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_text(text: str) -> str:
+    """Strip indentation, collapse runs of spaces and keep single paragraph breaks"""
+    lines = [_INLINE_WHITESPACE.sub(" ", line).strip() for line in text.splitlines()]
+    return _BLANK_LINES.sub("\n", "\n".join(lines)).strip()
+
+
+def dedupe_sentences(text: str) -> str:
+    """Drop sentences already seen earlier in the text (case/punctuation-insensitive)"""
+    seen = set()
+    paragraphs = []
+    for paragraph in text.split("\n"):
+        kept = []
+        for sentence in _SENTENCE_SPLIT.split(paragraph):
+            key = _NON_WORD.sub(" ", sentence).strip().casefold()
+            if key and key in seen:
+                continue
+            seen.add(key)
+            kept.append(sentence)
+        if kept:
+            paragraphs.append(" ".join(kept))
+    return "\n".join(paragraphs)
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut text to fit the budget, marker included, preferring a sentence boundary"""
+    if len(text) <= budget * CHARS_PER_TOKEN:
+        return text
+    limit = budget * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    if limit <= 0:
+        # Too small a budget for the marker: a plain cut
+        return text[: budget * CHARS_PER_TOKEN]
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "), cut.rfind("\n"))
+    if boundary > limit // 2:
+        cut = cut[: boundary + 1]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+@dataclass
+class BudgetReport:
+    tokens_before: Dict[str, int] = field(default_factory=dict)
+    tokens_after: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+
+    @property
+    def total_before(self) -> int:
+        return sum(self.tokens_before.values())
+
+    @property
+    def total_after(self) -> int:
+        return sum(self.tokens_after.values())
+
+
+class PromptPreprocessor:
+    """Compacts free-text fields and enforces per-field and total token budgets.
+
+    With policy "truncate" oversized fields are cut (the largest first when
+    the total is over budget); with "reject" PromptBudgetExceeded is raised
+    so the request never reaches the model.
+    """
+
+    def __init__(
+        self,
+        compaction: bool = True,
+        field_budget: int = 0,
+        field_budgets: Optional[Dict[str, int]] = None,
+        total_budget: int = 0,
+        policy: str = "truncate",
+    ):
+        self.compaction = compaction
+        self.field_budget = field_budget
+        self.field_budgets = field_budgets or {}
+        self.total_budget = total_budget
+        self.policy = policy
+
+    def process(self, fields: Dict[str, Optional[str]]) -> tuple:
+        """
+        Compact and budget the free-text fields of a request
+
+        Args:
+            fields (Dict[str, Optional[str]]): Field name to raw text
+
+        Returns:
+            tuple: (processed fields, BudgetReport)
+        """
+        report = BudgetReport()
+        processed: Dict[str, Optional[str]] = {}
+
+        for name, text in fields.items():
+            if not text:
+                processed[name] = text
+                continue
+            report.tokens_before[name] = estimate_tokens(text)
+            if self.compaction:
+                text = dedupe_sentences(compact_text(text))
+
+            budget = self.field_budgets.get(name, self.field_budget)
+            tokens = estimate_tokens(text)
+            if budget and tokens > budget:
+                if self.policy == "reject":
+                    raise PromptBudgetExceeded(name, tokens, budget)
+                text = truncate_to_tokens(text, budget)
+                report.truncated.append(name)
+            processed[name] = text
+
+        self._enforce_total(processed, report)
+        report.tokens_after = {
+            name: estimate_tokens(text) for name, text in processed.items() if text
+        }
+        return processed, report
+
+    def _enforce_total(self, processed: Dict[str, Optional[str]], report: BudgetReport) -> None:
+        if not self.total_budget:
+            return
+        total = sum(estimate_tokens(text) for text in processed.values())
+        if total <= self.total_budget:
+            return
+        if self.policy == "reject":
+            raise PromptBudgetExceeded("total", total, self.total_budget)
+
+        # Shrink the largest fields first until the total fits; empty and
+        # missing fields have nothing to cut
+        present = [name for name, text in processed.items() if text]
+        for name in sorted(present, key=lambda n: -estimate_tokens(processed[n])):
+            excess = total - self.total_budget
+            if excess <= 0:
+                break
+            tokens = estimate_tokens(processed[name])
+            target = max(tokens - excess, 1)
+            processed[name] = truncate_to_tokens(processed[name], target)
+            total -= tokens - estimate_tokens(processed[name])
+            if name not in report.truncated:
+                report.truncated.append(name)
+
+
+def parse_field_budgets(raw: str) -> Dict[str, int]:
+    """Parse "field=tokens,field=tokens" as used by PROMPT_FIELD_TOKEN_BUDGETS"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, value = item.partition("=")
+        budgets[name.strip()] = int(value)
+    return budgets
+
+
+__all__ = [
+    "BudgetReport",
+    "FREE_TEXT_FIELDS",
+    "PromptBudgetExceeded",
+    "PromptPreprocessor",
+    "compact_text",
+    "dedupe_sentences",
+    "estimate_tokens",
+    "parse_field_budgets",
+    "truncate_to_tokens",
+]
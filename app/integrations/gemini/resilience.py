@@ -0,0 +1,183 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from app.core.metrics import CIRCUIT_BREAKER_STATE
+
+# Upstream status codes worth another attempt
+TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuito aberto após falhas seguidas; nova tentativa em {retry_after:.0f}s"
+        )
+
+
+def is_transient(error: Exception) -> bool:
+    """Errors that a later attempt may not hit: overload, 5xx, timeouts, dropped connections"""
+    # Imported here to keep the SDK off the import path; loaded by then anyway
+    import httpx
+    from google.genai.errors import APIError
+
+    if isinstance(error, APIError):
+        return error.code in TRANSIENT_STATUS_CODES
+    return isinstance(
+        error, (TimeoutError, ConnectionError, httpx.TimeoutException, httpx.TransportError)
+    )
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep uniform(0, min(cap, base * 2**n))"""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before the next attempt
+
+        Args:
+            attempt (int): Number of attempts made so far, starting at 1
+
+        Returns:
+            float: Seconds to wait
+        """
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive upstream failures.
+
+    While open every call is rejected with CircuitOpenError; after
+    ``reset_timeout`` seconds a single trial call is let through (half-open)
+    and its outcome closes or reopens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        CIRCUIT_BREAKER_STATE.set(_STATE_VALUES[CLOSED])
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            waited = now - self._opened_at
+            # Open long enough, or a half-open trial was cancelled before reporting back
+            if waited >= self.reset_timeout:
+                self._opened_at = now
+                self._set_state(HALF_OPEN)
+                return
+            raise CircuitOpenError(self.reset_timeout - waited)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self._failures >= self.failure_threshold > 0
+            ):
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_BREAKER_STATE.set(_STATE_VALUES[state])
+
+
+class LatencyTracker:
+    """Rolling window of upstream latencies used to decide when to hedge"""
+
+    def __init__(self, percentile: float, min_samples: int, window: int = 500):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def threshold(self) -> Optional[float]:
+        """The configured latency percentile, or None until enough samples exist"""
+        if len(self._samples) < max(self.min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)]
+
+
+async def hedged(
+    call: Callable[[], Awaitable], delay: Optional[float], on_hedge: Callable[[str], None]
+):
+    """
+    Await call(), starting a duplicate if the first has not finished after delay
+
+    Args:
+        call (Callable[[], Awaitable]): Starts one upstream request
+        delay (Optional[float]): Seconds before hedging; None disables it
+        on_hedge (Callable[[str], None]): Invoked with "sent" when the
+            duplicate is started and "won" when it finishes first
+
+    Returns:
+        The first successful result; the slower request is cancelled. If
+        both fail, the first request's error is raised.
+    """
+    first = asyncio.ensure_future(call())
+    if delay is None:
+        return await first
+
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            on_hedge("sent")
+            tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        on_hedge("won")
+                    return task.result()
+        raise first.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LatencyTracker",
+    "RetryPolicy",
+    "hedged",
+    "is_transient",
+]
@@ -0,0 +1,107 @@
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple, Type
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+_registry = None
+
+
+def clean_schema(schema: dict) -> dict:
+    """Remove additionalProperties from the schema recursively"""
+    if not isinstance(schema, dict):
+        return schema
+
+    cleaned = {}
+    for key, value in schema.items():
+        if key == "additionalProperties":
+            continue
+        elif isinstance(value, dict):
+            cleaned[key] = clean_schema(value)
+        elif isinstance(value, list):
+            cleaned[key] = [
+                clean_schema(item) if isinstance(item, dict) else item
+                for item in value
+            ]
+        else:
+            cleaned[key] = value
+    return cleaned
+
+
+class SchemaRegistry:
+    """Builds cleaned response schemas and GenerateContentConfig objects once.
+
+    Both are pure functions of (response model, system instruction, model),
+    so they are memoized and shared by every request instead of being
+    regenerated from the pydantic model each time.
+    """
+
+    def __init__(self):
+        self._schemas: Dict[Type[BaseModel], dict] = {}
+        self._configs: Dict[
+            Tuple[Type[BaseModel], str, str], "types.GenerateContentConfig"
+        ] = {}
+        self._lock = threading.Lock()
+
+    def get_schema(self, response_model: Type[BaseModel]) -> dict:
+        """
+        Get the cleaned JSON schema for a response model
+
+        Args:
+            response_model (Type[BaseModel]): The pydantic model Gemini must produce
+
+        Returns:
+            dict: The JSON schema without additionalProperties
+        """
+        schema = self._schemas.get(response_model)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(response_model)
+                if schema is None:
+                    schema = clean_schema(response_model.model_json_schema())
+                    self._schemas[response_model] = schema
+        return schema
+
+    def get_config(
+        self, response_model: Type[BaseModel], system_instruction: str, model: str
+    ) -> "types.GenerateContentConfig":
+        """
+        Get the generation config for a response model
+
+        Args:
+            response_model (Type[BaseModel]): The pydantic model Gemini must produce
+            system_instruction (str): The system instruction sent with the prompt
+            model (str): The Gemini model name the config is used with
+
+        Returns:
+            types.GenerateContentConfig: A shared, read-only config object
+        """
+        key = (response_model, system_instruction, model)
+        config = self._configs.get(key)
+        if config is None:
+            from google.genai import types
+
+            schema = self.get_schema(response_model)
+            with self._lock:
+                config = self._configs.get(key)
+                if config is None:
+                    config = types.GenerateContentConfig(
+                        system_instruction=system_instruction,
+                        response_mime_type="application/json",
+                        response_schema=schema,
+                    )
+                    self._configs[key] = config
+        return config
+
+
+def get_schema_registry() -> SchemaRegistry:
+
+    global _registry
+    if _registry is None:
+        _registry = SchemaRegistry()
+    return _registry
+
+
+__all__ = ["SchemaRegistry", "clean_schema", "get_schema_registry"]
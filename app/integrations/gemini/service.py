@@ -1,10 +1,79 @@
-from typing import Dict
-from app.schemas.cv import CVRequest, CVResponse
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic_core import to_json
+from app.core.admission import AdmissionRejected
+from app.core.cache import CacheBackend, build_cache_key, get_cache
+from app.core.job_postings import (
+    JobPostingNotFound,
+    format_job_requirements,
+    get_job_posting_registry,
+    job_posting_id,
+)
+from app.core.metrics import (
+    COMPATIBILITY_SCORE_DIVERGENCE,
+    GENERATION_ERRORS,
+    NEAR_DUPLICATE_LOOKUPS,
+    STAGE_DURATION,
+)
+from app.core.near_duplicates import SimHashIndex
+from app.core.settings import get_settings
+from app.core.singleflight import SingleFlight
+from app.schemas.cv import (
+    CV_SECTION_MODELS,
+    CVRequest,
+    CVResponse,
+    GeneratedCompatibility,
+    GeneratedCV,
+    GeneratedCVResponse,
+    JobCompatibilityAnalysis,
+    JobComparisonRequest,
+    JobPosting,
+    JobRequirements,
+    SectionRegenerationRequest,
+    TargetJob,
+)
 from app.integrations.gemini.client import GeminiClient
+from app.integrations.gemini.estimate import (
+    CallEstimate,
+    GenerationEstimator,
+    output_tokens,
+)
+from app.integrations.gemini.prompt_budget import (
+    FREE_TEXT_FIELDS,
+    BudgetReport,
+    PromptBudgetExceeded,
+    PromptPreprocessor,
+    estimate_tokens,
+    parse_field_budgets,
+)
+from app.integrations.gemini.stream_parser import SectionStreamParser
+from app.matching.engine import SkillMatch, candidate_text, get_skill_matcher
+from app.matching.resources import get_resource_catalog
+
+_gemini_service = None
+_gemini_service_lock = threading.Lock()
 
 
 class GeminiService:
 
+    # Bump whenever the prompt wording changes so cached results are not reused
+    PROMPT_VERSION = "3"
+
+    # Candidate texts compared by similarity for near-duplicate reuse; every
+    # other field, the job posting included, must match exactly
+    NEAR_DUPLICATE_FIELDS = ("professional_experience", "projects", "education", "skills")
+
+    # Streamed only once local scoring has run (see astream_cv)
+    COMPATIBILITY_SECTION = "job_compatibility"
+
     BASE_SYSTEM_INSTRUCTION = """
     You are an expert CV generator and career advisor with deep knowledge of the tech industry. Your task is to:
 
@@ -31,7 +100,6 @@ class GeminiService:
         * Relevant projects
     - Identify skill gaps
     - Provide specific, actionable improvement suggestions
-    - Recommend learning resources (courses, tutorials, documentation)
     - Focus CV content to highlight relevant experience for the target role
 
     4. FORMAT THE RESPONSE:
@@ -41,7 +109,7 @@ class GeminiService:
     - All entries must be professional and polished
     - Include specific metrics and achievements where possible
     - Maintain truthfulness to original input while enhancing presentation
-    - Ensure all URLs and resources are relevant and specific
+    - Ensure all URLs are relevant and specific
     - Provide detailed, actionable improvement suggestions
     - Include project technologies in the technologies array
     
@@ -53,8 +121,98 @@ class GeminiService:
     - Ensure technologies are listed as separate items in the array
     """
 
-    def __init__(self):
+    SPLIT_CV_TASK = """
+
+TAREFA DESTA CHAMADA:
+Gere apenas o currículo (generated_cv), já destacando os pontos relevantes para a vaga alvo.
+A análise de compatibilidade é feita em uma chamada separada."""
+
+    SPLIT_COMPATIBILITY_TASK = """
+
+TAREFA DESTA CHAMADA:
+Gere apenas a análise de compatibilidade com a vaga alvo (job_compatibility).
+O currículo é gerado em uma chamada separada."""
+
+    SECTION_SYSTEM_INSTRUCTION = """
+    You are an expert CV writer. You receive one section of an existing CV and a new informal
+    description from the candidate. Rewrite only that section:
+    - Transform casual language into powerful professional statements
+    - Keep the current entries the new description does not replace or remove
+    - Maintain truthfulness to the input while enhancing presentation
+    - Write in the same language as the current CV
+    - If a target job description is provided, highlight what is relevant to it
+    Your response must be a JSON object that matches the specified schema exactly.
+    """
+
+    JOB_POSTING_SYSTEM_INSTRUCTION = """
+    You are an expert technical recruiter. Extract the structured requirements of a job posting:
+    - title: the role being offered
+    - seniority: the level asked for (e.g. Júnior, Pleno, Sênior), or "Não informado"
+    - min_years_experience: only when the posting states it
+    - required_skills: skills, tools and qualifications the posting requires
+    - nice_to_have_skills: the ones listed as a plus or differential
+    - responsibilities: the main duties, each as a short phrase
+    Keep skill names short, as written in the posting, and write in the language of the posting.
+    Your response must be a JSON object that matches the specified schema exactly.
+    """
+
+    def __init__(self, cache: Optional[CacheBackend] = None):
+        settings = get_settings()
         self.client = GeminiClient()
+        self.preprocessor = PromptPreprocessor(
+            compaction=settings.prompt_compaction_enabled,
+            field_budget=settings.prompt_field_token_budget,
+            field_budgets=parse_field_budgets(settings.prompt_field_token_budgets),
+            total_budget=settings.prompt_total_token_budget,
+            policy=settings.prompt_budget_policy,
+        )
+        self.cache = cache if cache is not None else get_cache()
+        self.singleflight = SingleFlight()
+        self.job_postings = get_job_posting_registry()
+        # Resubmissions with small edits reuse a cached result, so this needs the cache
+        self.near_duplicates = (
+            SimHashIndex(
+                settings.near_duplicate_threshold,
+                settings.near_duplicate_max_entries,
+                settings.cache_ttl_seconds,
+            )
+            if settings.near_duplicate_enabled and self.cache is not None
+            else None
+        )
+        self.split_generation = settings.split_generation
+        self.local_scoring_mode = settings.local_scoring_mode
+        self.matcher = get_skill_matcher() if self.local_scoring_mode != "off" else None
+        self.catalog = get_resource_catalog()
+        self.resources_per_skill = settings.learning_resources_per_skill
+        self.resources_max = settings.learning_resources_max
+        self.estimator = GenerationEstimator(
+            input_cost_per_million=settings.gemini_input_cost_per_million,
+            output_cost_per_million=settings.gemini_output_cost_per_million,
+            output_tokens_per_second=settings.gemini_output_tokens_per_second,
+            first_token_seconds=settings.gemini_first_token_seconds,
+        )
+        # Build the cleaned schemas and generation configs once, at startup;
+        # the schema and system instruction count as input tokens on every call
+        self._fixed_input_tokens = {}
+        for response_model in (GeneratedCVResponse, GeneratedCV, GeneratedCompatibility):
+            self.client.registry.get_config(
+                response_model, self.BASE_SYSTEM_INSTRUCTION, self.client.model
+            )
+            self._fixed_input_tokens[response_model] = estimate_tokens(
+                self.BASE_SYSTEM_INSTRUCTION
+            ) + estimate_tokens(json.dumps(self.client.registry.get_schema(response_model)))
+        for response_model in CV_SECTION_MODELS.values():
+            self.client.registry.get_config(
+                response_model, self.SECTION_SYSTEM_INSTRUCTION, self.client.model
+            )
+        self.client.registry.get_config(
+            JobRequirements, self.JOB_POSTING_SYSTEM_INSTRUCTION, self.client.model
+        )
+        self._schema_version = hashlib.sha256(
+            json.dumps(
+                self.client.registry.get_schema(GeneratedCVResponse), sort_keys=True
+            ).encode("utf-8")
+        ).hexdigest()[:12]
 
     def generate_cv(self, cv_request: CVRequest) -> Dict[str, str]:
         """
@@ -66,18 +224,719 @@ class GeminiService:
         Returns:
             Dict[str, str]: A dictionary containing either the CV content or an error message
         """
-        prompt = self._create_prompt(cv_request)
-        content = self.client.generate_json_response(
+        request_key = self._request_key(cv_request)
+        cached = self._cached_or_near_duplicate(cv_request, request_key)
+        if cached is not None:
+            return cached
+
+        with STAGE_DURATION.time(stage="prompt"):
+            prompt = self._create_prompt(cv_request)
+        if self._use_split(cv_request):
+            content = self._generate_split(prompt)
+        else:
+            content = self.client.generate_json_response(
+                prompt=prompt,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCVResponse,
+            )
+
+        content = self._complete_compatibility(cv_request, content)
+        return self._store_result(
+            request_key, self._wrap_content(content), cv_request
+        )
+
+    async def agenerate_cv(self, cv_request: CVRequest) -> Dict[str, str]:
+        """
+        Generate a CV using the Gemini model without blocking the event loop
+
+        Args:
+            cv_request (CVRequest): The CV request containing user information
+
+        Returns:
+            Dict[str, str]: A dictionary containing either the CV content or an error message
+        """
+        request_key = self._request_key(cv_request)
+        cached = await self._acache_lookup(cv_request, request_key)
+        if cached is not None:
+            return cached
+
+        # Identical requests arriving while this one is in flight share its call
+        return await self.singleflight.do(
+            request_key, lambda: self._agenerate_uncached(cv_request, request_key)
+        )
+
+    async def agenerate_many(
+        self, cv_requests: Dict[int, CVRequest], concurrency: int
+    ) -> AsyncIterator[Tuple[int, Dict[str, str]]]:
+        """
+        Generate several CVs concurrently, yielding each one as it finishes
+
+        Args:
+            cv_requests (Dict[int, CVRequest]): Validated requests keyed by their
+                position in the caller's batch
+            concurrency (int): Maximum number of generations in flight at once
+
+        Yields:
+            Tuple[int, Dict[str, str]]: The batch position and its result, in
+            completion order
+        """
+        calls = {
+            index: functools.partial(self.agenerate_cv, cv_request)
+            for index, cv_request in cv_requests.items()
+        }
+        async for item in self._arun_many(calls, concurrency):
+            yield item
+
+    def compare_jobs(
+        self, request: JobComparisonRequest, concurrency: int
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Analyze one candidate's compatibility with several jobs
+
+        The candidate part of the prompt and, for local scoring, the candidate
+        skill vector are built right away and shared by every job. Each job
+        then costs one call that only asks for the compatibility schema, not a CV.
+
+        Args:
+            request (JobComparisonRequest): The candidate and the jobs
+            concurrency (int): Maximum number of calls in flight at once
+
+        Returns:
+            AsyncIterator[Tuple[int, Dict[str, Any]]]: The job's position in
+            ``request.jobs`` and {"job_compatibility": ...} or {"error": ...},
+            in completion order
+
+        Raises:
+            PromptBudgetExceeded: If the candidate texts are over budget and the
+                policy is "reject"; errors of a single job are yielded instead
+        """
+        texts = (
+            request.skills,
+            request.professional_experience,
+            request.projects,
+            request.education,
+        )
+        with STAGE_DURATION.time(stage="prompt"):
+            profile = self._create_profile_prompt(request)
+        coverage = None
+        if self.matcher is not None:
+            with STAGE_DURATION.time(stage="local_scoring"):
+                coverage = self.matcher.candidate_vector(candidate_text(*texts))
+
+        calls = {
+            index: functools.partial(self._acompare_job, profile, coverage, job)
+            for index, job in enumerate(request.jobs)
+        }
+        return self._arun_many(calls, concurrency)
+
+    async def _acompare_job(
+        self, profile: str, coverage: Optional[np.ndarray], job: TargetJob
+    ) -> Dict[str, Any]:
+        posting = (
+            self.job_postings.require(job.job_posting_id) if job.job_posting_id else None
+        )
+        with STAGE_DURATION.time(stage="prompt"):
+            if posting is not None:
+                description = posting.description
+                job_header = "REQUISITOS DA VAGA ALVO (extraídos da descrição):"
+                job_text = format_job_requirements(posting.requirements)
+            else:
+                description = job.description
+                job_header = "DESCRIÇÃO DA VAGA ALVO:"
+                job_text = self.preprocessor.process(
+                    {"target_job_description": description}
+                )[0]["target_job_description"]
+            prompt = f"""{profile}
+
+{job_header}
+{job_text}
+
+INSTRUÇÕES ESPECIAIS:
+- Compare as habilidades e experiências do candidato com os requisitos da vaga
+- Calcule a compatibilidade e identifique gaps
+- Forneça sugestões específicas de desenvolvimento
+
+Forneça a resposta no formato JSON conforme especificado nas instruções do sistema."""
+
+        content = await self.client.agenerate_json_response(
             prompt=prompt,
             system_instruction=self.BASE_SYSTEM_INSTRUCTION,
-            json_schema=CVResponse.model_json_schema(),
+            response_model=GeneratedCompatibility,
+        )
+        if not isinstance(content, GeneratedCompatibility):
+            return self._wrap_content(content)
+
+        if coverage is not None:
+            with STAGE_DURATION.time(stage="local_scoring"):
+                match = self.matcher.match_vectors(
+                    self.matcher.job_vector(description), coverage
+                )
+            content = self._apply_local_match(content, match)
+        return {"job_compatibility": self._with_learning_resources(content)}
+
+    async def _arun_many(
+        self, calls: Dict[int, Callable[[], Awaitable[Dict[str, Any]]]], concurrency: int
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run calls concurrently, yielding each result as it finishes
+
+        Args:
+            calls (Dict[int, Callable]): Coroutine functions keyed by the
+                caller's position for them
+            concurrency (int): Maximum number of calls in flight at once
+
+        Yields:
+            Tuple[int, Dict[str, Any]]: The position and its result, in
+            completion order; errors come back as {"error": ...}
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def run(index: int, call: Callable[[], Awaitable[Dict[str, Any]]]):
+            async with semaphore:
+                try:
+                    return index, await call()
+                except PromptBudgetExceeded as e:
+                    return index, {"error": f"Entrada muito longa: {e}"}
+                except JobPostingNotFound as e:
+                    return index, {"error": str(e)}
+                except AdmissionRejected:
+                    return index, {
+                        "error": "O serviço está sobrecarregado. Tente novamente em instantes."
+                    }
+                except Exception as e:
+                    return index, {"error": f"Erro inesperado na geração: {e}"}
+
+        tasks = [asyncio.ensure_future(run(index, call)) for index, call in calls.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _agenerate_uncached(
+        self, cv_request: CVRequest, request_key: str
+    ) -> Dict[str, str]:
+        with STAGE_DURATION.time(stage="prompt"):
+            prompt = self._create_prompt(cv_request)
+        if self._use_split(cv_request):
+            content = await self._agenerate_split(prompt)
+        else:
+            content = await self.client.agenerate_json_response(
+                prompt=prompt,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCVResponse,
+            )
+
+        content = self._complete_compatibility(cv_request, content)
+        return await self._astore_result(
+            request_key, self._wrap_content(content), cv_request
+        )
+
+    async def aregenerate_section(
+        self, request: SectionRegenerationRequest
+    ) -> Dict[str, Any]:
+        """
+        Rewrite one section of an existing CV from a new informal description
+
+        Gemini is asked only for the section's sub-schema, so the output (and
+        the latency) is a fraction of a full generation. The validated section
+        replaces the old one; every other section, job_compatibility included,
+        is kept as it was.
+
+        Args:
+            request (SectionRegenerationRequest): The CV, the section name and the new text
+
+        Returns:
+            Dict[str, Any]: A dictionary containing either the updated CV content or an error message
+
+        Raises:
+            PromptBudgetExceeded: If the input is over budget and the policy is "reject"
+        """
+        with STAGE_DURATION.time(stage="prompt"):
+            prompt = self._create_section_prompt(request)
+        content = await self.client.agenerate_json_response(
+            prompt=prompt,
+            system_instruction=self.SECTION_SYSTEM_INSTRUCTION,
+            response_model=CV_SECTION_MODELS[request.section],
+        )
+        if isinstance(content, BaseModel):
+            cv = request.cv_content.generated_cv.model_copy(
+                update={request.section: getattr(content, request.section)}
+            )
+            content = request.cv_content.model_copy(update={"generated_cv": cv})
+        return self._wrap_content(content)
+
+    async def aregister_job_posting(self, description: str) -> Dict[str, Any]:
+        """
+        Parse a job description into structured requirements and register it
+
+        Each posting is parsed once: registering the same description again
+        (up to whitespace) returns the stored entry without calling Gemini.
+
+        Args:
+            description (str): The job description
+
+        Returns:
+            Dict[str, Any]: {"job_posting": JobPosting, "created": bool}, or an error message
+
+        Raises:
+            PromptBudgetExceeded: If the description is over budget and the policy is "reject"
+        """
+        posting_id = job_posting_id(description)
+        posting = self.job_postings.get(posting_id)
+        if posting is not None:
+            return {"job_posting": posting, "created": False}
+
+        return await self.singleflight.do(
+            f"job-posting:{posting_id}",
+            lambda: self._aparse_job_posting(posting_id, description),
+        )
+
+    async def _aparse_job_posting(self, posting_id: str, description: str) -> Dict[str, Any]:
+        with STAGE_DURATION.time(stage="prompt"):
+            text, _ = self.preprocessor.process({"target_job_description": description})
+            prompt = f"""Extraia os requisitos estruturados da vaga abaixo.
+
+DESCRIÇÃO DA VAGA:
+{text["target_job_description"]}
+
+Forneça a resposta no formato JSON conforme especificado nas instruções do sistema."""
+        content = await self.client.agenerate_json_response(
+            prompt=prompt,
+            system_instruction=self.JOB_POSTING_SYSTEM_INSTRUCTION,
+            response_model=JobRequirements,
+        )
+        if not isinstance(content, JobRequirements):
+            GENERATION_ERRORS.inc(error_class=content.get("error_class", "unknown"))
+            return {"error": content.get("message", "Falha ao analisar a vaga")}
+
+        posting = JobPosting(id=posting_id, description=description, requirements=content)
+        self.job_postings.put(posting)
+        return {"job_posting": posting, "created": True}
+
+    def dry_run(self, cv_request: CVRequest) -> Dict[str, Any]:
+        """
+        Build the prompt for a request and estimate the generation, without calling Gemini
+
+        Args:
+            cv_request (CVRequest): The validated CV request
+
+        Returns:
+            Dict[str, Any]: The normalized input, the prompt token report and
+            the estimated tokens, cost and latency class
+
+        Raises:
+            PromptBudgetExceeded: If the input is over budget and the policy is "reject"
+        """
+        with STAGE_DURATION.time(stage="prompt"):
+            prompt, report = self._build_prompt(cv_request)
+
+        prompt_tokens = estimate_tokens(prompt)
+        candidate_tokens = report.total_after - report.tokens_after.get(
+            "target_job_description", 0
+        )
+        if self._use_split(cv_request):
+            calls = [
+                CallEstimate(
+                    self._fixed_input_tokens[GeneratedCV]
+                    + prompt_tokens
+                    + estimate_tokens(self.SPLIT_CV_TASK),
+                    output_tokens(candidate_tokens),
+                ),
+                CallEstimate(
+                    self._fixed_input_tokens[GeneratedCompatibility]
+                    + prompt_tokens
+                    + estimate_tokens(self.SPLIT_COMPATIBILITY_TASK),
+                    output_tokens(candidate_tokens, cv=False, compatibility=True),
+                ),
+            ]
+        else:
+            calls = [
+                CallEstimate(
+                    self._fixed_input_tokens[GeneratedCVResponse] + prompt_tokens,
+                    output_tokens(
+                        candidate_tokens,
+                        compatibility=self._has_target_job(cv_request),
+                    ),
+                )
+            ]
+
+        return {
+            "normalized_input": cv_request.model_dump(),
+            "prompt": {
+                "tokens_before": report.total_before,
+                "tokens_after": report.total_after,
+                "truncated_fields": report.truncated,
+            },
+            "estimate": self.estimator.estimate(calls).as_dict(),
+        }
+
+    def _use_split(self, cv_request: CVRequest) -> bool:
+        return self.split_generation and self._has_target_job(cv_request)
+
+    def _has_target_job(self, cv_request: CVRequest) -> bool:
+        return bool(cv_request.target_job_description or cv_request.target_job_id)
+
+    def _job_posting(self, cv_request: CVRequest) -> Optional[JobPosting]:
+        """The registered posting a request references, if any
+
+        Raises:
+            JobPostingNotFound: If the referenced id is not registered
+        """
+        if not cv_request.target_job_id:
+            return None
+        return self.job_postings.require(cv_request.target_job_id)
+
+    def _job_description(self, cv_request: CVRequest) -> Optional[str]:
+        """The full target job text, given inline or through a registered posting"""
+        posting = self._job_posting(cv_request)
+        return posting.description if posting is not None else cv_request.target_job_description
+
+    def _generate_split(self, prompt: str):
+        """Blocking variant of _agenerate_split; the two calls run on two threads"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            cv_future = executor.submit(
+                self.client.generate_json_response,
+                prompt=prompt + self.SPLIT_CV_TASK,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCV,
+            )
+            compatibility_future = executor.submit(
+                self.client.generate_json_response,
+                prompt=prompt + self.SPLIT_COMPATIBILITY_TASK,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCompatibility,
+            )
+            return self._merge_split(cv_future.result(), compatibility_future.result())
+
+    async def _agenerate_split(self, prompt: str):
+        """
+        Generate the CV and the job compatibility analysis as two concurrent calls
+
+        Each call asks for a smaller schema, so the wall-clock time is close
+        to the slower of the two instead of one call producing both.
+
+        Args:
+            prompt (str): The prompt built from the request
+
+        Returns:
+            The merged GeneratedCVResponse or an error dict
+        """
+        cv_content, compatibility = await asyncio.gather(
+            self.client.agenerate_json_response(
+                prompt=prompt + self.SPLIT_CV_TASK,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCV,
+            ),
+            self.client.agenerate_json_response(
+                prompt=prompt + self.SPLIT_COMPATIBILITY_TASK,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCompatibility,
+            ),
         )
+        return self._merge_split(cv_content, compatibility)
+
+    def _merge_split(self, cv_content, compatibility):
+        """Merge the two validated partial results into a GeneratedCVResponse"""
+        for part in (cv_content, compatibility):
+            if isinstance(part, dict) and part.get("status") == "error":
+                return part
+
+        return GeneratedCVResponse(generated_cv=cv_content, job_compatibility=compatibility)
+
+    async def astream_cv(
+        self, cv_request: CVRequest
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate a CV, yielding each top-level section as soon as it is complete
+
+        Args:
+            cv_request (CVRequest): The CV request containing user information
+
+        The job_compatibility sections are held back until local scoring
+        and learning resources have been applied, then sent with their
+        final values, so no section event disagrees with "complete".
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: ("section", event) for every completed
+            section, then a final ("complete", result) or ("error", result)
+        """
+        parser = SectionStreamParser()
+        request_key = self._request_key(cv_request)
+        cached = await self._acache_lookup(cv_request, request_key)
+        if cached is not None:
+            for event in parser.feed(to_json(cached["cv_content"]).decode("utf-8")):
+                yield "section", event.as_dict()
+            yield "complete", cached
+            return
+
+        try:
+            with STAGE_DURATION.time(stage="prompt"):
+                prompt = self._create_prompt(cv_request)
+        except PromptBudgetExceeded as e:
+            GENERATION_ERRORS.inc(error_class="prompt_budget")
+            yield "error", {"error": f"Entrada muito longa: {e}"}
+            return
+        except JobPostingNotFound as e:
+            GENERATION_ERRORS.inc(error_class="job_posting_not_found")
+            yield "error", {"error": str(e)}
+            return
 
+        try:
+            async for text in self.client.astream_json_response(
+                prompt=prompt,
+                system_instruction=self.BASE_SYSTEM_INSTRUCTION,
+                response_model=GeneratedCVResponse,
+            ):
+                for event in parser.feed(text):
+                    if not event.section.startswith(self.COMPATIBILITY_SECTION + "."):
+                        yield "section", event.as_dict()
+            content = (
+                GeneratedCVResponse.model_validate_json(parser.text)
+                if parser.text
+                else {
+                    "status": "error",
+                    "message": "Resposta vazia da API do Gemini.",
+                }
+            )
+        except Exception as e:
+            content = self.client._handle_error(e)
+
+        content = self._complete_compatibility(cv_request, content)
+        result = await self._astore_result(
+            request_key, self._wrap_content(content), cv_request
+        )
+        if "cv_content" in result:
+            for event in self._compatibility_events(result["cv_content"]):
+                yield "section", event
+        yield ("complete" if "cv_content" in result else "error"), result
+
+    def _compatibility_events(self, cv_content: CVResponse) -> List[Dict[str, Any]]:
+        """Section events for the final job_compatibility, as the stream parser splits them"""
+        if cv_content.job_compatibility is None:
+            return []
+        text = to_json({self.COMPATIBILITY_SECTION: cv_content.job_compatibility})
+        return [event.as_dict() for event in SectionStreamParser().feed(text.decode("utf-8"))]
+
+    def _complete_compatibility(self, cv_request: CVRequest, content):
+        """Score locally as configured, then attach learning resources for the gaps"""
+        content = self._score_locally(cv_request, content)
+        return self._attach_learning_resources(content)
+
+    def _score_locally(self, cv_request: CVRequest, content):
+        """
+        Fill in or cross-check job_compatibility with the local skill matcher
+
+        With LOCAL_SCORING_MODE=fill the score and skill list are replaced by
+        the deterministic local ones (the LLM's suggestions are kept); with
+        "crosscheck" the LLM result is kept and the divergence is
+        recorded. Job descriptions with no known skill are left to the LLM.
+
+        Args:
+            cv_request (CVRequest): The CV request containing user information
+            content: The client output, a GeneratedCVResponse or an error dict
+
+        Returns:
+            The content with job_compatibility updated as configured
+        """
+        if (
+            self.matcher is None
+            or not self._has_target_job(cv_request)
+            or not isinstance(content, GeneratedCVResponse)
+        ):
+            return content
+
+        with STAGE_DURATION.time(stage="local_scoring"):
+            match = self.matcher.match(
+                self._job_description(cv_request),
+                candidate_text(
+                    cv_request.skills,
+                    cv_request.professional_experience,
+                    cv_request.projects,
+                    cv_request.education,
+                ),
+            )
+        compatibility = self._apply_local_match(content.job_compatibility, match)
+        if compatibility is content.job_compatibility:
+            return content
+        return content.model_copy(update={"job_compatibility": compatibility})
+
+    def _apply_local_match(
+        self, compatibility: Optional[GeneratedCompatibility], match: SkillMatch
+    ) -> Optional[GeneratedCompatibility]:
+        """_score_locally for a single compatibility analysis; returned as is when unchanged"""
+        if not match.recognized:
+            return compatibility
+
+        if self.local_scoring_mode == "crosscheck":
+            if compatibility is not None:
+                COMPATIBILITY_SCORE_DIVERGENCE.observe(
+                    abs(compatibility.compatibility_score - match.score)
+                )
+            return compatibility
+
+        local = match.to_compatibility()
+        suggestions = (
+            compatibility.improvement_suggestions
+            if compatibility is not None and compatibility.improvement_suggestions
+            else local["improvement_suggestions"]
+        )
+        return GeneratedCompatibility(
+            compatibility_score=local["compatibility_score"],
+            skills=local["skills"],
+            improvement_suggestions=suggestions,
+        )
+
+    def _attach_learning_resources(self, content):
+        """
+        Fill learning_resources from the local catalog for the skills the candidate lacks
+
+        Gemini is not asked for resources (see GeneratedCompatibility), so
+        this turns its output into a complete CVResponse. The already
+        validated sections are reused as they are.
+
+        Args:
+            content: The client output, a GeneratedCVResponse or an error dict
+
+        Returns:
+            A CVResponse, or the error dict unchanged
+        """
+        if not isinstance(content, GeneratedCVResponse):
+            return content
+
+        compatibility = content.job_compatibility
+        return CVResponse(
+            generated_cv=content.generated_cv,
+            job_compatibility=(
+                self._with_learning_resources(compatibility)
+                if compatibility is not None
+                else None
+            ),
+        )
+
+    def _with_learning_resources(
+        self, compatibility: GeneratedCompatibility
+    ) -> JobCompatibilityAnalysis:
+        gaps = [skill.name for skill in compatibility.skills if not skill.has_skill]
+        return JobCompatibilityAnalysis(
+            compatibility_score=compatibility.compatibility_score,
+            skills=compatibility.skills,
+            improvement_suggestions=compatibility.improvement_suggestions,
+            learning_resources=self.catalog.for_skills(
+                gaps, self.resources_per_skill, self.resources_max
+            ),
+        )
+
+    def _wrap_content(self, content) -> Dict[str, str]:
+        """Wrap the client output in the API response envelope"""
         if isinstance(content, dict) and content.get("status") == "error":
+            GENERATION_ERRORS.inc(error_class=content.get("error_class", "unknown"))
             return {"error": content.get("message", "Failed to generate CV")}
 
         return {"cv_content": content}
 
+    def _request_key(self, cv_request: CVRequest) -> str:
+        """Key a request on its normalized input, model and prompt/schema version"""
+        return build_cache_key(
+            cv_request,
+            self.client.model,
+            self.PROMPT_VERSION,
+            self._schema_version,
+            self.local_scoring_mode,
+        )
+
+    def _cache_get(self, request_key: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        content = self.cache.get(request_key)
+        if content is None:
+            return None
+        # Disk caches hand back plain JSON
+        if not isinstance(content, BaseModel):
+            content = CVResponse.model_validate(content)
+        return {"cv_content": content}
+
+    def _store_result(
+        self,
+        request_key: str,
+        result: Dict[str, str],
+        cv_request: Optional[CVRequest] = None,
+    ) -> Dict[str, str]:
+        """Cache successful generations only; errors are always retried"""
+        if self.cache is not None and "cv_content" in result:
+            self.cache.set(request_key, result["cv_content"])
+            if self.near_duplicates is not None and cv_request is not None:
+                scope, text = self._near_duplicate_input(cv_request)
+                self.near_duplicates.add(scope, text, request_key)
+        return result
+
+    async def _acache_lookup(
+        self, cv_request: CVRequest, request_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """Exact or near-duplicate cache hit; a disk cache is read off the event loop"""
+        if self.cache is None:
+            return None
+        lookup = functools.partial(self._cached_or_near_duplicate, cv_request, request_key)
+        if self.cache.blocking:
+            return await asyncio.to_thread(lookup)
+        return lookup()
+
+    def _cached_or_near_duplicate(
+        self, cv_request: CVRequest, request_key: str
+    ) -> Optional[Dict[str, Any]]:
+        return self._cache_get(request_key) or self._reuse_near_duplicate(
+            cv_request, request_key
+        )
+
+    async def _astore_result(
+        self,
+        request_key: str,
+        result: Dict[str, str],
+        cv_request: Optional[CVRequest] = None,
+    ) -> Dict[str, str]:
+        """_store_result, writing a disk cache off the event loop"""
+        if self.cache is not None and self.cache.blocking and "cv_content" in result:
+            return await asyncio.to_thread(self._store_result, request_key, result, cv_request)
+        return self._store_result(request_key, result, cv_request)
+
+    def _near_duplicate_input(self, cv_request: CVRequest) -> Tuple[str, str]:
+        """Split a request into its exact-match scope and the text compared by similarity"""
+        scope = self._request_key(
+            cv_request.model_copy(update={name: None for name in self.NEAR_DUPLICATE_FIELDS})
+        )
+        text = "\n".join(getattr(cv_request, name) or "" for name in self.NEAR_DUPLICATE_FIELDS)
+        return scope, text
+
+    def _reuse_near_duplicate(
+        self, cv_request: CVRequest, request_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Serve a request with the cached result of a near-identical recent one
+
+        Args:
+            cv_request (CVRequest): The CV request, already an exact cache miss
+            request_key (str): Its cache key; the reused result is stored under
+                it so resubmitting the same text becomes an exact hit
+
+        Returns:
+            Optional[Dict[str, Any]]: The reused result, or None
+        """
+        if self.near_duplicates is None:
+            return None
+        scope, text = self._near_duplicate_input(cv_request)
+        match = self.near_duplicates.lookup(scope, text)
+        if match is None:
+            NEAR_DUPLICATE_LOOKUPS.inc(result="miss")
+            return None
+        cached = self._cache_get(match[0])
+        if cached is None:
+            NEAR_DUPLICATE_LOOKUPS.inc(result="evicted")
+            return None
+        NEAR_DUPLICATE_LOOKUPS.inc(result="hit")
+        self.cache.set(request_key, cached["cv_content"])
+        return cached
+
     def _create_prompt(self, cv_request: CVRequest) -> str:
         """
         Create a prompt for CV generation from the request data
@@ -87,7 +946,32 @@ class GeminiService:
 
         Returns:
             str: The formatted prompt
+
+        Raises:
+            PromptBudgetExceeded: If the input is over budget and the policy is "reject"
         """
+        return self._build_prompt(cv_request)[0]
+
+    def _build_prompt(self, cv_request: CVRequest) -> Tuple[str, BudgetReport]:
+        """_create_prompt, also returning the token report of the free-text fields"""
+        text, report = self.preprocessor.process(
+            {name: getattr(cv_request, name) for name in FREE_TEXT_FIELDS}
+        )
+        job_header = "DESCRIÇÃO DA VAGA ALVO:"
+        # A registered posting goes in as its compact parsed requirements
+        posting = self._job_posting(cv_request)
+        if posting is not None:
+            job_header = "REQUISITOS DA VAGA ALVO (extraídos da descrição):"
+            text["target_job_description"] = format_job_requirements(
+                posting.requirements
+            )
+            report.tokens_before["target_job_description"] = estimate_tokens(
+                posting.description
+            )
+            report.tokens_after["target_job_description"] = estimate_tokens(
+                text["target_job_description"]
+            )
+
         sections = [
             "INFORMAÇÕES PESSOAIS:",
             f"Nome Completo: {cv_request.full_name}",
@@ -103,16 +987,16 @@ class GeminiService:
             [
                 "",
                 "EXPERIÊNCIA PROFISSIONAL (descrição informal):",
-                cv_request.professional_experience,
+                text["professional_experience"],
             ]
         )
 
-        if cv_request.projects:
+        if text["projects"]:
             sections.extend(
                 [
                     "",
                     "PROJETOS (descrição informal de projetos pessoais/acadêmicos):",
-                    cv_request.projects,
+                    text["projects"],
                 ]
             )
 
@@ -120,32 +1004,31 @@ class GeminiService:
             [
                 "",
                 "FORMAÇÃO ACADÊMICA (descrição informal):",
-                cv_request.education,
+                text["education"],
                 "",
                 "HABILIDADES E COMPETÊNCIAS (descrição informal):",
-                cv_request.skills,
+                text["skills"],
             ]
         )
 
-        if cv_request.target_job_description:
+        if text["target_job_description"]:
             sections.extend(
                 [
                     "",
-                    "DESCRIÇÃO DA VAGA ALVO:",
-                    cv_request.target_job_description,
+                    job_header,
+                    text["target_job_description"],
                     "",
                     "INSTRUÇÕES ESPECIAIS:",
                     "- Compare as habilidades e experiências do candidato com os requisitos da vaga",
                     "- Calcule a compatibilidade e identifique gaps",
                     "- Forneça sugestões específicas de desenvolvimento",
-                    "- Recomende recursos de aprendizado relevantes",
                     "- Estruture o CV destacando pontos relevantes para esta vaga",
                 ]
             )
 
         cv_data = "\n".join(sections)
 
-        return f"""Por favor, analise as seguintes informações fornecidas de forma casual/informal 
+        prompt = f"""Por favor, analise as seguintes informações fornecidas de forma casual/informal 
 e transforme-as em um currículo profissional estruturado.
 
 {cv_data}
@@ -158,8 +1041,140 @@ OBSERVAÇÕES IMPORTANTES:
 5. Estruture o conteúdo de forma clara e organizada
 6. Identifique e explicite tanto habilidades técnicas quanto comportamentais
 
+Forneça a resposta no formato JSON conforme especificado nas instruções do sistema."""
+        return prompt, report
+
+    def _create_profile_prompt(self, request: JobComparisonRequest) -> str:
+        """
+        Create the candidate part of a job comparison prompt, shared by every job
+
+        Args:
+            request (JobComparisonRequest): The candidate and the jobs
+
+        Returns:
+            str: The prompt up to, not including, the job section
+
+        Raises:
+            PromptBudgetExceeded: If the input is over budget and the policy is "reject"
+        """
+        text, _ = self.preprocessor.process(
+            {
+                "professional_experience": request.professional_experience,
+                "projects": request.projects,
+                "education": request.education,
+                "skills": request.skills,
+            }
+        )
+        sections = []
+        for title, name in (
+            ("EXPERIÊNCIA PROFISSIONAL (descrição informal):", "professional_experience"),
+            ("PROJETOS (descrição informal de projetos pessoais/acadêmicos):", "projects"),
+            ("FORMAÇÃO ACADÊMICA (descrição informal):", "education"),
+            ("HABILIDADES E COMPETÊNCIAS (descrição informal):", "skills"),
+        ):
+            if text[name]:
+                sections.extend(["", title, text[name]])
+        profile = "\n".join(sections)
+
+        return f"""Analise a compatibilidade do candidato abaixo com a vaga alvo.
+A análise é feita apenas sobre o perfil; não gere o currículo.
+{profile}"""
+
+    def _create_section_prompt(self, request: SectionRegenerationRequest) -> str:
+        """
+        Create a prompt that rewrites one CV section
+
+        Args:
+            request (SectionRegenerationRequest): The CV, the section name and the new text
+
+        Returns:
+            str: The formatted prompt
+
+        Raises:
+            PromptBudgetExceeded: If the input is over budget and the policy is "reject"
+        """
+        text, _ = self.preprocessor.process(
+            {
+                "text": request.text,
+                "target_job_description": request.target_job_description,
+            }
+        )
+        cv = request.cv_content.generated_cv
+        current = getattr(cv, request.section)
+
+        sections = [
+            "CANDIDATO:",
+            f"Nome: {cv.personal_info.name}",
+            f"Cargo: {cv.personal_info.title}",
+            "",
+            f"SEÇÃO ATUAL ({request.section}):",
+            to_json(current).decode("utf-8") if current else "(vazia)",
+            "",
+            "NOVO CONTEÚDO (descrição informal):",
+            text["text"],
+        ]
+
+        if text["target_job_description"]:
+            sections.extend(
+                [
+                    "",
+                    "DESCRIÇÃO DA VAGA ALVO:",
+                    text["target_job_description"],
+                ]
+            )
+
+        section_data = "\n".join(sections)
+
+        return f"""Reescreva apenas a seção "{request.section}" do currículo abaixo a partir do novo conteúdo informado.
+
+{section_data}
+
+OBSERVAÇÕES IMPORTANTES:
+1. O novo conteúdo substitui ou complementa a seção atual, conforme o texto indicar
+2. Extraia conquistas e métricas implícitas no texto
+3. Mantenha a veracidade das informações enquanto melhora a apresentação
+4. Use linguagem profissional e impactante
+
 Forneça a resposta no formato JSON conforme especificado nas instruções do sistema."""
 
     def _format_list(self, items: list[str]) -> str:
         """Format a list of items into a bullet-point string"""
         return "\n".join(f"- {item}" for item in items)
+
+
+def get_gemini_service() -> GeminiService:
+    """
+    Process-wide GeminiService, built on first use
+
+    Building it loads google-genai and the generation configs, so it is kept
+    off the import path; the app lifespan builds it in the background.
+
+    Returns:
+        GeminiService: The shared service
+    """
+    global _gemini_service
+    if _gemini_service is None:
+        with _gemini_service_lock:
+            if _gemini_service is None:
+                _gemini_service = GeminiService()
+    return _gemini_service
+
+
+async def aget_gemini_service() -> GeminiService:
+    """get_gemini_service without blocking the event loop while the service is built"""
+    if _gemini_service is not None:
+        return _gemini_service
+    return await asyncio.to_thread(get_gemini_service)
+
+
+def loaded_gemini_service() -> Optional[GeminiService]:
+    """The shared service if it was already built, without building it"""
+    return _gemini_service
+
+
+__all__ = [
+    "GeminiService",
+    "aget_gemini_service",
+    "get_gemini_service",
+    "loaded_gemini_service",
+]
@@ -0,0 +1,157 @@
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+
+
+@dataclass
+class SectionEvent:
+    section: str
+    data: Any
+    index: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        event = {"section": self.section, "data": self.data}
+        if self.index is not None:
+            event["index"] = self.index
+        return event
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "key", "index", "expect_key")
+
+    def __init__(self, kind: str, path: Tuple, start: int):
+        self.kind = kind
+        self.path = path
+        self.start = start
+        self.key = None
+        self.index = 0
+        self.expect_key = kind == "object"
+
+
+class SectionStreamParser:
+    """Incremental JSON parser that emits completed CV sections.
+
+    Text is fed in arbitrary chunks as it arrives from the model. A section
+    is a value two levels below the root, e.g. ``generated_cv.personal_info``
+    or ``job_compatibility.compatibility_score``; list sections such as
+    ``generated_cv.experience_entries`` are emitted one item at a time. Each
+    event is produced as soon as its closing character has been seen, so the
+    caller does not wait for the rest of the document.
+    """
+
+    SECTION_DEPTH = 2
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._scalar: Optional[Tuple[Tuple, int]] = None
+        self._string: Optional[Tuple[Tuple, int]] = None
+        self.complete = False
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> List[SectionEvent]:
+        """
+        Consume the next chunk of model output
+
+        Args:
+            chunk (str): Raw text as streamed by the model
+
+        Returns:
+            List[SectionEvent]: Sections completed by this chunk, in order
+        """
+        self._text += chunk
+        events: List[SectionEvent] = []
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    path, start = self._string
+                    self._string = None
+                    if self._string_is_key:
+                        self._stack[-1].key = json.loads(text[start : i + 1])
+                    else:
+                        self._value_end(path, start, i + 1, False, events)
+                continue
+
+            if self._scalar is not None:
+                if c not in _SCALAR_END:
+                    continue
+                path, start = self._scalar
+                self._scalar = None
+                self._value_end(path, start, i, False, events)
+
+            if c in _WHITESPACE:
+                continue
+
+            if c == '"':
+                self._in_string = True
+                top = self._stack[-1] if self._stack else None
+                self._string_is_key = top is not None and top.expect_key
+                self._string = (() if self._string_is_key else self._value_path(), i)
+            elif c == "{" or c == "[":
+                kind = "object" if c == "{" else "array"
+                self._stack.append(_Frame(kind, self._value_path(), i))
+            elif c == "}" or c == "]":
+                frame = self._stack.pop()
+                self._value_end(
+                    frame.path, frame.start, i + 1, frame.kind == "array", events
+                )
+                if not self._stack:
+                    self.complete = True
+            elif c == ":":
+                self._stack[-1].expect_key = False
+            elif c == ",":
+                top = self._stack[-1]
+                if top.kind == "object":
+                    top.expect_key = True
+                else:
+                    top.index += 1
+            else:
+                self._scalar = (self._value_path(), i)
+
+        self._pos = len(text)
+        return events
+
+    def _value_path(self) -> Tuple:
+        if not self._stack:
+            return ()
+        top = self._stack[-1]
+        if top.kind == "object":
+            return top.path + (top.key,)
+        return top.path + (top.index,)
+
+    def _value_end(
+        self, path: Tuple, start: int, end: int, is_array: bool, events: list
+    ) -> None:
+        depth = self.SECTION_DEPTH
+        if len(path) == depth and not is_array:
+            index = None
+        elif len(path) == depth + 1 and isinstance(path[-1], int):
+            index = path[-1]
+        else:
+            return
+
+        section = ".".join(str(part) for part in path[:depth])
+        data = json.loads(self._text[start:end])
+        events.append(SectionEvent(section=section, data=data, index=index))
+
+
+__all__ = ["SectionEvent", "SectionStreamParser"]
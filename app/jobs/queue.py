@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.settings import get_settings
+from app.jobs.store import JobStore
+
+_job_queue = None
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """Pool of asyncio workers draining jobs persisted in a JobStore.
+
+    The store is the queue: workers claim the oldest queued job, so jobs
+    submitted through any process sharing the database are picked up.
+    Local submissions wake an idle worker at once; otherwise workers poll
+    every ``poll_interval`` seconds. Claimed jobs are leased to this process
+    (``owner``) and a heartbeat renews the leases; the same loop requeues
+    jobs whose owner stopped renewing and purges old finished jobs.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 4,
+        max_pending: int = 0,
+        lease_seconds: float = 60,
+        max_attempts: int = 3,
+        retention_seconds: float = 0,
+        poll_interval: float = 1.0,
+    ):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self.owner = uuid.uuid4().hex
+        self._handler: Optional[JobHandler] = None
+        self._wakeups: "asyncio.Queue[None]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, handler: JobHandler) -> None:
+        """
+        Take back jobs with expired leases and start the workers
+
+        Args:
+            handler (JobHandler): Coroutine that runs one claimed job (its
+                store row, with the decoded payload) and returns a result
+                dict; an "error" key marks the job as failed
+        """
+        self._handler = handler
+        await self._maintain()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._heartbeat(), name="job-heartbeat"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Hand interrupted jobs to the other processes now rather than when
+        # their leases expire
+        await asyncio.to_thread(self.store.release, self.owner)
+
+    async def submit(
+        self, payload: Dict[str, Any], kind: str = "generate-cv", client: Optional[str] = None
+    ) -> str:
+        job_id = await asyncio.to_thread(self.store.create, payload, kind, client)
+        self._wakeups.put_nowait(None)
+        return job_id
+
+    async def is_full(self) -> bool:
+        if not self.max_pending:
+            return False
+        return await asyncio.to_thread(self.store.count_pending) >= self.max_pending
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(
+                    self.store.claim_next, self.owner, self.lease_seconds
+                )
+            except sqlite3.OperationalError as e:
+                # e.g. the database stayed locked by another process
+                print(f"Erro ao buscar o próximo job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeups.get(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                result = await self._handler(job)
+            except Exception as e:
+                result = {"error": f"Erro inesperado no job: {e}"}
+            await asyncio.to_thread(
+                self.store.finish, job["id"], result, result.get("error"), self.owner
+            )
+
+    async def _heartbeat(self) -> None:
+        """Renew this process's leases well before they expire, and run maintenance"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.store.renew_leases, self.owner, self.lease_seconds)
+                await self._maintain()
+            except Exception as e:
+                print(f"Erro na manutenção da fila de jobs: {e}")
+
+    async def _maintain(self) -> None:
+        await asyncio.to_thread(self.store.requeue_expired, self.max_attempts)
+        if self.retention_seconds:
+            await asyncio.to_thread(self.store.purge_finished, self.retention_seconds)
+
+
+def get_job_queue() -> JobQueue:
+
+    global _job_queue
+    if _job_queue is None:
+        settings = get_settings()
+        _job_queue = JobQueue(
+            store=JobStore(settings.jobs_sqlite_path),
+            workers=settings.jobs_workers,
+            max_pending=settings.jobs_max_pending,
+            lease_seconds=settings.jobs_lease_seconds,
+            max_attempts=settings.jobs_max_attempts,
+            retention_seconds=settings.jobs_retention_hours * 3600,
+            poll_interval=settings.jobs_poll_interval_seconds,
+        )
+    return _job_queue
+
+
+__all__ = ["JobQueue", "get_job_queue"]
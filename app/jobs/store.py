@@ -0,0 +1,266 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic_core import to_json
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobStore:
+    """SQLite-backed store for asynchronous generation jobs.
+
+    The store is shared by every worker process. A running job is leased
+    to the process that claimed it; that process renews the lease while it
+    works, and ``requeue_expired`` only takes back jobs whose lease ran out,
+    i.e. whose owner died or hung. Jobs that keep losing their owner are
+    failed after ``max_attempts`` claims instead of being retried forever.
+    """
+
+    # Columns added after the first release, created on open if missing
+    _MIGRATIONS = (
+        ("owner", "TEXT"),
+        ("lease_expires_at", "REAL"),
+        ("client", "TEXT"),
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, declaration in self._MIGRATIONS:
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {declaration}")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs (status, updated_at)"
+        )
+        self._conn.commit()
+
+    def create(
+        self, payload: Dict[str, Any], kind: str = "generate-cv", client: Optional[str] = None
+    ) -> str:
+        """
+        Queue a job
+
+        Args:
+            payload (Dict[str, Any]): JSON-serializable input of the job
+            kind (str): Job type
+            client (Optional[str]): Client that submitted the job, charged
+                for its LLM usage when it runs
+
+        Returns:
+            str: The new job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, client, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    QUEUED,
+                    json.dumps(payload, ensure_ascii=False),
+                    client,
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_next(self, owner: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest queued job to a worker process
+
+        The select and the update run in one write transaction, so two
+        processes never claim the same job.
+
+        Args:
+            owner (str): Id of the claiming process
+            lease_seconds (float): How long the job stays leased without a renewal
+
+        Returns:
+            Optional[Dict[str, Any]]: The claimed job, or None if the queue is empty
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is None:
+                    self._conn.rollback()
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, owner, now + lease_seconds, now, row["id"]),
+                )
+                job = self._conn.execute(
+                    "SELECT * FROM jobs WHERE id = ?", (row["id"],)
+                ).fetchone()
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return self._to_dict(job)
+
+    def renew_leases(self, owner: str, lease_seconds: float) -> int:
+        """Extend the leases of every job a process is running; its heartbeat"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status = ?",
+                (time.time() + lease_seconds, owner, RUNNING),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def finish(
+        self,
+        job_id: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> bool:
+        """
+        Record the outcome of a job
+
+        Args:
+            job_id (str): The job
+            result (Optional[Dict[str, Any]]): Its result when it succeeded
+            error (Optional[str]): Its error message when it failed
+            owner (Optional[str]): The finishing process; when given, the job
+                is only updated if that process still holds its lease
+
+        Returns:
+            bool: False if the lease had been taken over by another process
+        """
+        status = FAILED if error else COMPLETED
+        query = (
+            "UPDATE jobs SET status = ?, result = ?, error = ?, owner = NULL, "
+            "lease_expires_at = NULL, updated_at = ? WHERE id = ?"
+        )
+        params = [
+            status,
+            to_json(result).decode("utf-8") if result is not None else None,
+            error,
+            time.time(),
+            job_id,
+        ]
+        if owner is not None:
+            query += " AND owner = ? AND status = ?"
+            params += [owner, RUNNING]
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def requeue_expired(self, max_attempts: int = 0) -> Tuple[int, int]:
+        """
+        Take back running jobs whose lease expired
+
+        Args:
+            max_attempts (int): Jobs already claimed this many times are
+                failed instead of requeued; 0 retries forever
+
+        Returns:
+            Tuple[int, int]: Number of jobs requeued and failed
+        """
+        now = time.time()
+        expired = "status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)"
+        with self._lock:
+            failed = 0
+            if max_attempts:
+                failed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, owner = NULL, "
+                    f"lease_expires_at = NULL, updated_at = ? WHERE {expired} "
+                    "AND attempts >= ?",
+                    (
+                        FAILED,
+                        f"Job interrompido em {max_attempts} tentativas; desistindo.",
+                        now,
+                        RUNNING,
+                        now,
+                        max_attempts,
+                    ),
+                ).rowcount
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_expires_at = NULL, "
+                f"updated_at = ? WHERE {expired}",
+                (QUEUED, now, RUNNING, now),
+            ).rowcount
+            self._conn.commit()
+        return requeued, failed
+
+    def release(self, owner: str) -> int:
+        """Put a stopping process's running jobs back in the queue without counting the attempt"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_expires_at = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? "
+                "WHERE owner = ? AND status = ?",
+                (QUEUED, time.time(), owner, RUNNING),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Delete completed and failed jobs last updated more than ``older_than_seconds`` ago"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (COMPLETED, FAILED, time.time() - older_than_seconds),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def count_pending(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+__all__ = ["JobStore", "QUEUED", "RUNNING", "COMPLETED", "FAILED"]
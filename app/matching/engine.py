@@ -0,0 +1,230 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.settings import get_settings
+from app.matching.skills import SkillDictionary, fold
+
+# Importance of a skill listed as a nice-to-have relative to a requirement
+DESIRABLE_WEIGHT = 0.5
+# Coverage credited when the candidate only has related skills
+RELATED_CREDIT = 0.5
+MAX_SUGGESTIONS = 5
+
+# A section header is a short label ending in ":" at the start of a line or
+# sentence: "Diferenciais:", "Requisitos técnicos:", "Nice to have:". The
+# colon must be followed by a space or the end of the line ("http://",
+# "10:30" are not headers)
+_HEADER = re.compile(r"(?:^|(?<=[.;!?]\s))\s*([^\W\d_][^.;:!?]{0,39}):(?=\s|$)")
+MAX_HEADER_WORDS = 5
+_DESIRABLE_HEADER = re.compile(
+    r"\b(desejave(l|is)|diferencia(l|is)|nice[ -]to[ -]have|plus|bonus|preferencia(l|is)?)\b"
+)
+
+_matcher = None
+
+
+@dataclass
+class SkillMatch:
+    score: float
+    required: List[str] = field(default_factory=list)
+    desirable: List[str] = field(default_factory=list)
+    matched: List[str] = field(default_factory=list)
+    related: Dict[str, List[str]] = field(default_factory=dict)
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def recognized(self) -> bool:
+        """False when no known skill was found in the job description"""
+        return bool(self.required or self.desirable)
+
+    def suggestions(self) -> List[str]:
+        suggestions = []
+        for name in self.missing:
+            if name in self.related:
+                suggestions.append(
+                    f"Aprofunde-se em {name}; sua experiência com "
+                    f"{', '.join(self.related[name])} facilita essa transição."
+                )
+            elif name in self.desirable:
+                suggestions.append(
+                    f"Considere aprender {name}, listado como diferencial da vaga."
+                )
+            else:
+                suggestions.append(
+                    f"Desenvolva conhecimentos em {name}, um requisito da vaga."
+                )
+        return suggestions[:MAX_SUGGESTIONS]
+
+    def to_compatibility(self) -> dict:
+        """Render as a JobCompatibilityAnalysis dict"""
+        return {
+            "compatibility_score": self.score,
+            "skills": [
+                {"name": name, "has_skill": name in self.matched}
+                for name in self.required + self.desirable
+            ],
+            "improvement_suggestions": self.suggestions(),
+            "learning_resources": [],
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "compatibility_score": self.score,
+            "required": self.required,
+            "desirable": self.desirable,
+            "matched": self.matched,
+            "related": self.related,
+            "missing": self.missing,
+        }
+
+
+class SkillMatcher:
+    """Deterministic job/candidate scoring over the canonical skill dictionary.
+
+    The job description becomes an importance vector (1 for requirements,
+    DESIRABLE_WEIGHT for nice-to-haves, times the dictionary weight) and the
+    candidate text a coverage vector (1 for skills they have, RELATED_CREDIT
+    for skills they only have related experience in). The score is the
+    weighted overlap ``100 * job . coverage / sum(job)``.
+    """
+
+    def __init__(self, dictionary: SkillDictionary):
+        self.dictionary = dictionary
+
+    def job_vector(self, job_description: str) -> np.ndarray:
+        """
+        Importance of each dictionary skill for a job
+
+        Skills count as requirements except under a nice-to-have header
+        ("Diferenciais:", "Desejável:"), which lasts until the next header
+        of any kind.
+
+        Args:
+            job_description (str): Target job description
+
+        Returns:
+            np.ndarray: The importance vector, already multiplied by the
+            dictionary weights
+        """
+        importance = np.zeros(len(self.dictionary), dtype=np.float32)
+        weight = 1.0
+        for line in job_description.splitlines():
+            for header, text in _header_sections(line):
+                if header is not None:
+                    weight = DESIRABLE_WEIGHT if _DESIRABLE_HEADER.search(fold(header)) else 1.0
+                positions = self.dictionary.find(text)
+                if positions:
+                    np.maximum.at(importance, positions, weight)
+        return importance * self.dictionary.weights
+
+    def candidate_vector(self, candidate_text: str) -> np.ndarray:
+        has = np.zeros(len(self.dictionary), dtype=np.float32)
+        has[self.dictionary.find(candidate_text)] = 1.0
+        related = np.minimum(self.dictionary.related @ has, 1.0) * RELATED_CREDIT
+        return np.maximum(has, related)
+
+    def score_many(self, job_matrix: np.ndarray, coverage: np.ndarray) -> np.ndarray:
+        """
+        Score one candidate against several jobs in a single matrix product
+
+        Args:
+            job_matrix (np.ndarray): One job_vector per row
+            coverage (np.ndarray): The candidate_vector
+
+        Returns:
+            np.ndarray: Scores from 0 to 100, one per job; 0 for jobs with no
+            recognized skill
+        """
+        # float64 so that rounded scores stay exact once turned into Python floats
+        totals = job_matrix.sum(axis=1, dtype=np.float64)
+        overlap = (job_matrix @ coverage).astype(np.float64)
+        return np.round(
+            np.divide(overlap, totals, out=np.zeros_like(overlap), where=totals > 0) * 100,
+            1,
+        )
+
+    def match(self, job_description: str, candidate_text: str) -> SkillMatch:
+        """
+        Compare a job description with the candidate's own description
+
+        Args:
+            job_description (str): Target job description
+            candidate_text (str): Skills, experience, projects and education
+
+        Returns:
+            SkillMatch: Score and the per-skill breakdown
+        """
+        return self.match_vectors(
+            self.job_vector(job_description), self.candidate_vector(candidate_text)
+        )
+
+    def match_vectors(self, importance: np.ndarray, coverage: np.ndarray) -> SkillMatch:
+        """
+        match() for already computed vectors, e.g. one candidate_vector reused across jobs
+
+        Args:
+            importance (np.ndarray): The job_vector
+            coverage (np.ndarray): The candidate_vector
+
+        Returns:
+            SkillMatch: Score and the per-skill breakdown
+        """
+        score = float(self.score_many(importance[np.newaxis, :], coverage)[0])
+
+        names = self.dictionary.names
+        # Most important skills first, ties in dictionary order
+        wanted = [int(i) for i in np.argsort(-importance, kind="stable") if importance[i] > 0]
+        result = SkillMatch(score=score)
+        for i in wanted:
+            name = names[i]
+            if importance[i] >= self.dictionary.weights[i]:
+                result.required.append(name)
+            else:
+                result.desirable.append(name)
+            if coverage[i] >= 1.0:
+                result.matched.append(name)
+                continue
+            result.missing.append(name)
+            if coverage[i] > 0:
+                has = np.flatnonzero(
+                    (self.dictionary.related[i] > 0) & (coverage >= 1.0)
+                )
+                result.related[name] = [names[j] for j in has]
+        return result
+
+
+def _header_sections(line: str) -> List[Tuple[Optional[str], str]]:
+    """Split a line at its section headers into (header or None, text) pairs"""
+    sections = []
+    header, start = None, 0
+    for found in _HEADER.finditer(line):
+        if len(found.group(1).split()) > MAX_HEADER_WORDS:
+            continue
+        sections.append((header, line[start : found.start()]))
+        header, start = found.group(1), found.end()
+    sections.append((header, line[start:]))
+    return sections
+
+
+def candidate_text(*parts: Optional[str]) -> str:
+    """Join the candidate's free-text fields, skipping empty ones"""
+    return "\n".join(part for part in parts if part)
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _matcher
+    if _matcher is None:
+        settings = get_settings()
+        _matcher = SkillMatcher(SkillDictionary.load(settings.skills_dictionary_path or None))
+    return _matcher
+
+
+__all__ = [
+    "SkillMatch",
+    "SkillMatcher",
+    "candidate_text",
+    "get_skill_matcher",
+]
@@ -0,0 +1,87 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from app.core.settings import get_settings
+from app.matching.engine import get_skill_matcher
+from app.matching.skills import SkillDictionary
+
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(__file__), "data", "learning_resources.json"
+)
+
+# Fields of a catalog entry that make up a LearningResource
+RESOURCE_FIELDS = ("title", "url", "type", "platform", "description")
+
+_catalog = None
+
+
+class ResourceCatalog:
+    """Curated learning resources with an inverted index from canonical skill.
+
+    Each JSON entry is a LearningResource plus the ``skills`` it teaches;
+    skills may be written with any alias known to the skill dictionary.
+    """
+
+    def __init__(self, entries: List[dict], dictionary: SkillDictionary):
+        self.dictionary = dictionary
+        self.resources: List[dict] = [
+            {name: entry[name] for name in RESOURCE_FIELDS} for entry in entries
+        ]
+        self.index: Dict[str, List[int]] = {}
+        for position, entry in enumerate(entries):
+            for skill in entry.get("skills", []):
+                name = dictionary.canonical(skill)
+                if name is not None:
+                    self.index.setdefault(name, []).append(position)
+
+    @classmethod
+    def load(cls, dictionary: SkillDictionary, path: Optional[str] = None) -> "ResourceCatalog":
+        with open(path or DEFAULT_CATALOG_PATH, encoding="utf-8") as f:
+            return cls(json.load(f), dictionary)
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    def for_skills(self, skills: Iterable[str], per_skill: int, limit: int) -> List[dict]:
+        """
+        Look up resources for a list of skill gaps
+
+        Args:
+            skills (Iterable[str]): Skill names, most important first; any
+                alias or free-form name such as "Kubernetes (básico)" works
+            per_skill (int): Maximum resources taken for each skill
+            limit (int): Maximum resources returned overall
+
+        Returns:
+            List[dict]: LearningResource dicts without duplicates
+        """
+        seen = set()
+        found = []
+        for skill in skills:
+            name = self.dictionary.canonical(skill)
+            taken = 0
+            for position in self.index.get(name, ()):
+                if len(found) >= limit:
+                    return found
+                if taken >= per_skill:
+                    break
+                if position in seen:
+                    continue
+                seen.add(position)
+                found.append(self.resources[position])
+                taken += 1
+        return found
+
+
+def get_resource_catalog() -> ResourceCatalog:
+    global _catalog
+    if _catalog is None:
+        settings = get_settings()
+        _catalog = ResourceCatalog.load(
+            get_skill_matcher().dictionary, settings.learning_resources_path or None
+        )
+    return _catalog
+
+
+__all__ = ["RESOURCE_FIELDS", "ResourceCatalog", "get_resource_catalog"]
@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+DEFAULT_DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "data", "skills.json")
+
+# Keeps "c++", "c#", "node.js" and "asp.net" whole; "/" and "-" split tokens so
+# "CI/CD" and "react-native" match the multi-word aliases "ci cd" / "react native"
+_TOKEN = re.compile(r"[a-z0-9#+]+(?:\.[a-z0-9#+]+)*")
+
+# One-word aliases this short ("R", "Go", "ia", "ui", "s3") are also common
+# words or symbols ("R$ 8.000", "eu ia trabalhar"); they only count within
+# CONTEXT_GAP tokens of another skill that does count
+AMBIGUOUS_ALIAS_LENGTH = 2
+CONTEXT_GAP = 2
+# The context of a short alias does not cross lines or sentences
+_CLAUSE_BREAK = re.compile(r"[\n;:!?]|\.(?=\s|$)")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents so "Inglês" and "ingles" compare equal"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(fold(text))
+
+
+class SkillDictionary:
+    """Canonical skills with an alias index for longest-match lookup.
+
+    Each entry of the JSON file maps a canonical name to its ``aliases``,
+    ``related`` canonical skills (partial credit when matching) and a
+    ``weight`` expressing how much the skill counts towards a score.
+
+    Short one-word aliases are ambiguous: find() only accepts them next to
+    another accepted skill, as in "Python, R e SQL" or "Go, Kubernetes".
+    """
+
+    def __init__(self, entries: Dict[str, dict]):
+        self.names: List[str] = list(entries)
+        self.position: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.weights = np.array(
+            [float(entries[name].get("weight", 1.0)) for name in self.names],
+            dtype=np.float32,
+        )
+
+        self.aliases: Dict[Tuple[str, ...], int] = {}
+        for name, entry in entries.items():
+            for alias in [name, *entry.get("aliases", [])]:
+                tokens = tuple(tokenize(alias))
+                if tokens:
+                    self.aliases.setdefault(tokens, self.position[name])
+        self.ambiguous: Set[Tuple[str, ...]] = {
+            tokens
+            for tokens in self.aliases
+            if len(tokens) == 1
+            and len(tokens[0]) <= AMBIGUOUS_ALIAS_LENGTH
+            and tokens[0].isalnum()
+        }
+        self.max_alias_tokens = max(len(tokens) for tokens in self.aliases)
+
+        # related[i, j] = 1 when skill j counts as related experience for skill i
+        self.related = np.zeros((len(self.names), len(self.names)), dtype=np.float32)
+        for name, entry in entries.items():
+            for other in entry.get("related", []):
+                if other in self.position:
+                    self.related[self.position[name], self.position[other]] = 1.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SkillDictionary":
+        with open(path or DEFAULT_DICTIONARY_PATH, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def find(self, text: str) -> List[int]:
+        """
+        Find the canonical skills mentioned in a text
+
+        Args:
+            text (str): Free text in Portuguese or English
+
+        Returns:
+            List[int]: Positions of the skills found, in order of appearance;
+            the longest alias wins, so "react native" is not also "react".
+            Ambiguous short aliases are dropped unless they are next to
+            another skill
+        """
+        found = []
+        for clause in _CLAUSE_BREAK.split(text):
+            found.extend(self._find_in_clause(tokenize(clause)))
+        return found
+
+    def _find_in_clause(self, tokens: List[str]) -> List[int]:
+        # (start, end, position, ambiguous) spans over the tokens
+        spans = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(self.max_alias_tokens, len(tokens) - i), 0, -1):
+                alias = tuple(tokens[i : i + size])
+                position = self.aliases.get(alias)
+                if position is not None:
+                    spans.append((i, i + size, position, alias in self.ambiguous))
+                    i += size
+                    break
+            else:
+                i += 1
+
+        accepted = [not ambiguous for _, _, _, ambiguous in spans]
+        # Accepting one short alias can vouch for the next one in a list
+        # ("Python, R, Go"), so repeat until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            for k, (start, end, _, _) in enumerate(spans):
+                if accepted[k]:
+                    continue
+                for j in (k - 1, k + 1):
+                    if 0 <= j < len(spans) and accepted[j]:
+                        other_start, other_end = spans[j][0], spans[j][1]
+                        gap = start - other_end if j < k else other_start - end
+                        if gap <= CONTEXT_GAP:
+                            accepted[k] = changed = True
+                            break
+        return [span[2] for span, ok in zip(spans, accepted) if ok]
+
+    def canonical(self, text: str) -> Optional[str]:
+        """
+        Canonical name for a skill written any known way
+
+        Args:
+            text (str): A skill name, e.g. "ReactJS" or "Kubernetes (básico)"
+
+        Returns:
+            Optional[str]: The canonical name ("React"), the first known skill
+            mentioned in the text, or None
+        """
+        position = self.aliases.get(tuple(tokenize(text)))
+        if position is None:
+            found = self.find(text)
+            position = found[0] if found else None
+        return self.names[position] if position is not None else None
+
+
+__all__ = ["DEFAULT_DICTIONARY_PATH", "SkillDictionary", "fold", "tokenize"]
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import (
     BaseModel,
     EmailStr,
@@ -41,6 +41,11 @@ class CVRequest(BaseModel):
         None, description="Descrição da vaga alvo (opcional)"
     )
 
+    target_job_id: Optional[str] = Field(
+        None,
+        description="Id de uma vaga registrada em /job-postings, no lugar da descrição (opcional)",
+    )
+
     @field_validator("phone")
     @classmethod
     def validate_phone(cls, v):
@@ -193,6 +198,80 @@ class CVRequest(BaseModel):
 
         return data
 
+    @model_validator(mode="after")
+    def validate_target_job(self):
+        if self.target_job_description and self.target_job_id:
+            raise ValueError(
+                "Informe a descrição da vaga (target_job_description) ou o id de uma "
+                "vaga registrada (target_job_id), não ambos."
+            )
+
+        return self
+
+
+class CompatibilityScoreRequest(BaseModel):
+    target_job_description: str = Field(
+        ..., min_length=10, description="Descrição da vaga alvo"
+    )
+
+    skills: str = Field(
+        ..., min_length=2, description="Descrição livre das habilidades e competências"
+    )
+
+    professional_experience: Optional[str] = Field(
+        None, description="Descrição livre das experiências profissionais (opcional)"
+    )
+
+    projects: Optional[str] = Field(
+        None, description="Descrição livre de projetos (opcional)"
+    )
+
+    education: Optional[str] = Field(
+        None, description="Descrição livre da formação acadêmica (opcional)"
+    )
+
+
+class TargetJob(BaseModel):
+    description: Optional[str] = Field(
+        None, min_length=10, description="Descrição da vaga"
+    )
+
+    job_posting_id: Optional[str] = Field(
+        None, description="Id de uma vaga registrada em /job-postings"
+    )
+
+    @model_validator(mode="after")
+    def validate_job(self):
+        if bool(self.description) == bool(self.job_posting_id):
+            raise ValueError(
+                "Informe a descrição da vaga (description) ou o id de uma vaga "
+                "registrada (job_posting_id), um dos dois."
+            )
+
+        return self
+
+
+class JobComparisonRequest(BaseModel):
+    skills: str = Field(
+        ..., min_length=2, description="Descrição livre das habilidades e competências"
+    )
+
+    professional_experience: Optional[str] = Field(
+        None, description="Descrição livre das experiências profissionais (opcional)"
+    )
+
+    projects: Optional[str] = Field(
+        None, description="Descrição livre de projetos (opcional)"
+    )
+
+    education: Optional[str] = Field(
+        None, description="Descrição livre da formação acadêmica (opcional)"
+    )
+
+    jobs: List[TargetJob] = Field(
+        ..., min_length=1, description="Vagas a comparar com o perfil do candidato"
+    )
+
 
 class LearningResource(BaseModel):
     title: str
@@ -228,6 +307,16 @@ class JobCompatibilityAnalysis(BaseModel):
     model_config = {"extra": "forbid"}
 
 
+# What Gemini is asked to produce: learning resources are looked up in the
+# local catalog instead, so they cost no output tokens and the links resolve
+class GeneratedCompatibility(BaseModel):
+    compatibility_score: float = Field(..., ge=0, le=100)
+    skills: List[SkillStatus]
+    improvement_suggestions: List[str]
+
+    model_config = {"extra": "forbid"}
+
+
 class PersonalInfo(BaseModel):
     name: str
     title: str
@@ -394,5 +483,133 @@ class CVResponse(BaseModel):
     }
 
 
+class GeneratedCVResponse(BaseModel):
+    generated_cv: GeneratedCV
+    job_compatibility: Optional[GeneratedCompatibility] = None
+
+    model_config = {"extra": "forbid"}
+
+
+# Reduced schemas for regenerating one section of an existing CV: each wraps
+# a single GeneratedCV field under the same name, so Gemini only writes that part
+class ProfessionalSummarySection(BaseModel):
+    professional_summary: str
+
+    model_config = {"extra": "forbid"}
+
+
+class ExperienceSection(BaseModel):
+    experience_entries: List[ExperienceEntry]
+
+    model_config = {"extra": "forbid"}
+
+
+class ProjectsSection(BaseModel):
+    project_entries: List[ProjectEntry]
+
+    model_config = {"extra": "forbid"}
+
+
+class EducationSection(BaseModel):
+    education_entries: List[EducationEntry]
+
+    model_config = {"extra": "forbid"}
+
+
+class SkillsSection(BaseModel):
+    skills: List[str]
+
+    model_config = {"extra": "forbid"}
+
+
+class AchievementsSection(BaseModel):
+    achievements: List[str]
+
+    model_config = {"extra": "forbid"}
+
+
+class CertificationsSection(BaseModel):
+    certifications: List[str]
+
+    model_config = {"extra": "forbid"}
+
+
+class LanguagesSection(BaseModel):
+    languages: List[Language]
+
+    model_config = {"extra": "forbid"}
+
+
+CVSection = Literal[
+    "professional_summary",
+    "experience_entries",
+    "project_entries",
+    "education_entries",
+    "skills",
+    "achievements",
+    "certifications",
+    "languages",
+]
+
+CV_SECTION_MODELS = {
+    "professional_summary": ProfessionalSummarySection,
+    "experience_entries": ExperienceSection,
+    "project_entries": ProjectsSection,
+    "education_entries": EducationSection,
+    "skills": SkillsSection,
+    "achievements": AchievementsSection,
+    "certifications": CertificationsSection,
+    "languages": LanguagesSection,
+}
+
+
+class SectionRegenerationRequest(BaseModel):
+    cv_content: CVResponse = Field(..., description="Currículo gerado anteriormente")
+
+    section: CVSection = Field(..., description="Seção do currículo a ser reescrita")
+
+    text: str = Field(
+        ..., min_length=10, description="Descrição livre do novo conteúdo da seção"
+    )
+
+    target_job_description: Optional[str] = Field(
+        None, description="Descrição da vaga alvo (opcional)"
+    )
+
+    @field_validator("text")
+    @classmethod
+    def validate_text(cls, v):
+        clean_text = v.strip()
+        if len(clean_text) < 10:
+            raise ValueError(
+                "Descreva o novo conteúdo da seção de forma mais detalhada (mínimo 10 caracteres)."
+            )
+
+        return clean_text
+
+
+class JobPostingRequest(BaseModel):
+    description: str = Field(..., min_length=10, description="Descrição da vaga")
+
+
+# What Gemini extracts from a job posting, once per posting; CV prompts carry
+# this compact form instead of the full description
+class JobRequirements(BaseModel):
+    title: str
+    seniority: str
+    min_years_experience: Optional[int] = None
+    required_skills: List[str]
+    nice_to_have_skills: List[str]
+    responsibilities: List[str]
+
+    model_config = {"extra": "forbid"}
+
+
+class JobPosting(BaseModel):
+    id: str
+    description: str
+    requirements: JobRequirements
+
+
 class RawAPIResponse(BaseModel):
     cv_content: CVResponse
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concorrência da rota síncrona vs. rota assíncrona de geração de CV.
+
+O Gemini é substituído pelo FakeGeminiBackend, que apenas espera uma
+latência fixa antes de devolver um JSON válido de CVResponse, então o que se
+mede é a capacidade da API de manter várias chamadas lentas em andamento.
+
+Uso:
+    python benchmarks/bench_async_concurrency.py --requests 400 --latency 2.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["USAGE_LEDGER_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.api import routes  # noqa: E402
+from app.integrations.gemini.backends import FakeGeminiBackend  # noqa: E402
+from app.integrations.gemini.service import get_gemini_service  # noqa: E402
+
+PAYLOAD = {
+    "full_name": "Maria Silva Santos",
+    "desired_role": "Desenvolvedora Full Stack",
+    "email": "mariasilva@gmail.com",
+    "phone": "11987654321",
+    "professional_experience": "Trabalho há 3 anos como desenvolvedora full stack com React e Python.",
+    "education": "Ciência da Computação na UFMG, formada em 2021.",
+    "skills": "Python, JavaScript, React, Node, SQL, MongoDB, Git.",
+}
+
+
+def unique_payload(index: int) -> dict:
+    """Distinct payloads so neither the cache nor single-flight coalescing kicks in"""
+    payload = dict(PAYLOAD)
+    payload["professional_experience"] += f" Requisição {index}."
+    return payload
+
+
+def install_stub_backend(latency: float) -> None:
+    # The routes resolve the same process-wide service on each request
+    get_gemini_service().client.client = FakeGeminiBackend(
+        latency_ms=latency * 1000, jitter_ms=0, seed=0
+    )
+
+
+def build_sync_app() -> FastAPI:
+    """Reproduces the previous plain `def` route for comparison"""
+    app = FastAPI()
+
+    @app.post("/api/v1/generate-cv")
+    def generate_cv(cv_request: routes.CVRequest):
+        return get_gemini_service().generate_cv(cv_request)
+
+    return app
+
+
+def build_async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api/v1")
+    return app
+
+
+async def run(app: FastAPI, total: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        latencies = []
+
+        async def timed_post(index: int) -> httpx.Response:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/generate-cv", json=unique_payload(index))
+            latencies.append(time.perf_counter() - started)
+            return response
+
+        # Untimed: the first request pays for lazy imports and schema setup
+        await client.post("/api/v1/generate-cv", json=unique_payload(-1))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(timed_post(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    ok = sum(1 for r in responses if r.status_code == 200 and "cv_content" in r.json())
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {
+        "requests": total,
+        "ok": ok,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "latency_p50_s": round(float(p50), 3),
+        "latency_p95_s": round(float(p95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    install_stub_backend(args.latency)
+
+    results = {
+        "latency_s": args.latency,
+        "sync_route": asyncio.run(run(build_sync_app(), args.requests)),
+        "async_route": asyncio.run(run(build_async_app(), args.requests)),
+    }
+    results["speedup"] = round(
+        results["sync_route"]["elapsed_s"] / results["async_route"]["elapsed_s"], 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: um candidato contra várias vagas.
+
+Compara N chamadas de `agenerate_cv` (uma por vaga, cada uma gerando o
+currículo inteiro de novo) com `compare_jobs`, que prepara o perfil uma vez
+e pede ao Gemini só a análise de compatibilidade de cada vaga. Usa o
+FakeGeminiBackend com latência proporcional ao tamanho da saída
+(FAKE_MS_PER_OUTPUT_TOKEN) e a mesma concorrência nos dois casos. Cada lado
+roda uma rodada de aquecimento e depois `--rounds` rodadas medidas; o tempo
+de parede é reportado em p50/p95 das rodadas.
+
+Uso:
+    python benchmarks/bench_job_comparison.py --jobs 20 --concurrency 8 --ms-per-token 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["USAGE_LEDGER_ENABLED"] = "false"
+
+from app.integrations.gemini.backends import FakeGeminiBackend  # noqa: E402
+from app.integrations.gemini.service import GeminiService  # noqa: E402
+from app.schemas.cv import CVRequest, JobComparisonRequest  # noqa: E402
+
+CANDIDATE = {
+    "professional_experience": "Trabalho há 4 anos com backend em Python e Django, APIs REST e Postgres.",
+    "projects": "Fiz um app de finanças pessoais em React Native com backend em Node.",
+    "education": "Ciência da Computação na UFMG, formada em 2021.",
+    "skills": "Python, Django, SQL, Docker, React, Git.",
+}
+STACKS = (
+    "Python, Django e PostgreSQL",
+    "React, TypeScript e Next.js",
+    "Java, Spring Boot e Kafka",
+    "Spark, Airflow e AWS",
+    "Go, Kubernetes e gRPC",
+)
+
+
+class CountingBackend(FakeGeminiBackend):
+    """FakeGeminiBackend that adds up the calls and output tokens it produced"""
+
+    calls = 0
+    output_tokens = 0
+
+    def _prepare(self, contents, config) -> tuple:
+        response, error = super()._prepare(contents, config)
+        if response is not None:
+            self.calls += 1
+            self.output_tokens += response.usage_metadata.candidates_token_count
+        return response, error
+
+
+def job_description(index: int) -> str:
+    return f"Vaga {index}: pessoa desenvolvedora com {STACKS[index % len(STACKS)]}."
+
+
+async def per_job_generation(service: GeminiService, jobs: int, concurrency: int) -> None:
+    cv_requests = {
+        index: CVRequest(
+            full_name="Maria Silva Santos",
+            desired_role="Desenvolvedora Backend",
+            email="mariasilva@gmail.com",
+            target_job_description=job_description(index),
+            **CANDIDATE,
+        )
+        for index in range(jobs)
+    }
+    async for _, result in service.agenerate_many(cv_requests, concurrency):
+        assert "cv_content" in result, result
+
+
+async def comparison(service: GeminiService, jobs: int, concurrency: int) -> None:
+    request = JobComparisonRequest(
+        jobs=[{"description": job_description(index)} for index in range(jobs)],
+        **CANDIDATE,
+    )
+    async for _, result in service.compare_jobs(request, concurrency):
+        assert "job_compatibility" in result, result
+
+
+def measure(backend: CountingBackend, run, rounds: int, warmup: int) -> dict:
+    # Untimed and uncounted: the first round pays for lazy imports and setup
+    for _ in range(warmup):
+        asyncio.run(run())
+    backend.calls = backend.output_tokens = 0
+    walls = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        asyncio.run(run())
+        walls.append(time.perf_counter() - started)
+    p50, p95 = np.percentile(walls, [50, 95]) * 1000
+    return {
+        "calls": backend.calls // rounds,
+        "output_tokens": backend.output_tokens // rounds,
+        "wall_p50_ms": round(float(p50), 1),
+        "wall_p95_ms": round(float(p95), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-latency-ms", type=float, default=300.0)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    args = parser.parse_args()
+
+    service = GeminiService()
+    backend = CountingBackend(
+        latency_ms=args.base_latency_ms,
+        jitter_ms=0,
+        ms_per_output_token=args.ms_per_token,
+        seed=0,
+    )
+    service.client.client = backend
+
+    per_job = measure(
+        backend,
+        lambda: per_job_generation(service, args.jobs, args.concurrency),
+        args.rounds,
+        args.warmup,
+    )
+    compared = measure(
+        backend,
+        lambda: comparison(service, args.jobs, args.concurrency),
+        args.rounds,
+        args.warmup,
+    )
+    print(
+        json.dumps(
+            {
+                "jobs": args.jobs,
+                "concurrency": args.concurrency,
+                "generate_cv_per_job": per_job,
+                "compare_jobs": compared,
+                "output_reduction": round(
+                    per_job["output_tokens"] / max(compared["output_tokens"], 1), 1
+                ),
+                "speedup_p50": round(per_job["wall_p50_ms"] / compared["wall_p50_ms"], 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark do índice de quase-duplicatas (SimHash + bandas LSH).
+
+Mede a memória do índice e a latência de consulta com muitas entradas (padrão
+1M), além do custo de calcular o SimHash de um pedido. As entradas usam
+fingerprints aleatórios, e as consultas são variações de entradas existentes
+com alguns bits trocados (acertos) ou fingerprints novos (falhas). Também
+mostra a distância medida entre pedidos reais do gerador de carga e as
+versões editadas deles (erro de digitação, frase a mais).
+
+Uso:
+    python benchmarks/bench_near_duplicates.py --entries 1000000 --threshold 0.9
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.near_duplicates import FINGERPRINT_BITS, SimHashIndex, simhash  # noqa: E402
+from loadtest import make_payload  # noqa: E402
+
+TEXT_FIELDS = ("professional_experience", "projects", "education", "skills")
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 1),
+        "p99_us": round(ordered[int(len(ordered) * 0.99)] * 1e6, 1),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 1),
+    }
+
+
+def flip_bits(fingerprint: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(FINGERPRINT_BITS), count):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def request_text(payload: dict) -> str:
+    return "\n".join(payload.get(name) or "" for name in TEXT_FIELDS)
+
+
+def measure_index(entries: int, threshold: float, scopes: int, queries: int) -> dict:
+    rng = random.Random(0)
+    fingerprints = [rng.getrandbits(FINGERPRINT_BITS) for _ in range(entries)]
+    tracemalloc.start()
+    index = SimHashIndex(threshold, entries)
+    started = time.perf_counter()
+    for i, fingerprint in enumerate(fingerprints):
+        index.insert(f"scope-{i % scopes}", fingerprint, f"{i:064x}")
+    insert_seconds = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    hits, misses, found = [], [], 0
+    for _ in range(queries):
+        i = rng.randrange(entries)
+        query = flip_bits(fingerprints[i], rng.randint(0, index.max_distance), rng)
+        started = time.perf_counter()
+        found += index.nearest(f"scope-{i % scopes}", query) is not None
+        hits.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index.nearest("scope-0", rng.getrandbits(FINGERPRINT_BITS))
+        misses.append(time.perf_counter() - started)
+
+    return {
+        "entries": entries,
+        "bands": len(index._bands),
+        "max_distance_bits": index.max_distance,
+        "index_memory_mb": round(memory / 2**20, 1),
+        "insert_us_per_entry": round(insert_seconds / entries * 1e6, 2),
+        "lookup_near_duplicate": percentiles(hits),
+        "lookup_new_text": percentiles(misses),
+        "recall": round(found / queries, 4),
+    }
+
+
+def measure_requests(samples: int) -> dict:
+    rng = random.Random(1)
+    typo, sentence, unrelated, timings = [], [], [], []
+    for _ in range(samples):
+        payload = make_payload(rng, "medium")
+        text = request_text(payload)
+        started = time.perf_counter()
+        fingerprint = simhash(text)
+        timings.append(time.perf_counter() - started)
+
+        position = rng.randrange(len(text))
+        edited = text[:position] + "x" + text[position + 1 :]
+        typo.append(bin(fingerprint ^ simhash(edited)).count("1"))
+        sentence.append(
+            bin(fingerprint ^ simhash(text + " Também tenho inglês avançado.")).count("1")
+        )
+        unrelated.append(
+            bin(fingerprint ^ simhash(request_text(make_payload(rng, "medium")))).count("1")
+        )
+    return {
+        "simhash": percentiles(timings),
+        "distance_bits_typo": {"median": statistics.median(typo), "max": max(typo)},
+        "distance_bits_extra_sentence": {
+            "median": statistics.median(sentence),
+            "max": max(sentence),
+        },
+        "distance_bits_unrelated": {
+            "median": statistics.median(unrelated),
+            "min": min(unrelated),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--scopes", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        json.dumps(
+            {
+                "index": measure_index(args.entries, args.threshold, args.scopes, args.queries),
+                "requests": measure_requests(args.samples),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caminho antigo (json.loads + JSONResponse/jsonable_encoder) vs. novo
+(CVResponse.model_validate_json + FastJSONResponse) para respostas grandes.
+
+O caminho novo também valida a resposta contra o CVResponse, coisa que o antigo
+não fazia; mesmo assim faz menos passadas sobre os dados.
+
+Uso:
+    python benchmarks/bench_response_serialization.py --sizes 3 10 30 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "fake"
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic_core import to_json  # noqa: E402
+
+from app.core import responses  # noqa: E402
+from app.core.responses import FastJSONResponse  # noqa: E402
+from app.integrations.gemini.backends import FakeGeminiBackend  # noqa: E402
+from app.integrations.gemini.schema_registry import get_schema_registry  # noqa: E402
+from app.schemas.cv import CVResponse  # noqa: E402
+
+
+def upstream_text(list_items: int) -> str:
+    """A valid CVResponse JSON the size of a response with list_items per list"""
+    schema = get_schema_registry().get_schema(CVResponse)
+    backend = FakeGeminiBackend(list_items=list_items, string_words=20, seed=0)
+    return json.dumps(backend._from_schema(schema, schema.get("$defs", {})), ensure_ascii=False)
+
+
+def per_call_us(fn, repeat: int, rounds: int = 7) -> float:
+    """Median over ``rounds`` timings of ``repeat`` calls, after an untimed warm-up call"""
+    fn()
+    timings = timeit.repeat(fn, number=repeat, repeat=rounds)
+    return round(statistics.median(timings) / repeat * 1e6, 1)
+
+
+def measure(text: str, repeat: int) -> dict:
+    def old_route():
+        return JSONResponse(content={"cv_content": json.loads(text)}).body
+
+    def old_encoder():
+        return JSONResponse(content=jsonable_encoder({"cv_content": json.loads(text)})).body
+
+    def new_route():
+        return FastJSONResponse(
+            content={"cv_content": CVResponse.model_validate_json(text)}
+        ).body
+
+    def new_pydantic_core_only():
+        return to_json({"cv_content": CVResponse.model_validate_json(text)})
+
+    return {
+        "bytes": len(text.encode("utf-8")),
+        "old_json_loads_dumps_us": per_call_us(old_route, repeat),
+        "old_with_jsonable_encoder_us": per_call_us(old_encoder, repeat),
+        "new_validate_json_fast_response_us": per_call_us(new_route, repeat),
+        "new_pydantic_core_only_us": per_call_us(new_pydantic_core_only, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 10, 30])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {
+        f"list_items={size}": measure(upstream_text(size), args.repeat)
+        for size in args.sizes
+    }
+    print(
+        json.dumps(
+            {"orjson": responses.orjson is not None, "results": results}, indent=2
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: custo por requisição de montar schema e GenerateContentConfig.
+
+Compara o caminho antigo (CVResponse.model_json_schema() + _clean_schema +
+dois GenerateContentConfig por chamada) com a busca no SchemaRegistry.
+
+Uso:
+    python benchmarks/bench_schema_config.py --iterations 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import types  # noqa: E402
+
+from app.integrations.gemini.schema_registry import (  # noqa: E402
+    SchemaRegistry,
+    clean_schema,
+)
+from app.integrations.gemini.service import GeminiService  # noqa: E402
+from app.schemas.cv import CVResponse  # noqa: E402
+
+SYSTEM_INSTRUCTION = GeminiService.BASE_SYSTEM_INSTRUCTION
+MODEL = "gemini-2.5-flash"
+
+
+def per_request_build():
+    """What every request used to pay for"""
+    json_schema = CVResponse.model_json_schema()
+    schema = clean_schema(json_schema)
+    types.GenerateContentConfig(
+        system_instruction=SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=json_schema,
+    )
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_INSTRUCTION,
+        response_mime_type="application/json",
+        response_schema=schema,
+    )
+
+
+def measure(fn, iterations: int) -> dict:
+    fn()
+
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    cpu = time.process_time() - started
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "cpu_us_per_call": round(cpu / iterations * 1e6, 2),
+        "peak_allocated_bytes_per_call": peak,
+        "retained_bytes_per_call": max(retained, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    registry = SchemaRegistry()
+    results = {
+        "iterations": args.iterations,
+        "per_request_build": measure(per_request_build, args.iterations),
+        "registry_lookup": measure(
+            lambda: registry.get_config(CVResponse, SYSTEM_INSTRUCTION, MODEL),
+            args.iterations,
+        ),
+    }
+    results["cpu_speedup"] = round(
+        results["per_request_build"]["cpu_us_per_call"]
+        / max(results["registry_lookup"]["cpu_us_per_call"], 0.01),
+        1,
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
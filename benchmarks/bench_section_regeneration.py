@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gerar o currículo inteiro de novo vs. reescrever uma única seção.
+
+Usa o FakeGeminiBackend com latência proporcional ao tamanho da saída
+(FAKE_MS_PER_OUTPUT_TOKEN), como em um modelo real, e compara os tokens de
+saída e o tempo de parede da geração completa com os de
+`aregenerate_section` para cada seção.
+
+Uso:
+    python benchmarks/bench_section_regeneration.py --requests 10 --ms-per-token 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["USAGE_LEDGER_ENABLED"] = "false"
+
+from app.integrations.gemini.backends import FakeGeminiBackend  # noqa: E402
+from app.integrations.gemini.service import GeminiService  # noqa: E402
+from app.schemas.cv import CV_SECTION_MODELS, CVRequest, SectionRegenerationRequest  # noqa: E402
+
+
+class CountingBackend(FakeGeminiBackend):
+    """FakeGeminiBackend that adds up the output tokens it produced"""
+
+    output_tokens = 0
+
+    def _prepare(self, contents, config) -> tuple:
+        response, error = super()._prepare(contents, config)
+        if response is not None:
+            self.output_tokens += response.usage_metadata.candidates_token_count
+        return response, error
+
+
+def make_request(index: int) -> CVRequest:
+    return CVRequest(
+        full_name="Maria Silva Santos",
+        desired_role="Desenvolvedora Full Stack",
+        email="mariasilva@gmail.com",
+        professional_experience=f"Trabalho há 3 anos como desenvolvedora full stack. Requisição {index}.",
+        projects="Fiz um app de finanças pessoais em React Native com backend em Node.",
+        education="Ciência da Computação na UFMG, formada em 2021.",
+        skills="Python, JavaScript, React, Node, SQL, MongoDB, Git.",
+    )
+
+
+async def measure(backend: CountingBackend, calls: int, warmup: int, run) -> dict:
+    # Untimed and uncounted: the first calls pay for lazy imports and setup
+    for index in range(warmup):
+        await run(-1 - index)
+    backend.output_tokens = 0
+    latencies = []
+    for index in range(calls):
+        started = time.perf_counter()
+        result = await run(index)
+        latencies.append(time.perf_counter() - started)
+        assert "cv_content" in result, result
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    return {
+        "output_tokens": backend.output_tokens // calls,
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--base-latency-ms", type=float, default=300.0)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    parser.add_argument("--warmup", type=int, default=1)
+    args = parser.parse_args()
+
+    service = GeminiService()
+    backend = CountingBackend(
+        latency_ms=args.base_latency_ms,
+        jitter_ms=0,
+        ms_per_output_token=args.ms_per_token,
+        seed=0,
+    )
+    service.client.client = backend
+
+    full = asyncio.run(
+        measure(
+            backend,
+            args.requests,
+            args.warmup,
+            lambda index: service.agenerate_cv(make_request(index)),
+        )
+    )
+    cv_content = asyncio.run(service.agenerate_cv(make_request(0)))["cv_content"]
+
+    sections = {}
+    for section in CV_SECTION_MODELS:
+        request = SectionRegenerationRequest(
+            cv_content=cv_content,
+            section=section,
+            text="Acrescente a liderança do projeto de migração para a nuvem em 2023.",
+        )
+        sections[section] = asyncio.run(
+            measure(
+                backend,
+                args.requests,
+                args.warmup,
+                lambda _: service.aregenerate_section(request),
+            )
+        )
+        sections[section]["output_reduction"] = round(
+            full["output_tokens"] / max(sections[section]["output_tokens"], 1), 1
+        )
+
+    print(json.dumps({"full_generation": full, "sections": sections}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
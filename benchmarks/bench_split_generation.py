@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: uma chamada única vs. geração dividida (CV e compatibilidade em paralelo).
+
+Usa o FakeGeminiBackend com latência proporcional ao tamanho da saída
+(FAKE_MS_PER_OUTPUT_TOKEN), como em um modelo real, para comparar o tempo de
+parede das requisições com `target_job_description`.
+
+Uso:
+    python benchmarks/bench_split_generation.py --requests 20 --ms-per-token 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["USAGE_LEDGER_ENABLED"] = "false"
+
+from app.integrations.gemini.backends import FakeGeminiBackend  # noqa: E402
+from app.integrations.gemini.service import GeminiService  # noqa: E402
+from app.schemas.cv import CVRequest  # noqa: E402
+
+
+def make_request(index: int) -> CVRequest:
+    return CVRequest(
+        full_name="Maria Silva Santos",
+        desired_role="Desenvolvedora Full Stack",
+        email="mariasilva@gmail.com",
+        professional_experience=f"Trabalho há 3 anos como desenvolvedora full stack. Requisição {index}.",
+        education="Ciência da Computação na UFMG, formada em 2021.",
+        skills="Python, JavaScript, React, Node, SQL, MongoDB, Git.",
+        target_job_description="Buscamos pessoa desenvolvedora com Python, React, AWS e Docker.",
+    )
+
+
+def latency_summary(latencies: list) -> dict:
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    return {
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+async def measure(service: GeminiService, requests: int, warmup: int) -> dict:
+    # Untimed: the first calls pay for lazy imports and connection setup
+    for index in range(warmup):
+        await service.agenerate_cv(make_request(-1 - index))
+    latencies = []
+    for index in range(requests):
+        started = time.perf_counter()
+        result = await service.agenerate_cv(make_request(index))
+        latencies.append(time.perf_counter() - started)
+        assert "cv_content" in result, result
+    return latency_summary(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--base-latency-ms", type=float, default=300.0)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    parser.add_argument("--warmup", type=int, default=1)
+    args = parser.parse_args()
+
+    service = GeminiService()
+    service.client.client = FakeGeminiBackend(
+        latency_ms=args.base_latency_ms,
+        jitter_ms=0,
+        ms_per_output_token=args.ms_per_token,
+        seed=0,
+    )
+
+    service.split_generation = False
+    single = asyncio.run(measure(service, args.requests, args.warmup))
+    service.split_generation = True
+    split = asyncio.run(measure(service, args.requests, args.warmup))
+
+    print(
+        json.dumps(
+            {
+                "single_call": single,
+                "split_calls": split,
+                "speedup_p50": round(single["p50_ms"] / split["p50_ms"], 2),
+                "speedup_p95": round(single["p95_ms"] / split["p95_ms"], 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
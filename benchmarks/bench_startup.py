@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização: tempo até a primeira resposta de `/health`.
+
+Sobe `uvicorn main:app` num processo novo, consulta o endpoint até receber 200
+e repete várias vezes. Mede também o tempo até `/ready` responder 200, ou
+seja, até o serviço do Gemini estar construído e com as conexões aquecidas
+(outra rota pode ser escolhida com `--ready-path`).
+
+Uso:
+    python benchmarks/bench_startup.py --runs 5
+    SERVICE_PRELOAD=false python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, started: float, timeout: float) -> float:
+    """Poll url until it answers 200; returns seconds since started"""
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except OSError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{url} não respondeu em {timeout}s")
+
+
+def measure(ready_path: str, timeout: float) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "LLM_BACKEND": os.environ.get("LLM_BACKEND", "fake"),
+        "USAGE_LEDGER_ENABLED": os.environ.get("USAGE_LEDGER_ENABLED", "false"),
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        health = wait_for(base + "/health", started, timeout)
+        ready = wait_for(base + ready_path, started, timeout)
+        return {"health_s": health, "ready_s": ready}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(values: list) -> dict:
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ready-path", default="/ready")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    runs = [measure(args.ready_path, args.timeout) for _ in range(args.runs)]
+    print(
+        json.dumps(
+            {
+                "service_preload": os.environ.get("SERVICE_PRELOAD", "true"),
+                "first_health_s": summary([run["health_s"] for run in runs]),
+                "first_ready_path_s": summary([run["ready_s"] for run in runs]),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: custo de registrar o consumo de tokens no caminho da requisição.
+
+Compara `UsageLedger.record` (buffer em memória, gravado em lote por
+`flush`) com um INSERT + COMMIT no SQLite por chamada, e mede o tempo do
+`summary` (totais, percentis e agrupamento) sobre o histórico gravado.
+
+Uso:
+    python benchmarks/bench_usage_ledger.py --calls 20000 --clients 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.usage import GROUP_COLUMNS, UsageLedger, attribute_usage  # noqa: E402
+
+ENDPOINTS = ("/api/v1/generate-cv", "/api/v1/generate-cv/stream", "/api/v1/jobs")
+
+
+def make_usage(rng: random.Random) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_token_count=rng.randint(300, 1500),
+        candidates_token_count=rng.randint(800, 2500),
+        cached_content_token_count=0,
+        thoughts_token_count=0,
+    )
+
+
+def record_calls(ledger: UsageLedger, calls: int, clients: int, seed: int) -> list:
+    rng = random.Random(seed)
+    latencies = []
+    for index in range(calls):
+        usage = make_usage(rng)
+        with attribute_usage(f"key:{index % clients:012x}", ENDPOINTS[index % len(ENDPOINTS)]):
+            started = time.perf_counter()
+            ledger.record("gemini-2.5-flash", usage, 1.5)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def commit_per_call(ledger: UsageLedger, calls: int, clients: int, seed: int) -> list:
+    """Same rows as record(), but written and committed synchronously one by one"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(ledger.path)
+    latencies = []
+    for index in range(calls):
+        usage = make_usage(rng)
+        started = time.perf_counter()
+        conn.execute(
+            "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                time.time(),
+                "1970-01-01",
+                f"key:{index % clients:012x}",
+                ENDPOINTS[index % len(ENDPOINTS)],
+                "gemini-2.5-flash",
+                usage.prompt_token_count,
+                usage.candidates_token_count,
+                0,
+                0,
+                1.5,
+            ),
+        )
+        conn.commit()
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    return latencies
+
+
+def describe(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 2),
+        "p95_us": round(latencies[int(len(latencies) * 0.95)] * 1e6, 2),
+        "p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = UsageLedger(os.path.join(directory, "usage.sqlite3"), retention_days=0)
+
+        buffered = describe(record_calls(ledger, args.calls, args.clients, args.seed))
+        started = time.perf_counter()
+        written = ledger.flush()
+        flush_ms = (time.perf_counter() - started) * 1000
+        direct = describe(commit_per_call(ledger, args.calls, args.clients, args.seed))
+
+        since = time.time() - 86400
+        summaries = {}
+        for group_by in (None,) + GROUP_COLUMNS:
+            started = time.perf_counter()
+            ledger.summary(since, group_by=group_by)
+            summaries[group_by or "total"] = round((time.perf_counter() - started) * 1000, 2)
+
+    print(
+        json.dumps(
+            {
+                "calls": args.calls,
+                "clients": args.clients,
+                "record_buffered": buffered,
+                "flush": {"rows": written, "ms": round(flush_ms, 2)},
+                "commit_per_call": direct,
+                "speedup_p50": round(direct["p50_us"] / max(buffered["p50_us"], 1e-9), 1),
+                "summary_ms": summaries,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API de geração de currículos.
+
+Gera payloads realistas de CVRequest (válidos e inválidos, em tamanhos
+configuráveis), dispara contra a API com concorrência fixa ou taxa alvo
+(RPS) e emite um relatório JSON com vazão, latências p50/p95/p99 e erros.
+
+Por padrão a API roda no próprio processo (transporte ASGI) com
+LLM_BACKEND=fake, então nenhuma cota do Gemini é consumida. Use --url para
+apontar para um servidor já em execução.
+
+Uso:
+    python benchmarks/loadtest.py run --concurrency 50 --requests 2000 -o base.json
+    python benchmarks/loadtest.py run --rps 100 --duration 30 --invalid-ratio 0.1
+    python benchmarks/loadtest.py compare base.json new.json --threshold 0.10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+FIRST_NAMES = ["Maria", "João", "Ana", "Pedro", "Juliana", "Lucas", "Fernanda", "Rafael"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Costa", "Pereira", "Alves"]
+ROLES = [
+    "Desenvolvedor Python",
+    "Desenvolvedora Full Stack",
+    "Analista de Dados",
+    "Engenheiro de Machine Learning",
+    "Designer UX/UI",
+]
+COMPANIES = ["WebSolutions", "InovaTech", "TechBR", "DataCorp", "CloudNine"]
+TECHNOLOGIES = [
+    "Python", "JavaScript", "React", "Node", "SQL", "MongoDB", "Docker",
+    "AWS", "Kubernetes", "TensorFlow", "Git", "FastAPI", "TypeScript",
+]
+SENTENCES = [
+    "Trabalhei {years} anos na {company} mexendo com {tech} no dia a dia.",
+    "Lá eu ajudei o time a melhorar a performance do sistema usando {tech}.",
+    "Também liderei alguns projetos menores e cuidei do deploy com {tech}.",
+    "Foi bem legal porque aprendi bastante sobre {tech} e boas práticas.",
+    "A gente tinha uma equipe pequena mas bem unida, e eu fazia de tudo um pouco.",
+]
+
+# Payload sizes: number of sentences in each free-text field
+SIZES = {"small": 2, "medium": 6, "large": 20}
+
+INVALID_MUTATIONS = {
+    "short_name": lambda p: p.update(full_name="João"),
+    "invalid_email": lambda p: p.update(email="email_invalido"),
+    "invalid_phone": lambda p: p.update(phone="123"),
+    "no_contact": lambda p: (p.pop("email", None), p.pop("phone", None)),
+    "empty_fields": lambda p: p.update(
+        full_name="", desired_role="", professional_experience="", education="", skills=""
+    ),
+    "name_with_digits": lambda p: p.update(full_name="João123 Silva"),
+}
+
+
+def _text(rng: random.Random, sentences: int) -> str:
+    return " ".join(
+        rng.choice(SENTENCES).format(
+            years=rng.randint(1, 8),
+            company=rng.choice(COMPANIES),
+            tech=rng.choice(TECHNOLOGIES),
+        )
+        for _ in range(sentences)
+    )
+
+
+def make_payload(rng: random.Random, size: str = "medium", invalid: Optional[str] = None) -> dict:
+    """
+    Build one CVRequest payload
+
+    Args:
+        rng (random.Random): Source of randomness
+        size (str): One of SIZES, controls the length of free-text fields
+        invalid (Optional[str]): Name of an INVALID_MUTATIONS entry to apply
+
+    Returns:
+        dict: The JSON body for /generate-cv
+    """
+    sentences = SIZES[size]
+    payload = {
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "desired_role": rng.choice(ROLES),
+        "email": f"user{rng.randint(1, 10**9)}@gmail.com",
+        "phone": f"119{rng.randint(10**7, 10**8 - 1)}",
+        "professional_experience": _text(rng, sentences),
+        "education": f"Fiz Ciência da Computação na UFMG e me formei em {rng.randint(2005, 2023)}.",
+        "skills": ", ".join(rng.sample(TECHNOLOGIES, k=min(len(TECHNOLOGIES), 3 + sentences // 2))),
+    }
+    if rng.random() < 0.5:
+        payload["projects"] = _text(rng, max(sentences // 2, 1))
+    if rng.random() < 0.3:
+        payload["target_job_description"] = "Requisitos: " + ", ".join(
+            rng.sample(TECHNOLOGIES, k=5)
+        )
+    if invalid:
+        INVALID_MUTATIONS[invalid](payload)
+    return payload
+
+
+class PayloadSource:
+    """Yields payloads mixing valid, invalid and repeated (cacheable) requests"""
+
+    def __init__(self, seed: int, size: str, invalid_ratio: float, repeat_ratio: float):
+        self.rng = random.Random(seed)
+        self.size = size
+        self.invalid_ratio = invalid_ratio
+        self.repeat_ratio = repeat_ratio
+        self.history: List[dict] = []
+
+    def next(self) -> tuple:
+        if self.history and self.rng.random() < self.repeat_ratio:
+            return "repeat", self.rng.choice(self.history)
+        if self.rng.random() < self.invalid_ratio:
+            kind = self.rng.choice(list(INVALID_MUTATIONS))
+            return kind, make_payload(self.rng, self.size, kind)
+        payload = make_payload(self.rng, self.size)
+        self.history.append(payload)
+        return "valid", payload
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.kinds: Counter = Counter()
+
+    def record(self, kind: str, latency: float, status: int, error: Optional[str]) -> None:
+        self.latencies.append(latency)
+        self.statuses[str(status)] += 1
+        self.kinds[kind] += 1
+        if error:
+            self.errors[error] += 1
+
+    def report(self, elapsed: float, config: dict) -> dict:
+        values = sorted(self.latencies)
+        total = len(values)
+        failed = sum(self.errors.values())
+        return {
+            "config": config,
+            "requests": total,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(values) / total * 1000, 2) if total else 0.0,
+                "p50": round(_percentile(values, 50) * 1000, 2),
+                "p95": round(_percentile(values, 95) * 1000, 2),
+                "p99": round(_percentile(values, 99) * 1000, 2),
+                "max": round(values[-1] * 1000, 2) if values else 0.0,
+            },
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "status_codes": dict(self.statuses),
+            "errors": dict(self.errors),
+            "payload_kinds": dict(self.kinds),
+        }
+
+
+def _classify(response: httpx.Response) -> Optional[str]:
+    if response.status_code == 200:
+        try:
+            body = response.json()
+        except ValueError:
+            return "invalid_json"
+        return "upstream_error" if "error" in body else None
+    if response.status_code == 422:
+        return "validation_error"
+    if response.status_code == 429:
+        return "rate_limited"
+    return f"http_{response.status_code}"
+
+
+async def _one(client, endpoint, source, recorder) -> None:
+    kind, payload = source.next()
+    started = time.perf_counter()
+    try:
+        response = await client.post(endpoint, json=payload)
+        error = _classify(response)
+        status = response.status_code
+    except httpx.HTTPError as e:
+        error, status = type(e).__name__, 0
+    recorder.record(kind, time.perf_counter() - started, status, error)
+
+
+def _client(args) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+
+    os.environ.setdefault("LLM_BACKEND", "fake")
+    # Every in-process request comes from one client; keep the global
+    # concurrency cap but not the per-client rate limit
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+    # Don't leave a usage.sqlite3 behind in the current directory
+    os.environ.setdefault("USAGE_LEDGER_ENABLED", "false")
+    from main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://loadtest",
+        timeout=args.timeout,
+    )
+
+
+async def _run_concurrency(client, args, source, recorder) -> None:
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    remaining = [args.requests]
+
+    async def worker():
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            else:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            await _one(client, args.endpoint, source, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def _run_rps(client, args, source, recorder) -> None:
+    interval = 1.0 / args.rps
+    total = int(args.rps * args.duration) if args.duration else args.requests
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        delay = started + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_one(client, args.endpoint, source, recorder)))
+    await asyncio.gather(*tasks)
+
+
+async def run(args) -> dict:
+    source = PayloadSource(args.seed, args.size, args.invalid_ratio, args.repeat_ratio)
+    recorder = Recorder()
+    async with _client(args) as client:
+        started = time.perf_counter()
+        if args.rps:
+            await _run_rps(client, args, source, recorder)
+        else:
+            await _run_concurrency(client, args, source, recorder)
+        elapsed = time.perf_counter() - started
+
+    config = {
+        key: getattr(args, key)
+        for key in (
+            "url", "endpoint", "concurrency", "rps", "requests", "duration",
+            "size", "invalid_ratio", "repeat_ratio", "seed",
+        )
+    }
+    config["llm_backend"] = os.getenv("LLM_BACKEND", "gemini")
+    return recorder.report(elapsed, config)
+
+
+def compare(base: dict, new: dict, threshold: float) -> dict:
+    """
+    Flag regressions of `new` against `base`
+
+    Latency percentiles and error rate regress when they grow by more than
+    `threshold` (relative); throughput regresses when it drops by more than it.
+    """
+    checks = []
+    for key in ("p50", "p95", "p99"):
+        checks.append((f"latency_ms.{key}", base["latency_ms"][key], new["latency_ms"][key], True))
+    checks.append(("throughput_rps", base["throughput_rps"], new["throughput_rps"], False))
+    checks.append(("error_rate", base["error_rate"], new["error_rate"], True))
+
+    metrics = {}
+    regressions = []
+    for name, old, current, higher_is_worse in checks:
+        change = (current - old) / old if old else (0.0 if current == old else float("inf"))
+        regressed = change > threshold if higher_is_worse else change < -threshold
+        metrics[name] = {
+            "base": old,
+            "new": current,
+            "change": round(change, 4) if change != float("inf") else "inf",
+            "regression": regressed,
+        }
+        if regressed:
+            regressions.append(name)
+
+    return {"threshold": threshold, "regressions": regressions, "metrics": metrics}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="executa um teste de carga")
+    run_parser.add_argument("--url", help="URL base de um servidor em execução; omita para rodar in-process")
+    run_parser.add_argument("--endpoint", default="/api/v1/generate-cv")
+    mode = run_parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=20)
+    mode.add_argument("--rps", type=float, help="taxa alvo (loop aberto) em vez de concorrência fixa")
+    run_parser.add_argument("--requests", type=int, default=500)
+    run_parser.add_argument("--duration", type=float, help="segundos; substitui --requests")
+    run_parser.add_argument("--size", choices=sorted(SIZES), default="medium")
+    run_parser.add_argument("--invalid-ratio", type=float, default=0.0)
+    run_parser.add_argument("--repeat-ratio", type=float, default=0.0)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--timeout", type=float, default=120.0)
+    run_parser.add_argument("-o", "--output", help="grava o relatório JSON neste arquivo")
+
+    compare_parser = sub.add_parser("compare", help="compara dois relatórios")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.rps:
+            args.concurrency = None
+        report = asyncio.run(run(args))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    result = compare(base, new, args.threshold)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(1 if result["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Perfil do tempo de importação de `main:app` (python -X importtime).
+
+Roda a importação num processo novo, várias vezes, e lista os módulos com
+maior tempo acumulado da execução mediana. Também mostra se o SDK do Gemini
+(`google.genai`) entrou no caminho de importação, o que não deveria acontecer.
+
+Uso:
+    python benchmarks/profile_imports.py --top 15 --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_once() -> dict:
+    """Import main in a fresh interpreter; returns {module: (self_us, cumulative_us)}"""
+    env = {
+        **os.environ,
+        "LLM_BACKEND": os.environ.get("LLM_BACKEND", "fake"),
+        "USAGE_LEDGER_ENABLED": os.environ.get("USAGE_LEDGER_ENABLED", "false"),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = sorted((profile_once() for _ in range(args.runs)), key=lambda m: m["main"][1])
+    totals = [run["main"][1] / 1000 for run in runs]
+    median = runs[len(runs) // 2]
+
+    top = sorted(median.items(), key=lambda item: -item[1][1])[: args.top]
+    print(
+        json.dumps(
+            {
+                "import_main_ms": {
+                    "min": round(min(totals), 1),
+                    "median": round(statistics.median(totals), 1),
+                    "max": round(max(totals), 1),
+                },
+                "google_genai_imported": "google.genai" in median,
+                "top_cumulative_ms": {
+                    name: {
+                        "self": round(self_us / 1000, 1),
+                        "cumulative": round(cumulative_us / 1000, 1),
+                    }
+                    for name, (self_us, cumulative_us) in top
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
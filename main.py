@@ -1,20 +1,119 @@
+import asyncio
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 from app.api.routes import router
+from app.api.jobs import router as jobs_router, run_generate_cv_job
+from app.api.job_postings import router as job_postings_router
+from app.api.usage import router as usage_router
+from app.api.matching import router as matching_router
+from app.core.admission import (
+    BATCH,
+    INTERACTIVE,
+    AdmissionMiddleware,
+    AdmissionRejected,
+    RateLimiter,
+    get_admission_controller,
+    rejection_detail,
+    retry_after_header,
+)
+from app.core.metrics import GENERATION_ERRORS, REGISTRY, MetricsMiddleware
 from app.core.settings import get_settings
+from app.core.usage import UsageMiddleware, get_token_budgets, get_usage_ledger
+from app.integrations.gemini.service import aget_gemini_service, loaded_gemini_service
+from app.jobs.queue import get_job_queue
 
 settings = get_settings()
 
+
+async def preload_gemini_service(app: FastAPI) -> None:
+    """
+    Build the Gemini service and warm up its connections, then mark the worker ready
+
+    A build failure (e.g. a missing key) leaves the worker not ready and
+    resurfaces on first use; a failed warm-up is only logged, since the
+    upstream may well be reachable by the time traffic arrives.
+    """
+    try:
+        service = await aget_gemini_service()
+    except Exception as e:
+        print(f"Erro ao pré-carregar o serviço do Gemini: {e}")
+        return
+    if settings.gemini_warmup_enabled:
+        try:
+            await service.client.awarm_up()
+        except Exception as e:
+            print(f"Falha ao aquecer a conexão com o Gemini: {e}")
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the job workers, picking up jobs left unfinished by a restart
+    job_queue = get_job_queue()
+    await job_queue.start(run_generate_cv_job)
+    # Build the Gemini service and open its connection pool off the startup
+    # path: /health answers at once, /ready once the worker is warm
+    app.state.ready = not settings.service_preload
+    preload = (
+        asyncio.create_task(preload_gemini_service(app)) if settings.service_preload else None
+    )
+    # Token usage is buffered in memory and written to SQLite periodically
+    ledger = get_usage_ledger()
+    flusher = (
+        asyncio.create_task(ledger.run_flusher(settings.usage_flush_interval_seconds))
+        if ledger is not None
+        else None
+    )
+    yield
+    if preload is not None:
+        preload.cancel()
+    await job_queue.stop()
+    service = loaded_gemini_service()
+    if service is not None:
+        await service.client.aclose()
+    if flusher is not None:
+        flusher.cancel()
+        await asyncio.to_thread(ledger.flush)
+
+
 app = FastAPI(
     title="AId Curriculum API",
     description="API para geração de currículos utilizando um modelo de LLM avançado.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Admission control for routes that call the LLM; innermost so that 429s
+# still get CORS headers and are counted by the metrics middleware. The
+# controller caps the upstream calls themselves, whichever route makes them
+if settings.admission_enabled:
+    app.add_middleware(
+        AdmissionMiddleware,
+        routes={
+            ("POST", "/api/v1/generate-cv"): INTERACTIVE,
+            ("POST", "/api/v1/generate-cv/stream"): INTERACTIVE,
+            ("POST", "/api/v1/generate-cv/section"): INTERACTIVE,
+            ("POST", "/api/v1/generate-cv/batch"): BATCH,
+            ("POST", "/api/v1/job-compatibility/compare"): BATCH,
+            ("POST", "/api/v1/job-postings"): INTERACTIVE,
+            ("POST", "/api/v1/jobs"): BATCH,
+        },
+        controller=get_admission_controller(),
+        limiter=RateLimiter(
+            rate=settings.rate_limit_per_minute / 60, burst=settings.rate_limit_burst
+        ),
+        budgets=get_token_budgets,
+    )
+
+# Attributes LLM token usage to the calling client and route; outside
+# admission control, which checks the client's token budget
+app.add_middleware(UsageMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +122,7 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+app.add_middleware(MetricsMiddleware)
 
 
 # Global exception handler for validation errors
@@ -31,6 +131,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     """
     Handler global para erros de validação do FastAPI/Pydantic
     """
+    GENERATION_ERRORS.inc(error_class="validation")
     error_messages = []
     for error in exc.errors():
         field = " -> ".join(str(loc) for loc in error["loc"])
@@ -57,6 +158,16 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+# An upstream call of the request could not get an LLM slot in time
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content=rejection_detail(exc),
+        headers={"Retry-After": retry_after_header(exc)},
+    )
+
+
 @app.exception_handler(ValidationError)
 async def pydantic_validation_exception_handler(request: Request, exc: ValidationError):
     """
@@ -80,6 +191,10 @@ async def pydantic_validation_exception_handler(request: Request, exc: Validatio
 
 # Include routes
 app.include_router(router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
+app.include_router(matching_router, prefix="/api/v1")
+app.include_router(job_postings_router, prefix="/api/v1")
+app.include_router(usage_router, prefix="/api/v1")
 
 
 # Health check endpoint
@@ -88,6 +203,22 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# Readiness: 503 until the Gemini service is built and its connections warm
+@app.get("/ready")
+async def readiness_check():
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Root endpoint with API information
 @app.get("/")
 async def root():
@@ -101,7 +232,7 @@ async def root():
 
 if __name__ == "__main__":
     # Validate that the GOOGLE_API_KEY is set before starting the server
-    if not settings.google_api_key:
+    if not settings.google_api_key and settings.llm_backend != "fake":
         print("ERROR: GOOGLE_API_KEY não encontrada nas variáveis de ambiente.")
         print(
             "1) Copie .env.example para .env e adicione sua key:\n   cp .env.example .env\n   (edite .env e defina GOOGLE_API_KEY=SUACHAVE)"
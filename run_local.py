@@ -1,3 +1,5 @@
+from pydantic_core import to_json
+
 from app.integrations.gemini.service import GeminiService
 from app.schemas.cv import CVRequest
 
@@ -86,10 +88,9 @@ def main():
 
     # Print the generated CV
     print("\n=== Generated CV ===\n")
-    import json
-
+    # cv_content is a CVResponse model, which json.dumps cannot serialize
     content = result.get("cv_content", result.get("error", "Unknown error occurred"))
-    print(json.dumps(content, indent=2, ensure_ascii=False))
+    print(to_json(content, indent=2).decode("utf-8"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""
+Configuração do pytest: a API roda contra o FakeGeminiBackend, sem rede.
+
+As settings leem o ambiente quando o módulo é importado, então o ambiente
+é definido aqui, antes de qualquer import do app. Os bancos SQLite ficam
+num diretório temporário.
+"""
+
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_DATA_DIR = tempfile.mkdtemp(prefix="cv-tests-")
+
+os.environ.update(
+    LLM_BACKEND="fake",
+    FAKE_LATENCY_MS="0",
+    FAKE_JITTER_MS="0",
+    FAKE_ERROR_RATE="0",
+    FAKE_SEED="0",
+    SERVICE_PRELOAD="false",
+    GEMINI_WARMUP_ENABLED="false",
+    RATE_LIMIT_PER_MINUTE="0",
+    USAGE_LEDGER_ENABLED="false",
+    API_KEYS="",
+    CACHE_BACKEND="memory",
+    CACHE_SQLITE_PATH=os.path.join(_DATA_DIR, "cv_cache.sqlite3"),
+    JOBS_SQLITE_PATH=os.path.join(_DATA_DIR, "jobs.sqlite3"),
+    JOB_POSTINGS_SQLITE_PATH=os.path.join(_DATA_DIR, "job_postings.sqlite3"),
+    USAGE_SQLITE_PATH=os.path.join(_DATA_DIR, "usage.sqlite3"),
+)
+
+from app.integrations.gemini.backends import FakeGeminiBackend  # noqa: E402
+
+VALID_PAYLOAD = {
+    "full_name": "João Silva Santos",
+    "desired_role": "Desenvolvedor Python",
+    "email": "joao@gmail.com",
+    "phone": "11987654321",
+    "professional_experience": (
+        "Trabalho há 3 anos como desenvolvedor Python em uma startup de tecnologia, "
+        "onde desenvolvo APIs RESTful e sistemas web."
+    ),
+    "education": "Bacharel em Ciência da Computação pela USP, formado em 2021.",
+    "skills": "Python, Django, PostgreSQL, Git, Docker, conhecimentos em AWS e metodologias ágeis.",
+    "target_job_description": (
+        "Vaga de backend sênior. Requisitos: Python, Django, Kubernetes. Diferencial: Kafka."
+    ),
+}
+
+
+@pytest.fixture
+def payload():
+    """A valid CVRequest body; each test gets its own copy"""
+    return dict(VALID_PAYLOAD)
+
+
+@dataclass
+class CountingFakeBackend(FakeGeminiBackend):
+    """FakeGeminiBackend that counts the upstream calls it receives"""
+
+    calls: int = 0
+
+    async def agenerate(self, model, contents, config):
+        self.calls += 1
+        return await super().agenerate(model, contents, config)
+
+    async def astream(self, model, contents, config):
+        self.calls += 1
+        async for chunk in super().astream(model, contents, config):
+            yield chunk
+
+
+@pytest.fixture
+def fake_backend():
+    """Instant, deterministic fake backend counting its calls"""
+    return CountingFakeBackend(latency_ms=0, jitter_ms=0, seed=0)
+
+
+@pytest.fixture
+def service(fake_backend):
+    """A GeminiService of its own, with an empty memory cache, on fake_backend"""
+    from app.core.cache import MemoryCache
+    from app.integrations.gemini.service import GeminiService
+
+    gemini_service = GeminiService(cache=MemoryCache())
+    gemini_service.client.client = fake_backend
+    return gemini_service
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient for the app, with the lifespan (job workers) running"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,283 @@
+"""
+Controle de admissão: limite por cliente, identificação do cliente, filas
+por prioridade e o limite de chamadas simultâneas ao Gemini.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import admission as admission_module
+from app.core.admission import (
+    BACKGROUND,
+    BATCH,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionRejected,
+    RateLimiter,
+    current_priority,
+)
+from app.core.clients import ClientIdentifier, api_key_id, parse_api_keys
+from app.integrations.gemini.client import GeminiClient
+from app.schemas.cv import GeneratedCVResponse
+
+
+def _scope(key=None, ip="10.0.0.1"):
+    headers = [(b"x-api-key", key.encode())] if key is not None else []
+    return {"type": "http", "headers": headers, "client": (ip, 1234)}
+
+
+def _controller(max_in_flight=1, interactive=2, batch=2, timeout=1.0):
+    return AdmissionController(
+        max_in_flight, {INTERACTIVE: interactive, BATCH: batch}, timeout
+    )
+
+
+def test_rate_limiter_allows_a_burst_then_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission_module.time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(rate=1.0, burst=2)
+
+    assert limiter.take("a") == 0
+    assert limiter.take("a") == 0
+    assert limiter.take("a") == pytest.approx(1.0)
+    assert limiter.take("b") == 0  # buckets are per client
+
+    now[0] += 1.0
+    assert limiter.take("a") == 0
+
+
+def test_rate_limiter_disabled_with_zero_rate():
+    limiter = RateLimiter(rate=0, burst=1)
+
+    assert all(limiter.take("a") == 0 for _ in range(100))
+
+
+def test_only_configured_api_keys_identify_a_client():
+    identify = ClientIdentifier(parse_api_keys(" good , other ,"))
+
+    assert identify(_scope("good")) == api_key_id("good")
+    assert identify(_scope("made-up")) == "ip:10.0.0.1"
+    assert identify(_scope()) == "ip:10.0.0.1"
+    assert "good" not in api_key_id("good")
+
+
+def test_without_configured_keys_clients_are_their_ip():
+    assert ClientIdentifier()(_scope("anything", ip="10.0.0.9")) == "ip:10.0.0.9"
+
+
+def test_freed_slot_goes_to_interactive_then_batch_then_background():
+    async def scenario():
+        controller = _controller(max_in_flight=1)
+        order = []
+
+        async def call(priority):
+            async with controller.slot(priority):
+                order.append(priority)
+                await asyncio.sleep(0)
+
+        await controller.acquire(INTERACTIVE)
+        waiting = [
+            asyncio.ensure_future(call(priority))
+            for priority in (BACKGROUND, BATCH, INTERACTIVE)
+        ]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*waiting)
+        return order, controller.in_flight
+
+    order, in_flight = asyncio.run(scenario())
+
+    assert order == [INTERACTIVE, BATCH, BACKGROUND]
+    assert in_flight == 0
+
+
+def test_full_queue_and_long_wait_are_rejected():
+    async def scenario():
+        controller = _controller(max_in_flight=1, interactive=1, timeout=0.05)
+        await controller.acquire(INTERACTIVE)
+        queued = asyncio.ensure_future(controller.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire(INTERACTIVE)
+        with pytest.raises(AdmissionRejected) as timeout:
+            await queued
+        return full.value, timeout.value, controller
+
+    full, timeout, controller = asyncio.run(scenario())
+
+    assert full.reason == "queue_full"
+    assert timeout.reason == "queue_timeout"
+    assert full.retry_after > 0
+    assert not any(controller.queues.values())
+
+
+def test_background_calls_wait_without_limit():
+    async def scenario():
+        controller = _controller(max_in_flight=1, timeout=0.01)
+        await controller.acquire(INTERACTIVE)
+        waiting = [asyncio.ensure_future(controller.acquire(BACKGROUND)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        assert not controller.is_full(BACKGROUND)
+        assert not any(task.done() for task in waiting)
+        for _ in waiting:
+            controller.release()
+        await asyncio.gather(*waiting)
+        return controller.in_flight
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_slot_is_released_when_the_call_fails():
+    async def scenario():
+        controller = _controller()
+        with pytest.raises(ValueError):
+            async with controller.slot(INTERACTIVE):
+                raise ValueError("upstream")
+        return controller.in_flight
+
+    assert asyncio.run(scenario()) == 0
+
+
+class _Budgets:
+    def __init__(self, exhausted):
+        self.exhausted = exhausted
+        self.checked = []
+
+    def retry_after(self, client):
+        self.checked.append(client)
+        return 3600.0 if client in self.exhausted else 0.0
+
+
+def _app(controller, limiter, budgets=None):
+    inner = FastAPI()
+
+    @inner.post("/llm")
+    async def llm():
+        return {"priority": current_priority()}
+
+    @inner.post("/free")
+    async def free():
+        return {"priority": current_priority()}
+
+    inner.add_middleware(
+        AdmissionMiddleware,
+        routes={("POST", "/llm"): BATCH},
+        controller=controller,
+        limiter=limiter,
+        budgets=(lambda: budgets) if budgets is not None else None,
+        clients=ClientIdentifier(["good"]),
+    )
+    return TestClient(inner)
+
+
+def test_middleware_rate_limits_and_tags_the_priority():
+    client = _app(_controller(), RateLimiter(rate=0.001, burst=1))
+
+    first = client.post("/llm")
+    second = client.post("/llm")
+    other_key = client.post("/llm", headers={"X-API-Key": "made-up"})
+
+    assert first.json() == {"priority": BATCH}
+    assert second.status_code == 429
+    assert int(second.headers["retry-after"]) >= 1
+    assert second.json()["detail"]["details"] == ["motivo: rate_limited"]
+    # An unknown key is the same client as its IP, so it gets no new bucket
+    assert other_key.status_code == 429
+    assert client.post("/free").json() == {"priority": BACKGROUND}
+
+
+def test_middleware_turns_away_clients_past_their_budget():
+    budgets = _Budgets(exhausted={api_key_id("good")})
+    client = _app(_controller(), RateLimiter(rate=0, burst=1), budgets)
+
+    rejected = client.post("/llm", headers={"X-API-Key": "good"})
+    allowed = client.post("/llm")
+
+    assert rejected.status_code == 429
+    assert rejected.json()["detail"]["details"] == ["motivo: token_budget"]
+    assert allowed.status_code == 200
+    assert budgets.checked == [api_key_id("good"), "ip:testclient"]
+
+
+def test_middleware_rejects_when_the_class_queue_is_full():
+    controller = _controller(batch=0)
+    client = _app(controller, RateLimiter(rate=0, burst=1))
+    assert client.post("/llm").status_code == 200  # free slots: no queueing needed
+
+    controller.in_flight = controller.max_in_flight
+    response = client.post("/llm")
+
+    assert response.status_code == 429
+    assert response.json()["detail"]["details"] == ["motivo: queue_full"]
+
+
+def test_client_holds_one_slot_per_upstream_call(fake_backend):
+    peak = 0
+    running = 0
+
+    class Tracking(type(fake_backend)):
+        async def agenerate(self, model, contents, config):
+            nonlocal peak, running
+            running += 1
+            peak = max(peak, running)
+            try:
+                await asyncio.sleep(0.01)
+                return await super().agenerate(model, contents, config)
+            finally:
+                running -= 1
+
+    client = GeminiClient(backend=Tracking(latency_ms=0, jitter_ms=0, seed=0))
+    client.admission = _controller(max_in_flight=2, batch=10, timeout=5)
+
+    async def scenario():
+        token = admission_module._priority.set(BATCH)
+        try:
+            return await asyncio.gather(
+                *(
+                    client.agenerate_json_response("prompt", "system", GeneratedCVResponse)
+                    for _ in range(6)
+                )
+            )
+        finally:
+            admission_module._priority.reset(token)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, GeneratedCVResponse) for result in results)
+    assert peak == 2
+    assert client.admission.in_flight == 0
+
+
+def test_client_raises_rejections_instead_of_reporting_upstream_errors(fake_backend):
+    client = GeminiClient(backend=fake_backend)
+    client.admission = _controller(max_in_flight=1, interactive=0)
+    client.admission.in_flight = 1
+
+    async def scenario():
+        token = admission_module._priority.set(INTERACTIVE)
+        try:
+            await client.agenerate_json_response("prompt", "system", GeneratedCVResponse)
+        finally:
+            admission_module._priority.reset(token)
+
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(scenario())
+    assert fake_backend.calls == 0
+    assert client.breaker.state == "closed"
+
+
+def test_app_answers_a_call_that_cannot_get_a_slot_with_429(client, payload, monkeypatch):
+    controller = admission_module.get_admission_controller()
+    monkeypatch.setattr(controller, "queue_timeout", 0.01)
+    monkeypatch.setattr(controller, "in_flight", controller.max_in_flight)
+    payload["skills"] = "Elixir, Phoenix, Erlang/OTP e sistemas distribuídos."
+
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 429
+    assert response.json()["detail"]["details"] == ["motivo: queue_timeout"]
+    assert int(response.headers["retry-after"]) >= 1
@@ -0,0 +1,98 @@
+"""
+Geração em lote em /generate-cv/batch: falhas por item, NDJSON, limite do
+lote e rejeições do controle de admissão.
+"""
+
+import json
+
+from app.core import admission as admission_module
+from app.core.settings import get_settings
+from app.integrations.gemini.resilience import RetryPolicy
+from app.integrations.gemini.service import get_gemini_service
+
+
+def _item(payload, skills):
+    return dict(payload, skills=skills)
+
+
+class FailingBackend:
+    """Fails every call whose prompt mentions `marker`"""
+
+    def __init__(self, backend, marker):
+        self.backend = backend
+        self.marker = marker
+
+    async def agenerate(self, model, contents, config):
+        if self.marker in str(contents):
+            raise RuntimeError("falha simulada")
+        return await self.backend.agenerate(model, contents, config)
+
+
+def test_failed_items_do_not_fail_the_batch(client, payload, monkeypatch):
+    gemini_client = get_gemini_service().client
+    monkeypatch.setattr(gemini_client, "client", FailingBackend(gemini_client.client, "Cobol"))
+    monkeypatch.setattr(gemini_client, "retry", RetryPolicy(1, 0.001, 0.001))
+    invalid = dict(payload)
+    del invalid["full_name"]
+    items = [
+        _item(payload, "Go, gRPC, Kubernetes e observabilidade com Prometheus."),
+        invalid,
+        _item(payload, "Cobol, JCL e DB2 em mainframe para o setor bancário."),
+    ]
+
+    response = client.post("/api/v1/generate-cv/batch", json=items)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (3, 1, 2)
+    ok, not_valid, failed = body["results"]
+    assert [item["index"] for item in body["results"]] == [0, 1, 2]
+    assert ok["status"] == "ok" and "cv_content" in ok
+    assert (not_valid["status"], not_valid["error"]) == ("error", "Erro de validação")
+    assert not_valid["details"]
+    assert failed["status"] == "error" and failed["error"]
+    assert "cv_content" not in failed
+
+
+def test_streaming_returns_one_line_per_item(client, payload):
+    items = [
+        _item(payload, f"Python, FastAPI e PostgreSQL, com {years} anos de experiência.")
+        for years in (2, 3, 4)
+    ]
+
+    response = client.post("/api/v1/generate-cv/batch?stream=true", json=items)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert {line["status"] for line in lines} == {"ok"}
+
+
+def test_batches_over_the_limit_are_rejected(client, payload, monkeypatch):
+    monkeypatch.setattr(get_settings(), "batch_max_items", 2)
+
+    response = client.post("/api/v1/generate-cv/batch", json=[payload] * 3)
+
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "Lote muito grande"
+
+
+def test_an_item_rejected_by_admission_is_an_error_on_that_item(client, payload, monkeypatch):
+    cached = _item(payload, "Rust, Tokio e WebAssembly para serviços de baixa latência.")
+    assert client.post("/api/v1/generate-cv", json=cached).status_code == 200
+    # No free slot: items that need Gemini wait out the queue timeout, cache hits do not
+    controller = admission_module.get_admission_controller()
+    monkeypatch.setattr(controller, "queue_timeout", 0.01)
+    monkeypatch.setattr(controller, "in_flight", controller.max_in_flight)
+    uncached = _item(payload, "Scala, Akka e Spark para processamento de eventos.")
+
+    response = client.post("/api/v1/generate-cv/batch", json=[cached, uncached])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    hit, rejected = body["results"]
+    assert hit["status"] == "ok"
+    assert rejected["status"] == "error"
+    assert "sobrecarregado" in rejected["error"]
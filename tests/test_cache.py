@@ -0,0 +1,151 @@
+"""
+Cache de resultados: MemoryCache, SQLiteCache, a chave do pedido e o uso no serviço.
+"""
+
+import asyncio
+import sqlite3
+
+from app.core import cache as cache_module
+from app.core.cache import MemoryCache, SQLiteCache, build_cache_key
+from app.schemas.cv import CVRequest
+
+
+class Clock:
+    """Stands in for time.monotonic/time.time so TTLs can be crossed instantly"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats.evictions == 1
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = MemoryCache(ttl_seconds=10)
+    cache.set("a", {"x": 1})
+
+    clock.now += 9
+    assert cache.get("a") == {"x": 1}
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+def test_memory_cache_enforces_byte_limit():
+    cache = MemoryCache(max_entries=0, max_bytes=40)
+    cache.set("too-big", "x" * 100)
+    cache.set("a", "x" * 15)
+    cache.set("b", "x" * 15)
+    cache.set("c", "x" * 15)
+
+    assert cache.get("too-big") is None
+    assert cache.get("a") is None
+    assert (cache.get("b"), cache.get("c")) == ("x" * 15, "x" * 15)
+
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path).set("a", {"cv": [1, 2]})
+
+    reopened = SQLiteCache(path)
+
+    assert reopened.get("a") == {"cv": [1, 2]}
+    assert reopened.stats.hits == 1
+    assert len(reopened) == 1
+
+
+def test_sqlite_cache_reads_do_not_write(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path)
+    cache.set("a", 1)
+    before = sqlite3.connect(path).execute("SELECT last_access FROM cv_cache").fetchone()
+
+    for _ in range(3):
+        assert cache.get("a") == 1
+
+    after = sqlite3.connect(path).execute("SELECT last_access FROM cv_cache").fetchone()
+    assert after == before
+    assert cache.stats.hits == 3
+
+
+def test_sqlite_cache_evicts_least_recently_read(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    # The read is only remembered in memory, and saved by the next set()
+    assert cache.get("a") == 1
+    clock.now += 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats.evictions == 1
+
+
+def test_sqlite_cache_expires_and_purges_rows(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=10)
+    cache.set("a", 1)
+
+    clock.now += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1  # a read never deletes
+
+    cache.set("b", 2)
+    assert len(cache) == 1
+    assert cache.stats.expirations == 1
+
+
+def test_cache_key_ignores_whitespace_but_not_content(payload):
+    request = CVRequest.model_validate(payload)
+    spaced = CVRequest.model_validate(
+        dict(payload, skills="  Python,   Django, PostgreSQL, Git, Docker,\n conhecimentos em AWS e metodologias ágeis. ")
+    )
+    changed = CVRequest.model_validate(dict(payload, skills="Go, Kubernetes, gRPC e Terraform"))
+
+    key = build_cache_key(request, "gemini-2.5-flash", "v1")
+
+    assert build_cache_key(spaced, "gemini-2.5-flash", "v1") == key
+    assert build_cache_key(changed, "gemini-2.5-flash", "v1") != key
+
+
+def test_cache_key_includes_model_and_versions(payload):
+    request = CVRequest.model_validate(payload)
+
+    key = build_cache_key(request, "gemini-2.5-flash", "v1")
+
+    assert build_cache_key(request, "gemini-2.5-pro", "v1") != key
+    assert build_cache_key(request, "gemini-2.5-flash", "v2") != key
+
+
+def test_service_serves_repeated_requests_from_cache(service, fake_backend, payload):
+    request = CVRequest.model_validate(payload)
+
+    first = asyncio.run(service.agenerate_cv(request))
+    second = asyncio.run(service.agenerate_cv(request))
+
+    assert fake_backend.calls == 1
+    assert second == first
+    assert service.cache.stats.hits == 1
@@ -0,0 +1,117 @@
+"""
+Comparação de um candidato com várias vagas em /job-compatibility/compare.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.settings import get_settings
+from app.integrations.gemini.resilience import RetryPolicy
+from app.integrations.gemini.service import get_gemini_service
+from app.schemas.cv import JobComparisonRequest
+
+SKILLS = "Python, Django, PostgreSQL e Docker"
+
+# Local scores for SKILLS: 0, 100 and 50, submitted out of order
+JOBS = [
+    {"description": "Requisitos: Java, Spring Boot e Kafka."},
+    {"description": "Requisitos: Python e Django."},
+    {"description": "Requisitos: Python, Kubernetes e Kafka."},
+]
+
+
+@pytest.fixture
+def local_scores(monkeypatch):
+    # The fake backend scores at random; "fill" makes the ranking deterministic
+    monkeypatch.setattr(get_gemini_service(), "local_scoring_mode", "fill")
+
+
+def test_results_are_ranked_by_score(client, local_scores):
+    response = client.post(
+        "/api/v1/job-compatibility/compare", json={"skills": SKILLS, "jobs": JOBS}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (3, 3, 0)
+    results = body["results"]
+    assert [item["index"] for item in results] == [1, 2, 0]
+    assert [item["rank"] for item in results] == [1, 2, 3]
+    assert [item["job_compatibility"]["compatibility_score"] for item in results] == [
+        100,
+        50,
+        0,
+    ]
+
+
+def test_a_failed_job_is_reported_last_without_a_rank(client, local_scores):
+    jobs = [{"job_posting_id": "nao-registrada"}, *JOBS]
+
+    response = client.post(
+        "/api/v1/job-compatibility/compare", json={"skills": SKILLS, "jobs": jobs}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (4, 3, 1)
+    failed = body["results"][-1]
+    assert (failed["index"], failed["status"]) == (0, "error")
+    assert failed["job_posting_id"] == "nao-registrada"
+    assert "rank" not in failed and failed["error"]
+    assert [item["rank"] for item in body["results"][:-1]] == [1, 2, 3]
+
+
+class FailingBackend:
+    """Fails every call whose prompt mentions `marker`"""
+
+    def __init__(self, fake_backend, marker):
+        self.fake = fake_backend
+        self.marker = marker
+
+    async def agenerate(self, model, contents, config):
+        if self.marker in str(contents):
+            raise RuntimeError("falha simulada")
+        return await self.fake.agenerate(model, contents, config)
+
+
+def test_one_failing_call_does_not_affect_the_other_jobs(service, fake_backend):
+    service.client.client = FailingBackend(fake_backend, "Cobol")
+    service.client.retry = RetryPolicy(1, 0.001, 0.001)
+    request = JobComparisonRequest.model_validate(
+        {"skills": SKILLS, "jobs": [*JOBS, {"description": "Requisitos: Cobol e Mainframe."}]}
+    )
+
+    async def scenario():
+        return {index: result async for index, result in service.compare_jobs(request, 4)}
+
+    results = asyncio.run(scenario())
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert set(results[3]) == {"error"}
+    for index in (0, 1, 2):
+        assert "job_compatibility" in results[index]
+
+
+def test_too_many_jobs_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "compare_max_jobs", 2)
+
+    response = client.post(
+        "/api/v1/job-compatibility/compare", json={"skills": SKILLS, "jobs": JOBS}
+    )
+
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "Vagas demais"
+
+
+def test_streaming_returns_one_line_per_job(client):
+    response = client.post(
+        "/api/v1/job-compatibility/compare?stream=true", json={"skills": SKILLS, "jobs": JOBS}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1, 2]
+    assert {item["status"] for item in items} == {"ok"}
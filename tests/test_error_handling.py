@@ -0,0 +1,97 @@
+"""
+Tratamento de erros da API de geração de currículos.
+
+Os cenários do antigo script `test_error_handling.py`, agora contra o app
+in-process com o FakeGeminiBackend.
+"""
+
+import pytest
+
+
+def test_valid_request_generates_cv(client, payload):
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 200
+    cv_content = response.json()["cv_content"]
+    assert cv_content["generated_cv"]["personal_info"]
+    assert "job_compatibility" in cv_content
+
+
+@pytest.mark.parametrize(
+    "changes, field",
+    [
+        ({"full_name": "João"}, "full_name"),
+        ({"full_name": "João123 Silva"}, "full_name"),
+        ({"email": "email_invalido"}, "email"),
+        ({"email": "maria@example.com"}, "email"),
+        ({"phone": "123"}, "phone"),
+        ({"phone": "11111111111"}, "phone"),
+        ({"professional_experience": "Curta."}, "professional_experience"),
+    ],
+)
+def test_invalid_field_is_reported(client, payload, changes, field):
+    payload.update(changes)
+
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 422
+    body = response.json()
+    assert body["error"] == "Erro de validação"
+    assert any(field in detail for detail in body["details"])
+
+
+def test_missing_contact_is_rejected(client, payload):
+    del payload["email"]
+    del payload["phone"]
+
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 422
+    assert any("contato" in detail for detail in response.json()["details"])
+
+
+def test_empty_required_fields_are_all_reported(client, payload):
+    for field in ("full_name", "desired_role", "professional_experience", "education", "skills"):
+        payload[field] = ""
+
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 422
+    details = " ".join(response.json()["details"])
+    for field in ("full_name", "desired_role", "professional_experience", "education", "skills"):
+        assert field in details
+
+
+def test_job_description_and_id_together_are_rejected(client, payload):
+    payload["target_job_id"] = "abc123"
+
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 422
+
+
+def test_unknown_job_posting_is_not_found(client, payload):
+    del payload["target_job_description"]
+    payload["target_job_id"] = "nao-existe"
+
+    response = client.post("/api/v1/generate-cv", json=payload)
+
+    assert response.status_code == 404
+    assert response.json()["detail"]["error"] == "Vaga não encontrada"
+
+
+def test_dry_run_reports_invalid_payloads_without_422(client, payload):
+    invalid = dict(payload, email="email_invalido")
+
+    response = client.post("/api/v1/generate-cv/dry-run", json=[payload, invalid])
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["valid"] for item in results] == [True, False]
+
+
+def test_unknown_job_is_not_found(client):
+    response = client.get("/api/v1/jobs/nao-existe")
+
+    assert response.status_code == 404
+    assert response.json()["detail"]["error"] == "Job não encontrado"
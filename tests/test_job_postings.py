@@ -0,0 +1,105 @@
+"""
+Vagas registradas: análise única da descrição e geração com `target_job_id`.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.job_postings import job_posting_id
+from app.schemas.cv import CVRequest
+
+DESCRIPTION = """
+Vaga: Engenheira(o) de Dados Pleno.
+Requisitos: Python, SQL e Airflow. Diferenciais: Spark e dbt.
+Responsável pelos pipelines de faturamento.
+"""
+
+
+class RecordingBackend:
+    """Keeps the prompt of every call made to the fake backend"""
+
+    def __init__(self, fake_backend):
+        self.fake = fake_backend
+        self.prompts = []
+
+    async def agenerate(self, model, contents, config):
+        self.prompts.append(str(contents))
+        return await self.fake.agenerate(model, contents, config)
+
+
+def test_a_posting_is_parsed_once(service, fake_backend):
+    async def scenario():
+        first = await service.aregister_job_posting(DESCRIPTION)
+        again = await service.aregister_job_posting("  " + " ".join(DESCRIPTION.split()))
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert first["created"] and not again["created"]
+    assert first["job_posting"].id == again["job_posting"].id == job_posting_id(DESCRIPTION)
+    assert fake_backend.calls == 1
+
+
+def test_generation_with_target_job_id_uses_the_parsed_requirements(service, fake_backend, payload):
+    posting = asyncio.run(service.aregister_job_posting(DESCRIPTION + " Remoto."))["job_posting"]
+    backend = RecordingBackend(fake_backend)
+    service.client.client = backend
+    request = CVRequest.model_validate(
+        dict(payload, target_job_description=None, target_job_id=posting.id)
+    )
+
+    result = asyncio.run(service.agenerate_cv(request))
+
+    [prompt] = backend.prompts
+    assert "REQUISITOS DA VAGA ALVO" in prompt
+    assert f"Cargo: {posting.requirements.title}" in prompt
+    assert "faturamento" not in prompt
+    assert result["cv_content"].job_compatibility is not None
+
+
+def test_cache_key_follows_the_posting_id(service, fake_backend, payload):
+    async def register(description):
+        return (await service.aregister_job_posting(description))["job_posting"].id
+
+    first_id = asyncio.run(register(DESCRIPTION + " Híbrido."))
+    other_id = asyncio.run(register(DESCRIPTION + " Presencial."))
+    by_id, other = (
+        CVRequest.model_validate(dict(payload, target_job_description=None, target_job_id=id_))
+        for id_ in (first_id, other_id)
+    )
+    inline = CVRequest.model_validate(dict(payload, target_job_description=DESCRIPTION + " Híbrido."))
+    registered = fake_backend.calls
+
+    asyncio.run(service.agenerate_cv(by_id))
+    asyncio.run(service.agenerate_cv(by_id))
+    assert fake_backend.calls == registered + 1  # the repeat is a cache hit
+
+    # The inline description builds a different prompt, and so does another posting
+    asyncio.run(service.agenerate_cv(inline))
+    asyncio.run(service.agenerate_cv(other))
+    assert fake_backend.calls == registered + 3
+    assert len({service._request_key(r) for r in (by_id, inline, other)}) == 3
+
+
+def test_description_and_id_together_are_rejected(payload):
+    with pytest.raises(ValueError, match="não ambos"):
+        CVRequest.model_validate(dict(payload, target_job_id="abc"))
+
+
+def test_register_then_generate_over_http(client, payload):
+    registered = client.post("/api/v1/job-postings", json={"description": DESCRIPTION})
+    assert registered.status_code == 200
+    posting_id = registered.json()["job_posting_id"]
+    assert client.post("/api/v1/job-postings", json={"description": DESCRIPTION}).json()[
+        "created"
+    ] is False
+    assert client.get(f"/api/v1/job-postings/{posting_id}").json()["description"] == DESCRIPTION
+
+    payload.update(target_job_description=None, target_job_id=posting_id)
+    generated = client.post("/api/v1/generate-cv", json=payload)
+    dry_run = client.post("/api/v1/generate-cv/dry-run", json=payload)
+
+    assert generated.status_code == 200
+    assert generated.json()["cv_content"]["job_compatibility"] is not None
+    assert dry_run.json()["valid"] is True
@@ -0,0 +1,142 @@
+"""
+Fila de jobs: concessões (leases) no JobStore, retomada de jobs abandonados,
+limpeza dos finalizados e a rota /api/v1/jobs.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from app.jobs import store as store_module
+from app.jobs.queue import get_job_queue
+from app.jobs.store import COMPLETED, FAILED, QUEUED, RUNNING, JobStore
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(store_module.time, "time", lambda: clock[0])
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, now):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_jobs_are_claimed_oldest_first_and_only_once(store, now):
+    first = store.create({"n": 1}, client="ip:10.0.0.1")
+    now[0] += 1
+    second = store.create({"n": 2})
+
+    claimed = store.claim_next("worker-a", lease_seconds=60)
+
+    assert claimed["id"] == first
+    assert claimed["payload"] == {"n": 1}
+    assert claimed["client"] == "ip:10.0.0.1"
+    assert (claimed["status"], claimed["owner"], claimed["attempts"]) == (RUNNING, "worker-a", 1)
+    assert claimed["lease_expires_at"] == pytest.approx(now[0] + 60)
+    assert store.claim_next("worker-b", lease_seconds=60)["id"] == second
+    assert store.claim_next("worker-b", lease_seconds=60) is None
+
+
+def test_only_the_lease_holder_can_finish_a_job(store):
+    job_id = store.create({})
+    store.claim_next("worker-a", lease_seconds=60)
+
+    assert not store.finish(job_id, {"cv": 1}, owner="worker-b")
+    assert store.finish(job_id, {"cv": 1}, owner="worker-a")
+
+    job = store.get(job_id)
+    assert (job["status"], job["result"], job["owner"]) == (COMPLETED, {"cv": 1}, None)
+
+
+def test_expired_leases_are_requeued_and_renewed_ones_kept(store, now):
+    kept = store.create({})
+    lost = store.create({})
+    store.claim_next("alive", lease_seconds=60)
+    store.claim_next("dead", lease_seconds=60)
+
+    now[0] += 50
+    assert store.renew_leases("alive", lease_seconds=60) == 1
+    now[0] += 20
+
+    assert store.requeue_expired(max_attempts=3) == (1, 0)
+    assert store.get(kept)["status"] == RUNNING
+    assert (store.get(lost)["status"], store.get(lost)["owner"]) == (QUEUED, None)
+
+
+def test_jobs_that_keep_losing_their_owner_are_failed(store, now):
+    job_id = store.create({})
+    for attempt in range(3):
+        store.claim_next(f"worker-{attempt}", lease_seconds=60)
+        now[0] += 61
+        store.requeue_expired(max_attempts=3)
+
+    job = store.get(job_id)
+    assert (job["status"], job["attempts"]) == (FAILED, 3)
+    assert "3 tentativas" in job["error"]
+
+
+def test_released_jobs_do_not_count_the_attempt(store):
+    job_id = store.create({})
+    store.claim_next("stopping", lease_seconds=60)
+
+    assert store.release("stopping") == 1
+
+    job = store.get(job_id)
+    assert (job["status"], job["attempts"], job["owner"]) == (QUEUED, 0, None)
+
+
+def test_only_old_finished_jobs_are_purged(store, now):
+    old = store.create({})
+    store.claim_next("worker", lease_seconds=60)
+    store.finish(old, error="falhou")
+    pending = store.create({})
+    now[0] += 3600
+    recent = store.create({})
+    store.finish(recent, {"cv": 1})
+
+    assert store.purge_finished(older_than_seconds=1800) == 1
+    assert store.get(old) is None
+    assert store.get(pending)["status"] == QUEUED
+    assert store.get(recent)["status"] == COMPLETED
+    assert store.count_pending() == 1
+
+
+def test_databases_from_before_leases_are_migrated(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+        "payload TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO jobs VALUES ('old', 'generate-cv', 'queued', '{}', NULL, NULL, 0, 1, 1)")
+    conn.commit()
+    conn.close()
+
+    store = JobStore(path)
+
+    job = store.claim_next("worker", lease_seconds=60)
+    assert (job["id"], job["owner"], job["client"]) == ("old", "worker", None)
+
+
+def test_submitted_job_runs_and_is_charged_to_its_client(client, payload):
+    submitted = client.post("/api/v1/jobs", json=payload)
+    assert submitted.status_code == 202
+    status_url = submitted.json()["status_url"]
+
+    deadline = time.monotonic() + 5
+    while (job := client.get(status_url).json())["status"] in (QUEUED, RUNNING):
+        assert time.monotonic() < deadline, job
+        time.sleep(0.02)
+
+    assert job["status"] == COMPLETED
+    assert "cv_content" in job
+    assert get_job_queue().store.get(job["job_id"])["client"] == "ip:testclient"
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/v1/jobs/nao-existe").status_code == 404
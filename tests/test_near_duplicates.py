@@ -0,0 +1,131 @@
+"""
+SimHash, o índice LSH de quase-duplicatas e o reaproveitamento no serviço.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from app.core import near_duplicates
+from app.core.near_duplicates import SimHashIndex, simhash
+from app.schemas.cv import CVRequest
+
+EXPERIENCE = "".join(
+    f"Desenvolvedor backend na Empresa {i} entre 20{i:02d} e 20{i + 1:02d}, responsável por "
+    "APIs REST em Python e Django, filas com Celery e Redis, banco PostgreSQL, testes "
+    "automatizados e revisão de código da equipe. "
+    for i in range(12)
+)
+EDITED = EXPERIENCE.replace("Redis", "Memcached", 1)
+
+
+def _flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def _distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+@pytest.fixture
+def stable_hash(monkeypatch):
+    """Replaces the per-process salted str hash, so fingerprints do not vary between runs"""
+
+    def digest(text):
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+    monkeypatch.setattr(near_duplicates, "hash", digest, raising=False)
+
+
+def test_simhash_ignores_case_accents_and_punctuation():
+    assert simhash("Revisão de código, APIs REST!") == simhash("revisao de CODIGO apis rest")
+    assert simhash("") == simhash("  ,.; ") == 0
+
+
+def test_simhash_keeps_small_edits_close():
+    unrelated = "Engenheira de dados com Spark, Airflow e dbt em pipelines de faturamento. " * 3
+
+    fingerprint = simhash(EXPERIENCE)
+
+    assert _distance(fingerprint, simhash(EDITED)) < _distance(fingerprint, simhash(unrelated))
+
+
+def test_index_finds_fingerprints_within_the_threshold():
+    index = SimHashIndex(threshold=0.9, max_entries=10)
+    fingerprint = 0x0123456789ABCDEF
+    index.insert("scope", fingerprint, "key")
+
+    assert index.max_distance == 6
+    assert index.nearest("scope", fingerprint) == ("key", 1.0)
+    # Six bits spread over every band: no band matches exactly but the closest
+    assert index.nearest("scope", _flip(fingerprint, 0, 10, 20, 30, 40, 50)) == (
+        "key",
+        pytest.approx(1 - 6 / 64),
+    )
+    assert index.nearest("scope", _flip(fingerprint, 0, 10, 20, 30, 40, 50, 60)) is None
+
+
+def test_index_only_matches_the_same_scope():
+    index = SimHashIndex(threshold=0.9, max_entries=10)
+    index.insert("ana", 42, "ana-key")
+
+    assert index.nearest("bruno", 42) is None
+    assert index.nearest("ana", 42) == ("ana-key", 1.0)
+
+
+def test_index_returns_the_closest_entry():
+    index = SimHashIndex(threshold=0.9, max_entries=10)
+    fingerprint = 0xFFFF0000FFFF0000
+    index.insert("scope", _flip(fingerprint, 1, 2, 3), "far")
+    index.insert("scope", _flip(fingerprint, 1), "near")
+
+    assert index.nearest("scope", fingerprint)[0] == "near"
+
+
+def test_index_overwrites_the_oldest_entry():
+    index = SimHashIndex(threshold=0.9, max_entries=2)
+    for value, fingerprint in (("a", 1 << 63), ("b", 0xFF), ("c", 0xFF00FF00)):
+        index.insert("scope", fingerprint, value)
+
+    assert len(index) == 2
+    assert index.nearest("scope", 1 << 63) is None
+    assert index.nearest("scope", 0xFF)[0] == "b"
+    assert index.nearest("scope", 0xFF00FF00)[0] == "c"
+    # The overwritten entry left no stale slots behind in the band buckets
+    assert sum(len(slots) for buckets in index._buckets for slots in buckets.values()) == 2 * len(
+        index._bands
+    )
+
+
+def test_index_ignores_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(near_duplicates.time, "monotonic", lambda: now[0])
+    index = SimHashIndex(threshold=0.9, max_entries=10, ttl_seconds=60)
+    index.insert("scope", 7, "key")
+
+    now[0] += 59
+    assert index.nearest("scope", 7) == ("key", 1.0)
+    now[0] += 2
+    assert index.nearest("scope", 7) is None
+
+
+def test_service_reuses_the_result_of_a_near_identical_request(
+    stable_hash, service, fake_backend, payload
+):
+    service.near_duplicates = SimHashIndex(threshold=0.9, max_entries=100)
+    original = CVRequest.model_validate(dict(payload, professional_experience=EXPERIENCE))
+    edited = CVRequest.model_validate(dict(payload, professional_experience=EDITED))
+    other_person = CVRequest.model_validate(
+        dict(payload, full_name="Maria Oliveira Costa", professional_experience=EDITED)
+    )
+
+    first = asyncio.run(service.agenerate_cv(original))
+    reused = asyncio.run(service.agenerate_cv(edited))
+    assert fake_backend.calls == 1
+    assert reused == first
+
+    asyncio.run(service.agenerate_cv(other_person))
+    assert fake_backend.calls == 2
@@ -0,0 +1,112 @@
+"""
+Compactação do texto livre e os limites de tokens por campo e do prompt inteiro.
+"""
+
+import pytest
+
+from app.integrations.gemini.prompt_budget import (
+    PromptBudgetExceeded,
+    PromptPreprocessor,
+    compact_text,
+    dedupe_sentences,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+
+# No sentence breaks, so truncation cannot stop at a boundary
+RUN_ON = " ".join(f"tarefa{i} com Python e Django" for i in range(3000))
+
+
+def test_compaction_collapses_whitespace_and_repeated_sentences():
+    text = "  Backend em Python.   APIs REST.\n\n\n\tBackend em python! Filas com Celery.  "
+
+    assert compact_text(text) == "Backend em Python. APIs REST.\nBackend em python! Filas com Celery."
+    assert dedupe_sentences(compact_text(text)) == "Backend em Python. APIs REST.\nFilas com Celery."
+
+
+@pytest.mark.parametrize("budget", [1, 2, 3, 10, 250, 1999])
+def test_truncation_never_exceeds_the_budget(budget):
+    for text in (RUN_ON, "Frase curta. " * 2000, "x" * 50_000):
+        truncated = truncate_to_tokens(text, budget)
+        assert estimate_tokens(truncated) <= budget
+        assert truncated
+
+
+def test_truncation_prefers_a_sentence_boundary():
+    text = "Primeira frase completa aqui. " * 10
+
+    truncated = truncate_to_tokens(text, 20)
+
+    assert truncated.endswith("aqui. [...]")
+    assert truncate_to_tokens("Cabe inteiro.", 20) == "Cabe inteiro."
+
+
+def test_oversized_fields_are_cut_to_their_own_cap():
+    preprocessor = PromptPreprocessor(field_budget=500, field_budgets={"skills": 50})
+
+    processed, report = preprocessor.process(
+        {"professional_experience": RUN_ON, "skills": RUN_ON, "education": "USP, 2021."}
+    )
+
+    assert report.tokens_after["professional_experience"] <= 500
+    assert report.tokens_after["skills"] <= 50
+    assert processed["education"] == "USP, 2021."
+    assert report.truncated == ["professional_experience", "skills"]
+
+
+def test_total_cap_shrinks_the_largest_fields_and_skips_missing_ones():
+    preprocessor = PromptPreprocessor(field_budget=2000, total_budget=3000)
+
+    processed, report = preprocessor.process(
+        {
+            "professional_experience": RUN_ON,
+            "projects": None,
+            "education": RUN_ON[:4000],
+            "skills": RUN_ON,
+            "target_job_description": "",
+        }
+    )
+
+    assert report.total_after <= 3000
+    assert processed["projects"] is None
+    assert processed["target_job_description"] == ""
+    assert set(report.truncated) == {"professional_experience", "skills"}
+
+
+def test_total_cap_with_every_field_at_its_own_cap():
+    fields = {"professional_experience": RUN_ON, "education": RUN_ON, "skills": RUN_ON}
+
+    _, report = PromptPreprocessor(field_budget=2000, total_budget=6000).process(
+        dict(fields, projects=None, target_job_description=None)
+    )
+
+    assert report.total_after <= 6000
+
+
+def test_reject_policy_raises_instead_of_cutting():
+    with pytest.raises(PromptBudgetExceeded) as field:
+        PromptPreprocessor(field_budget=100, policy="reject").process({"skills": RUN_ON})
+    with pytest.raises(PromptBudgetExceeded) as total:
+        PromptPreprocessor(field_budget=0, total_budget=100, policy="reject").process(
+            {"skills": RUN_ON[:300], "education": RUN_ON[:300], "projects": None}
+        )
+
+    assert (field.value.field_name, field.value.budget) == ("skills", 100)
+    assert total.value.field_name == "total"
+
+
+def test_long_request_without_optional_fields_is_truncated_not_an_error(client, payload):
+    payload.update(
+        professional_experience=RUN_ON,
+        education=RUN_ON,
+        skills=RUN_ON,
+        projects=None,
+        target_job_description=None,
+    )
+
+    dry_run = client.post("/api/v1/generate-cv/dry-run", json=payload)
+    generated = client.post("/api/v1/generate-cv", json=payload)
+
+    assert dry_run.status_code == 200
+    assert dry_run.json()["prompt"]["tokens_after"] <= 6000
+    assert generated.status_code == 200
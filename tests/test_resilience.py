@@ -0,0 +1,204 @@
+"""
+Resiliência nas chamadas ao Gemini: retentativas, circuit breaker, prazo e hedging.
+"""
+
+import asyncio
+
+import pytest
+from google.genai.errors import ClientError, ServerError
+
+from app.integrations.gemini import resilience
+from app.integrations.gemini.client import GeminiClient
+from app.integrations.gemini.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    hedged,
+    is_transient,
+)
+from app.schemas.cv import GeneratedCVResponse
+
+
+def _api_error(error_class, code):
+    return error_class(code, {"error": {"code": code, "message": "erro", "status": "X"}})
+
+
+def test_transient_errors():
+    assert is_transient(_api_error(ServerError, 503))
+    assert is_transient(_api_error(ClientError, 429))
+    assert is_transient(TimeoutError())
+    assert not is_transient(_api_error(ClientError, 400))
+    assert not is_transient(ValueError("schema"))
+
+
+def test_backoff_is_jittered_below_the_exponential_cap():
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=3.0)
+
+    for attempt, cap in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (8, 3.0)):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > cap / 2
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # a success resets the count
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_after == pytest.approx(30)
+
+    now[0] += 30
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    now[0] += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_breaker_disabled_with_zero_threshold():
+    breaker = CircuitBreaker(failure_threshold=0, reset_timeout=30)
+
+    for _ in range(10):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+
+def test_latency_tracker_needs_enough_samples():
+    tracker = LatencyTracker(percentile=90, min_samples=10)
+    for value in range(9):
+        tracker.observe(value / 10)
+    assert tracker.threshold() is None
+
+    tracker.observe(0.9)
+
+    assert tracker.threshold() == pytest.approx(0.9)
+
+
+def _hedge(durations, delay, failures=()):
+    """Run hedged() over calls taking the given durations; returns (result, events)"""
+    events = []
+    started = []
+
+    async def call():
+        index = len(started)
+        started.append(index)
+        await asyncio.sleep(durations[index])
+        if index in failures:
+            raise ValueError(f"call {index}")
+        return index
+
+    async def scenario():
+        return await hedged(call, delay, events.append)
+
+    return asyncio.run(scenario()), events
+
+
+def test_hedge_not_sent_for_fast_calls():
+    assert _hedge([0.0], delay=0.05) == (0, [])
+    assert _hedge([0.01], delay=None) == (0, [])
+
+
+def test_hedge_wins_when_the_first_call_is_slow():
+    assert _hedge([0.5, 0.0], delay=0.01) == (1, ["sent", "won"])
+
+
+def test_hedge_falls_back_to_the_call_that_succeeds():
+    assert _hedge([0.05, 0.0], delay=0.01, failures={1}) == (0, ["sent"])
+    with pytest.raises(ValueError, match="call 0"):
+        _hedge([0.02, 0.0], delay=0.01, failures={0, 1})
+
+
+class FlakyBackend:
+    """Fails with the given errors, in order, then delegates to the fake backend"""
+
+    def __init__(self, fake_backend, errors, delay=0.0):
+        self.fake = fake_backend
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+
+    async def agenerate(self, model, contents, config):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return await self.fake.agenerate(model, contents, config)
+
+
+def _client(backend, max_attempts=3, deadline=5.0, failure_threshold=5):
+    client = GeminiClient(backend=backend)
+    client.retry = RetryPolicy(max_attempts, 0.001, 0.001)
+    client.breaker = CircuitBreaker(failure_threshold, reset_timeout=30)
+    client.deadline = deadline
+    client.admission = None
+    return client
+
+
+def _generate(client):
+    return asyncio.run(client.agenerate_json_response("prompt", "system", GeneratedCVResponse))
+
+
+def test_transient_errors_are_retried(fake_backend):
+    backend = FlakyBackend(fake_backend, [_api_error(ServerError, 503), TimeoutError()])
+
+    result = _generate(_client(backend))
+
+    assert isinstance(result, GeneratedCVResponse)
+    assert backend.calls == 3
+
+
+def test_client_errors_are_not_retried(fake_backend):
+    backend = FlakyBackend(fake_backend, [_api_error(ClientError, 400)])
+
+    result = _generate(_client(backend))
+
+    assert result["error_class"] == "api_error_400"
+    assert backend.calls == 1
+
+
+def test_retries_stop_after_max_attempts(fake_backend):
+    backend = FlakyBackend(fake_backend, [_api_error(ServerError, 503)] * 5)
+
+    result = _generate(_client(backend, max_attempts=2))
+
+    assert result["error_class"] == "api_error_503"
+    assert backend.calls == 2
+
+
+def test_deadline_cuts_off_a_slow_call(fake_backend):
+    backend = FlakyBackend(fake_backend, [], delay=1.0)
+
+    result = _generate(_client(backend, deadline=0.05))
+
+    assert result["error_class"] == "deadline_exceeded"
+
+
+def test_open_circuit_fails_fast(fake_backend):
+    backend = FlakyBackend(fake_backend, [_api_error(ServerError, 503)] * 2)
+    client = _client(backend, max_attempts=1, failure_threshold=2)
+
+    _generate(client)
+    _generate(client)
+    result = _generate(client)
+
+    assert result["error_class"] == "circuit_open"
+    assert backend.calls == 2
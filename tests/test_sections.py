@@ -0,0 +1,97 @@
+"""
+Reescrita de uma seção do currículo em /generate-cv/section.
+"""
+
+import asyncio
+
+import pytest
+from pydantic_core import to_jsonable_python
+
+from app.integrations.gemini.resilience import RetryPolicy
+from app.schemas.cv import CVRequest, SectionRegenerationRequest
+
+NEW_TEXT = "Agora lidero um time de cinco pessoas e cuido da arquitetura dos pagamentos."
+
+
+@pytest.fixture
+def generated(client, payload):
+    response = client.post("/api/v1/generate-cv", json=payload)
+    assert response.status_code == 200
+    return response.json()["cv_content"]
+
+
+@pytest.mark.parametrize("section", ["professional_summary", "project_entries", "languages"])
+def test_only_the_requested_section_is_replaced(client, generated, section):
+    response = client.post(
+        "/api/v1/generate-cv/section",
+        json={"cv_content": generated, "section": section, "text": NEW_TEXT},
+    )
+
+    assert response.status_code == 200
+    updated = response.json()["cv_content"]
+    assert updated["generated_cv"][section] != generated["generated_cv"][section]
+    for name, value in generated["generated_cv"].items():
+        if name != section:
+            assert updated["generated_cv"][name] == value, name
+    assert updated["job_compatibility"] == generated["job_compatibility"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"section": "personal_info", "text": NEW_TEXT},
+        {"section": "job_compatibility", "text": NEW_TEXT},
+        {"section": "hobbies", "text": NEW_TEXT},
+        {"section": "professional_summary", "text": "curto"},
+    ],
+)
+def test_unknown_sections_and_short_text_are_422(client, generated, body):
+    response = client.post("/api/v1/generate-cv/section", json={"cv_content": generated, **body})
+
+    assert response.status_code == 422
+
+
+class RecordingBackend:
+    """Keeps the prompt and response schema of every call made to the fake backend"""
+
+    def __init__(self, fake_backend):
+        self.fake = fake_backend
+        self.requests = []
+
+    async def agenerate(self, model, contents, config):
+        self.requests.append((contents, config.response_schema))
+        return await self.fake.agenerate(model, contents, config)
+
+
+def _cv_content(service, payload):
+    result = asyncio.run(service.agenerate_cv(CVRequest.model_validate(payload)))
+    return to_jsonable_python(result["cv_content"])
+
+
+def test_gemini_is_asked_for_the_section_schema_only(service, fake_backend, payload):
+    cv_content = _cv_content(service, payload)
+    backend = RecordingBackend(fake_backend)
+    service.client.client = backend
+    request = SectionRegenerationRequest.model_validate(
+        {"cv_content": cv_content, "section": "skills", "text": NEW_TEXT}
+    )
+
+    result = asyncio.run(service.aregenerate_section(request))
+
+    [(prompt, schema)] = backend.requests
+    assert NEW_TEXT in str(prompt)
+    assert list(schema["properties"]) == ["skills"]
+    assert result["cv_content"].generated_cv.skills != cv_content["generated_cv"]["skills"]
+
+
+def test_failed_rewrite_returns_an_error_not_a_partial_cv(service, fake_backend, payload):
+    cv_content = _cv_content(service, payload)
+    fake_backend.error_rate = 1.0
+    service.client.retry = RetryPolicy(1, 0.001, 0.001)
+    request = SectionRegenerationRequest.model_validate(
+        {"cv_content": cv_content, "section": "achievements", "text": NEW_TEXT}
+    )
+
+    result = asyncio.run(service.aregenerate_section(request))
+
+    assert set(result) == {"error"}
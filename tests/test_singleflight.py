@@ -0,0 +1,94 @@
+"""
+SingleFlight: chamadas concorrentes com a mesma chave viram uma chamada só.
+"""
+
+import asyncio
+
+from app.core.singleflight import SingleFlight
+from app.schemas.cv import CVRequest
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        runs = 0
+
+        async def work():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.01)
+            return {"value": runs}
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return flight, runs, results
+
+    flight, runs, results = asyncio.run(scenario())
+
+    assert runs == 1
+    assert all(result is results[0] for result in results)
+    assert (flight.stats.upstream_calls, flight.stats.saved_calls) == (1, 4)
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_and_later_calls_run_again():
+    async def scenario():
+        flight = SingleFlight()
+        runs = []
+
+        async def work(key):
+            runs.append(key)
+            await asyncio.sleep(0)
+            return key
+
+        await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+        await flight.do("a", lambda: work("a"))
+        return runs
+
+    assert asyncio.run(scenario()) == ["a", "b", "a"]
+
+
+def test_errors_reach_every_waiter():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream")
+
+        return await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ("done", True)
+
+
+def test_service_coalesces_identical_generations(service, fake_backend, payload):
+    request = CVRequest.model_validate(payload)
+
+    async def scenario():
+        return await asyncio.gather(*(service.agenerate_cv(request) for _ in range(4)))
+
+    results = asyncio.run(scenario())
+
+    assert fake_backend.calls == 1
+    assert all("cv_content" in result for result in results)
+    assert service.singleflight.stats.saved_calls == 3
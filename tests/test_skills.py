@@ -0,0 +1,158 @@
+"""
+Dicionário de habilidades, aliases curtos, cabeçalhos de diferenciais e a
+pontuação local de compatibilidade.
+"""
+
+import numpy as np
+import pytest
+
+from app.matching.engine import SkillMatcher, get_skill_matcher
+from app.matching.skills import SkillDictionary
+
+ENTRIES = {
+    "Python": {"aliases": ["python", "py"], "related": ["Django"]},
+    "Django": {"aliases": ["django"], "related": ["Python"]},
+    "R": {"aliases": ["linguagem r"]},
+    "Go": {"aliases": ["golang"]},
+    "React": {"aliases": ["reactjs"]},
+    "React Native": {"aliases": ["react-native"], "related": ["React"]},
+    "Kubernetes": {"aliases": ["k8s"], "weight": 2.0},
+    "Kafka": {"aliases": ["mensageria"]},
+    "C++": {},
+    "CI/CD": {"aliases": ["integração contínua"]},
+}
+
+
+@pytest.fixture
+def dictionary():
+    return SkillDictionary(ENTRIES)
+
+
+@pytest.fixture
+def matcher(dictionary):
+    return SkillMatcher(dictionary)
+
+
+def _names(dictionary, text):
+    return [dictionary.names[position] for position in dictionary.find(text)]
+
+
+def test_longest_alias_wins(dictionary):
+    assert _names(dictionary, "React Native, React e react-native") == [
+        "React Native",
+        "React",
+        "React Native",
+    ]
+
+
+def test_aliases_ignore_case_accents_and_separators(dictionary):
+    assert _names(dictionary, "C++, ci/cd e INTEGRACAO CONTINUA com PY") == [
+        "C++",
+        "CI/CD",
+        "CI/CD",
+        "Python",
+    ]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Python, R e Go", ["Python", "R", "Go"]),
+        ("R, Go, Python", ["R", "Go", "Python"]),
+        ("Salário de R$ 8.000", []),
+        ("Python é uma linguagem e R", ["Python"]),
+        ("Python. R é ótimo", ["Python"]),
+        ("Vamos go", []),
+        ("Linguagem R", ["R"]),
+    ],
+)
+def test_short_aliases_need_a_nearby_skill(dictionary, text, expected):
+    assert _names(dictionary, text) == expected
+
+
+def test_canonical_names(dictionary):
+    assert dictionary.canonical("ReactJS") == "React"
+    assert dictionary.canonical("Kubernetes (básico)") == "Kubernetes"
+    assert dictionary.canonical("Go") == "Go"  # a whole-text alias needs no context
+    assert dictionary.canonical("Marketing") is None
+
+
+def _split(matcher, job_description):
+    result = matcher.match(job_description, "")
+    return result.required, result.desirable
+
+
+def test_nice_to_have_headers_last_until_the_next_header(matcher):
+    job_description = "Requisitos: Python.\nNice to have: Kafka\nReact\nRequisitos técnicos: Django"
+
+    assert _split(matcher, job_description) == (["Python", "Django"], ["React", "Kafka"])
+
+
+@pytest.mark.parametrize(
+    "job_description",
+    [
+        "Requisitos: Python. Diferenciais: Kafka.",
+        "Requisitos: Python; Desejável: Kafka",
+        "Python\nBônus: Kafka",
+    ],
+)
+def test_desirable_headers(matcher, job_description):
+    assert _split(matcher, job_description) == (["Python"], ["Kafka"])
+
+
+@pytest.mark.parametrize(
+    "job_description",
+    [
+        "O diferencial do time é muito grande: Python e Kafka",
+        "Veja https://plus.example.com Python e Kafka",
+        "Diferenciais às 10:30 Python e Kafka",
+    ],
+)
+def test_text_that_is_not_header_shaped_keeps_skills_required(matcher, job_description):
+    assert _split(matcher, job_description) == (["Python", "Kafka"], [])
+
+
+def test_match_weighs_requirements_and_credits_related_skills(matcher):
+    result = matcher.match(
+        "Requisitos: Python, Kubernetes. Diferenciais: Kafka.", "Django e mensageria"
+    )
+
+    # Kubernetes 2 + Python 1 + Kafka 0.5; covered: Kafka 0.5 + Python 0.5 via Django
+    assert result.score == pytest.approx(28.6)
+    assert result.required == ["Kubernetes", "Python"]
+    assert result.desirable == ["Kafka"]
+    assert result.matched == ["Kafka"]
+    assert result.missing == ["Kubernetes", "Python"]
+    assert result.related == {"Python": ["Django"]}
+    assert result.suggestions() == [
+        "Desenvolva conhecimentos em Kubernetes, um requisito da vaga.",
+        "Aprofunde-se em Python; sua experiência com Django facilita essa transição.",
+    ]
+
+
+def test_job_without_known_skills_scores_zero(matcher):
+    result = matcher.match("Vaga para vendedor com boa comunicação.", "Python")
+
+    assert not result.recognized
+    assert result.score == 0
+    assert result.to_compatibility()["skills"] == []
+
+
+def test_score_many_agrees_with_match(matcher):
+    jobs = ["Python e Django", "Kubernetes. Diferenciais: Python", "Marketing"]
+    coverage = matcher.candidate_vector("Python")
+
+    scores = matcher.score_many(np.stack([matcher.job_vector(job) for job in jobs]), coverage)
+
+    assert list(scores) == [matcher.match(job, "Python").score for job in jobs]
+
+
+def test_bundled_dictionary_scores_the_sample_request(payload):
+    result = get_skill_matcher().match(
+        payload["target_job_description"], payload["skills"]
+    )
+
+    assert result.required == ["Python", "Django", "Kubernetes"]
+    assert result.desirable == ["Kafka"]
+    assert result.matched == ["Python", "Django"]
+    assert result.related == {"Kubernetes": ["Docker"]}
@@ -0,0 +1,105 @@
+"""
+SectionStreamParser e o streaming SSE das seções do currículo.
+"""
+
+import asyncio
+import json
+
+import pytest
+from pydantic_core import to_jsonable_python
+
+from app.integrations.gemini.stream_parser import SectionStreamParser
+from app.schemas.cv import CVRequest
+
+DOCUMENT = {
+    "generated_cv": {
+        "personal_info": {"name": "Ana \"Dev\" Souza", "email": "ana@gmail.com"},
+        "professional_summary": "Backend {Python} [APIs], 5 anos.",
+        "experience_entries": [
+            {"role": "Dev", "highlights": ["a", "b"]},
+            {"role": "Tech Lead", "highlights": []},
+        ],
+        "project_entries": [],
+    },
+    "job_compatibility": {"compatibility_score": 87, "is_remote": False, "notes": None},
+}
+
+
+def _events(chunks):
+    parser = SectionStreamParser()
+    events = []
+    for chunk in chunks:
+        events.extend(event.as_dict() for event in parser.feed(chunk))
+    return parser, events
+
+
+def test_emits_sections_and_list_items():
+    parser, events = _events([json.dumps(DOCUMENT)])
+
+    assert [(event["section"], event.get("index")) for event in events] == [
+        ("generated_cv.personal_info", None),
+        ("generated_cv.professional_summary", None),
+        ("generated_cv.experience_entries", 0),
+        ("generated_cv.experience_entries", 1),
+        ("job_compatibility.compatibility_score", None),
+        ("job_compatibility.is_remote", None),
+        ("job_compatibility.notes", None),
+    ]
+    assert events[0]["data"] == DOCUMENT["generated_cv"]["personal_info"]
+    assert events[1]["data"] == DOCUMENT["generated_cv"]["professional_summary"]
+    assert events[3]["data"] == {"role": "Tech Lead", "highlights": []}
+    assert [event["data"] for event in events[4:]] == [87, False, None]
+    assert parser.complete
+    assert json.loads(parser.text) == DOCUMENT
+
+
+def test_chunk_boundaries_do_not_change_the_events():
+    text = json.dumps(DOCUMENT, indent=2)
+    _, whole = _events([text])
+
+    _, by_char = _events(list(text))
+    _, by_seven = _events([text[i : i + 7] for i in range(0, len(text), 7)])
+
+    assert by_char == whole
+    assert by_seven == whole
+
+
+def test_section_is_emitted_as_soon_as_it_closes():
+    parser = SectionStreamParser()
+
+    first = parser.feed('{"generated_cv": {"professional_summary": "Resumo", "skills": [')
+
+    assert [event.section for event in first] == ["generated_cv.professional_summary"]
+    assert not parser.complete
+    assert parser.feed('"Pyth') == []
+    assert [event.data for event in parser.feed('on", 4')] == ["Python"]
+    assert [event.data for event in parser.feed("2]}}")] == [42]
+    assert parser.complete
+
+
+@pytest.mark.parametrize("mode", ["crosscheck", "fill"])
+def test_streamed_compatibility_matches_the_final_result(service, payload, mode):
+    service.local_scoring_mode = mode
+    request = CVRequest.model_validate(payload)
+
+    async def scenario():
+        return [event async for event in service.astream_cv(request)]
+
+    events = asyncio.run(scenario())
+
+    kind, result = events[-1]
+    assert kind == "complete"
+    final = to_jsonable_python(result["cv_content"])
+    sections = [data for kind, data in events[:-1] if kind == "section"]
+    compatibility = {
+        event["section"].split(".", 1)[1]: event["data"]
+        for event in sections
+        if event["section"].startswith("job_compatibility.") and "index" not in event
+    }
+    assert compatibility
+    for field, value in compatibility.items():
+        assert value == final["job_compatibility"][field]
+    personal_info = next(
+        event["data"] for event in sections if event["section"] == "generated_cv.personal_info"
+    )
+    assert personal_info == final["generated_cv"]["personal_info"]
@@ -0,0 +1,183 @@
+"""
+Registro de consumo de tokens: atribuição por cliente, resumos, percentis e
+orçamentos diários.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import usage as usage_api
+from app.core import usage as usage_module
+from app.core.clients import mask_client_id
+from app.core.settings import get_settings
+from app.core.usage import (
+    TokenBudgets,
+    UsageLedger,
+    UsageMiddleware,
+    _percentiles,
+    attribute_usage,
+    parse_client_budgets,
+)
+
+
+def _usage(prompt, output, thoughts=None, cached=None):
+    return SimpleNamespace(
+        prompt_token_count=prompt,
+        candidates_token_count=output,
+        thoughts_token_count=thoughts,
+        cached_content_token_count=cached,
+    )
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return UsageLedger(
+        str(tmp_path / "usage.sqlite3"),
+        input_cost_per_million=1.0,
+        output_cost_per_million=4.0,
+    )
+
+
+def test_percentiles_use_the_nearest_rank():
+    histogram = [(10, 1), (20, 2), (30, 1)]
+
+    assert _percentiles(histogram, (95, 25, 50)) == {"p25": 10.0, "p50": 20.0, "p95": 30.0}
+    assert _percentiles([], (50,)) == {}
+
+
+def test_calls_are_attributed_to_the_enclosing_client(ledger):
+    with attribute_usage("ip:10.0.0.1", "/api/v1/generate-cv"):
+        ledger.record("gemini-2.5-flash", _usage(100, 50, thoughts=10, cached=40), 2.0)
+        ledger.record("gemini-2.5-flash", _usage(100, 50), 1.0)
+    with attribute_usage("key:abc", "/api/v1/jobs"):
+        ledger.record("gemini-2.5-pro", _usage(1000, 200), 1.0)
+    ledger.record("gemini-2.5-flash", None, 1.0)  # responses without usage are skipped
+
+    summary = ledger.summary(since=0, group_by="client")
+
+    assert summary["calls"] == 3
+    assert summary["total_tokens"] == 160 + 150 + 1200
+    assert summary["cost_usd"] == pytest.approx((1200 * 1.0 + 310 * 4.0) / 1_000_000)
+    assert summary["tokens_per_call"] == {"p50": 160.0, "p95": 1200.0, "p99": 1200.0}
+    assert [(group["client"], group["calls"]) for group in summary["groups"]] == [
+        ("key:abc", 1),
+        ("ip:10.0.0.1", 2),
+    ]
+    assert ledger.summary(since=0, endpoint="/api/v1/jobs")["total_tokens"] == 1200
+
+
+def test_daily_totals_survive_a_restart(ledger):
+    with attribute_usage("ip:10.0.0.1", "/api/v1/generate-cv"):
+        ledger.record("gemini-2.5-flash", _usage(100, 50, thoughts=10), 1.0)
+    ledger.flush()
+
+    reopened = UsageLedger(ledger.path)
+
+    assert reopened.used_today("ip:10.0.0.1") == 160
+    assert reopened.today() == {"ip:10.0.0.1": 160}
+
+
+def test_budgets_turn_clients_away_until_the_next_day(ledger):
+    budgets = TokenBudgets(ledger, default=0, per_client=parse_client_budgets("ip:10.0.0.1=150"))
+    assert budgets.retry_after("ip:10.0.0.1") == 0
+
+    with attribute_usage("ip:10.0.0.1", "/api/v1/generate-cv"):
+        ledger.record("gemini-2.5-flash", _usage(100, 50), 1.0)
+    with attribute_usage("ip:10.0.0.2", "/api/v1/generate-cv"):
+        ledger.record("gemini-2.5-flash", _usage(10_000, 50), 1.0)
+
+    assert 0 < budgets.retry_after("ip:10.0.0.1") <= 86400
+    assert budgets.retry_after("ip:10.0.0.2") == 0  # no budget of its own, unlimited default
+    assert budgets.snapshot() == [
+        {
+            "client": "ip:10.0.0.2",
+            "used_tokens": 10_050,
+            "budget_tokens": 0,
+            "remaining_tokens": None,
+        },
+        {
+            "client": "ip:10.0.0.1",
+            "used_tokens": 150,
+            "budget_tokens": 150,
+            "remaining_tokens": 0,
+        },
+    ]
+
+
+def test_client_budgets_parse_client_ids_with_separators():
+    assert parse_client_budgets(" ip:10.0.0.1=100, key:ab=cd=5 ,") == {
+        "ip:10.0.0.1": 100,
+        "key:ab=cd": 5,
+    }
+
+
+def test_middleware_attributes_requests_to_their_client_and_path():
+    inner = FastAPI()
+
+    @inner.get("/who")
+    async def who():
+        context = usage_module._usage_context.get()
+        return {"client": context.client, "endpoint": context.endpoint}
+
+    inner.add_middleware(UsageMiddleware)
+
+    response = TestClient(inner).get("/who", headers={"X-API-Key": "not-configured"})
+
+    assert response.json() == {"client": "ip:testclient", "endpoint": "/who"}
+
+
+def test_ip_client_ids_are_masked_with_a_keyed_hash():
+    masked = mask_client_id("ip:10.0.0.1", "segredo")
+
+    assert masked.startswith("ip:") and "10.0.0.1" not in masked
+    assert mask_client_id("ip:10.0.0.1", "segredo") == masked
+    assert mask_client_id("ip:10.0.0.1", "outro") != masked
+    assert mask_client_id("key:3f2a9c01b7de", "segredo") == "key:3f2a9c01b7de"
+
+
+@pytest.fixture
+def usage_api_client(ledger, monkeypatch):
+    budgets = TokenBudgets(ledger, default=0, per_client={})
+    monkeypatch.setattr(usage_api, "get_usage_ledger", lambda: ledger)
+    monkeypatch.setattr(usage_api, "get_token_budgets", lambda: budgets)
+    with attribute_usage("ip:10.0.0.1", "/api/v1/generate-cv"):
+        ledger.record("gemini-2.5-flash", _usage(100, 50), 1.0)
+    with attribute_usage("key:3f2a9c01b7de", "/api/v1/jobs"):
+        ledger.record("gemini-2.5-flash", _usage(10, 5), 1.0)
+    inner = FastAPI()
+    inner.include_router(usage_api.router, prefix="/api/v1")
+    return TestClient(inner)
+
+
+def test_usage_route_needs_the_admin_key(usage_api_client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_api_key", "")
+    assert usage_api_client.get("/api/v1/usage").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "admin_api_key", "admin-secreta")
+    assert usage_api_client.get("/api/v1/usage").status_code == 401
+    assert (
+        usage_api_client.get("/api/v1/usage", headers={"X-API-Key": "outra"}).status_code == 401
+    )
+    assert (
+        usage_api_client.get("/api/v1/usage", headers={"X-API-Key": "admin-secreta"}).status_code
+        == 200
+    )
+
+
+def test_usage_route_does_not_reveal_ip_addresses(usage_api_client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_api_key", "admin-secreta")
+    headers = {"X-API-Key": "admin-secreta"}
+    masked = mask_client_id("ip:10.0.0.1", "admin-secreta")
+
+    response = usage_api_client.get("/api/v1/usage?group_by=client", headers=headers)
+
+    assert "10.0.0.1" not in response.text
+    body = response.json()
+    assert {group["client"] for group in body["groups"]} == {masked, "key:3f2a9c01b7de"}
+    assert {budget["client"] for budget in body["daily_budgets"]} == {masked, "key:3f2a9c01b7de"}
+    for client in (masked, "ip:10.0.0.1"):
+        filtered = usage_api_client.get(f"/api/v1/usage?client={client}", headers=headers)
+        assert filtered.json()["total_tokens"] == 150